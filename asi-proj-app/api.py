@@ -1,14 +1,101 @@
-from fastapi import FastAPI, Query
-from pydantic import BaseModel
-from typing import Optional
+import asyncio
+import logging
+import math
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Query, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+import json
 import pandas as pd
-from autogluon.tabular import TabularPredictor
 from starlette.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
-from prepare_data_for_prediction import calculate_team_goals_features
-
-app = FastAPI(title="ML Football STATS API", version="1.0.0")
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from inference import InferenceOverloaded, ModelsChanging, inference_executor
+from micro_batcher import MicroBatcher
+from model_registry import ModelRegistry, get_model_registry, model_registry
+from prediction_cache import prediction_cache
+from team_catalog import TEAM_CATALOG_MAX_AGE, TEAM_SEARCH_LIMIT, TeamCatalog, get_team_catalog
+from team_feature_snapshot import snapshot_version
+from team_history_index import database_path, database_version, read_database
+from prepare_data_for_prediction import calculate_team_goals_features, calculate_team_goals_features_batch
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 1000
+
+# Seconds between checks for new artifacts under data/models, 0 disables hot-swap
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+# Load the models when the app is imported, for servers that import it once and then fork the workers:
+#   MODEL_PRELOAD=1 INFERENCE_EXECUTOR=thread gunicorn api:app --preload -w 4 -k uvicorn.workers.UvicornWorker
+# The workers share the loaded models copy-on-write until a hot-swap gives each its own copy
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "0") == "1"
+
+
+# Concurrent single-fixture requests share one predict call per model
+prediction_batcher = MicroBatcher(lambda frame: inference_executor.predict(model_registry, frame))
+
+
+def feature_data_version() -> str:
+    """Version of everything features are built from - the match database and the feature snapshot."""
+    return f"{database_version(database_path())}|{snapshot_version()}"
+
+
+def build_warmup_frame() -> Optional[pd.DataFrame]:
+    """Single feature row for the first two known teams, used to warm the predictors up."""
+    try:
+        df = read_database(columns=["home_team", "away_team", "date"])
+    except FileNotFoundError:
+        return None
+    if df.empty:
+        return None
+    first_match = df.iloc[0]
+    warmup_row = pd.DataFrame([calculate_team_goals_features(first_match["home_team"], first_match["away_team"])])
+    warmup_row["date"] = pd.to_datetime(first_match["date"])
+    return warmup_row
+
+
+async def watch_model_artifacts(registry: ModelRegistry, warmup_row: Optional[pd.DataFrame]) -> None:
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL)
+        await run_in_threadpool(registry.reload_if_changed, warmup_row)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await run_in_threadpool(get_team_catalog)
+    except FileNotFoundError as e:
+        logger.warning(f"Team catalog not built at startup: {e}")
+    warmup_row = await run_in_threadpool(build_warmup_frame)
+    if inference_executor.mode == "process":
+        # Predictions run in the workers, which load and warm their own models - this process only
+        # checks the artifacts and tracks their version
+        model_registry.lazy = True
+    if not model_registry.preloaded:
+        try:
+            await run_in_threadpool(model_registry.load, warmup_row)
+        except Exception as e:
+            # start.py may still be fetching the artifacts - the watcher loads them once they land
+            logger.warning(f"Models not loaded at startup: {e}")
+
+    inference_executor.start(model_registry, warmup_row)
+    watcher = None
+    if MODEL_RELOAD_INTERVAL > 0:
+        watcher = asyncio.create_task(watch_model_artifacts(model_registry, warmup_row))
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    inference_executor.shutdown()
+
+
+if MODEL_PRELOAD:
+    model_registry.preload(build_warmup_frame())
+
+
+app = FastAPI(title="ML Football STATS API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,56 +105,121 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded_handler(request, exc: InferenceOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many prediction requests, try again shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(ModelsChanging)
+async def models_changing_handler(request, exc: ModelsChanging):
+    # The watcher picks the new artifacts up within two checks
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Models are being updated, try again shortly"},
+        headers={"Retry-After": str(max(1, math.ceil(2 * MODEL_RELOAD_INTERVAL)))},
+    )
+
 class PredictionRequest(BaseModel):
     home_team: str
     away_team: str
     date: str  # ISO format
 
+
+class BatchPredictionRequest(BaseModel):
+    fixtures: List[PredictionRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+def format_prediction(predictions: Dict[str, pd.Series], position: int) -> dict:
+    return {
+        "predicted_home_goals": float(predictions["home_goals_model"].iloc[position]),
+        "predicted_away_goals": float(predictions["away_goals_model"].iloc[position]),
+        "predicted_btts": str(predictions["btts"].iloc[position]),
+        "predicted_goals_classification": str(predictions["goals_classification"].iloc[position]),
+        "predicted_over_2_5": str(predictions["over_2_5"].iloc[position]),
+        "predicted_total_goals": float(predictions["total_goals_regression"].iloc[position])
+    }
+
 @app.get("/predict/match_statistics")
-def predict_match_statistics(
+async def predict_match_statistics(
     home_team: str = Query(..., description="Home team name"),
     away_team: str = Query(..., description="Away team name"),
-    date: str = Query(..., description="Match date in ISO format")
+    date: str = Query(..., description="Match date in ISO format"),
+    registry: ModelRegistry = Depends(get_model_registry)
 ):
-    features = calculate_team_goals_features(home_team, away_team)
+    match_date = pd.to_datetime(date)
+    # New models or data change the key, entries of older versions are never hit again
+    cache_key = prediction_cache.key(home_team, away_team, match_date.isoformat(),
+                                     registry.version, feature_data_version())
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    features = await run_in_threadpool(calculate_team_goals_features, home_team, away_team)
 
     single_row = pd.DataFrame([features])
-    single_row["date"] = pd.to_datetime(date)
+    single_row["date"] = match_date
 
-    home_goals_predictor = TabularPredictor.load('data/models/home_goals_model')
-    home_goals_prediction = home_goals_predictor.predict(single_row)
+    predictions, position = await prediction_batcher.submit(single_row)
 
-    away_goals_predictor = TabularPredictor.load('data/models/away_goals_model')
-    away_goals_prediction = away_goals_predictor.predict(single_row)
+    result = format_prediction(predictions, position)
+    prediction_cache.set(cache_key, result)
+    return result
 
-    btts_goals_predictor = TabularPredictor.load('data/models/btts')
-    btts_prediction = btts_goals_predictor.predict(single_row)
+@app.post("/predict/batch")
+async def predict_batch(
+    request: BatchPredictionRequest,
+    registry: ModelRegistry = Depends(get_model_registry)
+):
+    fixtures = pd.DataFrame([fixture.model_dump() for fixture in request.fixtures])
 
-    goals_classification_predictor = TabularPredictor.load('data/models/goals_classification')
-    goals_classification_prediction = goals_classification_predictor.predict(single_row)
+    features = await run_in_threadpool(calculate_team_goals_features_batch, fixtures)
+    features["date"] = pd.to_datetime(fixtures["date"])
 
-    over_2_5_predictor = TabularPredictor.load('data/models/over_2_5')
-    over_2_5_prediction = over_2_5_predictor.predict(single_row)
+    predictions = await inference_executor.predict(registry, features)
 
-    total_goals_regression_predictor = TabularPredictor.load('data/models/total_goals_regression')
-    total_goals_prediction = total_goals_regression_predictor.predict(single_row)
+    def stream_results():
+        # One JSON object per line, in request order
+        for position, fixture in enumerate(request.fixtures):
+            yield json.dumps({**fixture.model_dump(), **format_prediction(predictions, position)}) + "\n"
 
-    return {
-        "predicted_home_goals": float(home_goals_prediction.iloc[0]),
-        "predicted_away_goals": float(away_goals_prediction.iloc[0]),
-        "predicted_btts": str(btts_prediction.iloc[0]),
-        "predicted_goals_classification": str(goals_classification_prediction.iloc[0]),
-        "predicted_over_2_5": str(over_2_5_prediction.iloc[0]),
-        "predicted_total_goals": float(total_goals_prediction.iloc[0])
-    }
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.get("/metrics/prediction_cache")
+def prediction_cache_metrics():
+    return prediction_cache.metrics()
+
+@app.get("/metrics/inference")
+def inference_metrics():
+    return {**inference_executor.metrics(), "batching": prediction_batcher.metrics()}
+
+@app.get("/metrics/models")
+def model_metrics():
+    return model_registry.metrics()
+
+def cached_json_response(request: Request, catalog: TeamCatalog, content: dict) -> Response:
+    # Team list only changes with new data - clients revalidate with If-None-Match
+    headers = {"ETag": catalog.etag, "Cache-Control": f"public, max-age={TEAM_CATALOG_MAX_AGE}"}
+    if request.headers.get("if-none-match") == catalog.etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
 
 @app.get("/available_teams")
-def available_teams():
-    df = pd.read_csv("data/database/matches_results_separated.csv")
-    home_teams = df["home_team"].dropna().unique().tolist()
-    away_teams = df["away_team"].dropna().unique().tolist()
-    all_teams = list(set(home_teams + away_teams))
-    return JSONResponse(content={"teams": all_teams})
+async def available_teams(request: Request):
+    catalog = await run_in_threadpool(get_team_catalog)
+    return cached_json_response(request, catalog, {"teams": catalog.teams})
+
+@app.get("/teams/search")
+async def search_teams(
+    request: Request,
+    prefix: str = Query("", description="Start of a word of the team name, case and accent insensitive"),
+    limit: int = Query(TEAM_SEARCH_LIMIT, ge=1, le=100),
+):
+    catalog = await run_in_threadpool(get_team_catalog)
+    return cached_json_response(request, catalog, {"teams": catalog.search(prefix, limit)})
 
 # To extend for other models, add more endpoints or parameterize model selection.
 
@@ -0,0 +1,191 @@
+"""Latency and throughput benchmark of the prediction API on a synthetic match database.
+
+Builds the match database for the chosen scale with the Kedro data_processing
+nodes (asi-proj-kedro/benchmarks/synthetic_data.py) in a temporary directory
+and drives the API in process against it. Every predictor is the simulated one
+of load_test_micro_batching.py, so the numbers are the API's own overhead:
+feature building, batching, caching and serialisation. Results are compared
+with the JSON baseline for that scale (stored on the first run); exits with 1
+on a regression:
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --scale medium --requests 2000 --clients 64
+    python benchmarks/bench_api.py --snapshot --update-baseline
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(APP_DIR.parent / 'asi-proj-kedro' / 'benchmarks'))
+
+from baselines import add_baseline_arguments, metric, report  # noqa: E402
+from synthetic_data import SCALES, make_raw_exports  # noqa: E402
+
+START_DATE = datetime(2025, 5, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='serve features from the precomputed snapshot instead of the match database')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=1000, help='requests per run')
+    parser.add_argument('--batch-fixtures', type=int, default=500, help='fixtures per /predict/batch request')
+    parser.add_argument('--simulated-call-ms', type=float, default=0.0)
+    parser.add_argument('--simulated-row-ms', type=float, default=0.0)
+    add_baseline_arguments(parser)
+    parser.set_defaults(baseline_dir=APP_DIR / 'benchmarks' / 'baselines')
+    return parser.parse_args()
+
+
+def build_database(directory: Path, scale: str, snapshot: bool) -> None:
+    """Write data/database the way upload_model ships it, from synthetic raw exports."""
+    from asi_proj_kedro.pipelines.data_preparation.nodes import (
+        enforce_match_schema,
+        merge_datasets,
+        split_match_scores,
+        split_match_statistics,
+        standardize_column_names,
+        standardize_time_column,
+    )
+    from asi_proj_kedro.pipelines.for_traning_preparation.nodes import (
+        build_team_features_snapshot,
+        prepare_goals_data,
+    )
+
+    matches_data, match_statistics = make_raw_exports(*SCALES[scale])
+    data = standardize_time_column(standardize_column_names(matches_data))
+    merged = merge_datasets(data, standardize_column_names(match_statistics))
+    results = enforce_match_schema(split_match_scores(split_match_statistics(merged)))
+
+    database = directory / 'data' / 'database'
+    database.mkdir(parents=True)
+    results.to_csv(database / 'matches_results_separated.csv', index=False)
+    if snapshot:
+        team_snapshot, pair_snapshot = build_team_features_snapshot(prepare_goals_data(results))
+        team_snapshot.to_parquet(database / 'team_features_snapshot.parquet')
+        pair_snapshot.to_parquet(database / 'pair_features_snapshot.parquet')
+
+
+def percentile(latencies: list, fraction: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[max(int(len(latencies) * fraction) - 1, 0)]
+
+
+async def measure(api, teams: list, args) -> dict:
+    import httpx
+    import pandas as pd
+
+    from prepare_data_for_prediction import calculate_team_goals_features, calculate_team_goals_features_batch
+
+    metrics = {}
+    pairs = [(teams[i % len(teams)], teams[(i * 7 + 1) % len(teams)]) for i in range(args.requests)]
+
+    # Features alone, without HTTP
+    started = time.perf_counter()
+    for home, away in pairs[:200]:
+        calculate_team_goals_features(home, away)
+    metrics['features.single_per_call'] = metric((time.perf_counter() - started) / min(len(pairs), 200))
+
+    fixtures = pd.DataFrame(pairs[:args.batch_fixtures], columns=['home_team', 'away_team'])
+    started = time.perf_counter()
+    calculate_team_goals_features_batch(fixtures)
+    metrics[f'features.batch[{len(fixtures)}]'] = metric(time.perf_counter() - started)
+
+    api.inference_executor.max_queue = args.requests
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        # Sequential requests - latency without queueing
+        api.prediction_cache.clear()
+        latencies = []
+        for i, (home, away) in enumerate(pairs[:200]):
+            # Distinct minutes keep every request out of the prediction cache
+            params = {'home_team': home, 'away_team': away, 'date': (START_DATE + timedelta(minutes=i)).isoformat()}
+            started = time.perf_counter()
+            response = await client.get('/predict/match_statistics', params=params)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+        metrics['match_statistics.p50'] = metric(statistics.median(latencies))
+        metrics['match_statistics.p99'] = metric(percentile(latencies, 0.99))
+
+        # Cached requests - the same fixture again
+        started = time.perf_counter()
+        for _ in range(200):
+            await client.get('/predict/match_statistics', params=params)
+        metrics['match_statistics.cached_per_call'] = metric((time.perf_counter() - started) / 200)
+
+        # Concurrent clients
+        api.prediction_cache.clear()
+        latencies = []
+        counter = iter(range(args.requests))
+
+        async def client_loop():
+            for i in counter:
+                home, away = pairs[i]
+                date = (START_DATE + timedelta(days=1, minutes=i)).isoformat()
+                started = time.perf_counter()
+                response = await client.get('/predict/match_statistics',
+                                            params={'home_team': home, 'away_team': away, 'date': date})
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+        metrics['match_statistics.throughput'] = metric(args.requests / elapsed, unit='req/s', better='higher')
+        metrics['match_statistics.concurrent_p99'] = metric(percentile(latencies, 0.99))
+
+        # One batch request
+        body = {'fixtures': [{'home_team': home, 'away_team': away, 'date': START_DATE.isoformat()}
+                             for home, away in pairs[:args.batch_fixtures]]}
+        started = time.perf_counter()
+        response = await client.post('/predict/batch', json=body)
+        response.raise_for_status()
+        metrics[f'batch[{len(body["fixtures"])}]'] = metric(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(100):
+            await client.get('/available_teams')
+        metrics['available_teams_per_call'] = metric((time.perf_counter() - started) / 100)
+
+    return metrics
+
+
+async def main_async(args) -> int:
+    os.environ['MODEL_RELOAD_INTERVAL'] = '0'
+    from load_test_micro_batching import use_simulated_predictors
+    use_simulated_predictors(args.simulated_call_ms, args.simulated_row_ms)
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_database(Path(directory), args.scale, args.snapshot)
+        # The API reads data/ relative to the working directory
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            import api
+            from team_history_index import read_database
+
+            df = read_database(columns=['home_team', 'away_team'])
+            teams = sorted(set(df['home_team'].dropna()) | set(df['away_team'].dropna()))
+            async with api.app.router.lifespan_context(api.app):
+                metrics = await measure(api, teams, args)
+        finally:
+            os.chdir(cwd)
+
+    config = {key: getattr(args, key) for key in ('scale', 'snapshot', 'clients', 'requests', 'batch_fixtures',
+                                                  'simulated_call_ms', 'simulated_row_ms')}
+    name = f"api_{args.scale}{'_snapshot' if args.snapshot else ''}"
+    return report(name, metrics, config, args)
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main_async(parse_args())))
@@ -0,0 +1,133 @@
+"""Load test for the micro-batcher behind /predict/match_statistics.
+
+Drives the API in process with concurrent clients, once with batching off
+(batch size 1) and once with the configured batch size, and reports the
+throughput and latency of both. Run from asi-proj-app with the models in
+data/models:
+
+    python benchmarks/load_test_micro_batching.py
+    python benchmarks/load_test_micro_batching.py --clients 64 --requests 2000 --max-wait-ms 2
+
+Without trained models, --simulated-call-ms replaces every predictor with one
+that costs a fixed time per predict call plus --simulated-row-ms per row.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+START_DATE = datetime(2025, 5, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=1000, help='requests per run')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--simulated-call-ms', type=float, default=None)
+    parser.add_argument('--simulated-row-ms', type=float, default=0.02)
+    return parser.parse_args()
+
+
+class SimulatedPredictor:
+    def __init__(self, name: str, call_seconds: float, row_seconds: float):
+        self.name = name
+        self.call_seconds = call_seconds
+        self.row_seconds = row_seconds
+
+    def predict(self, data):
+        import pandas as pd
+        time.sleep(self.call_seconds + self.row_seconds * len(data))
+        value = 'yes' if self.name in ('btts', 'over_2_5') else 1.0
+        return pd.Series([value] * len(data), index=data.index)
+
+
+def use_simulated_predictors(call_ms: float, row_ms: float) -> None:
+    # Worker processes would load the real models, so the simulation runs in threads
+    os.environ['INFERENCE_EXECUTOR'] = 'thread'
+    from model_registry import ModelRegistry
+
+    def read_predictor(self, name):
+        return SimulatedPredictor(name, call_ms / 1000, row_ms / 1000)
+
+    def load(self, warmup_data=None, lazy=None):
+        self._predictors = OrderedDict((name, self._load_model(name, None)) for name in self.model_names)
+        self._version = 'simulated'
+
+    ModelRegistry._read_predictor = read_predictor
+    ModelRegistry.load = load
+
+
+async def run(app, api, teams, args, batch_size: int) -> dict:
+    import httpx
+
+    api.prediction_batcher.max_batch_size = batch_size
+    api.prediction_batcher.max_wait = args.max_wait_ms / 1000
+    api.prediction_batcher.batches = api.prediction_batcher.rows = 0
+    api.prediction_cache.clear()
+    latencies = []
+    counter = iter(range(args.requests))
+    status_codes = {}
+
+    async def client_loop(client):
+        for i in counter:
+            home, away = teams[i % len(teams)], teams[(i * 7 + 1) % len(teams)]
+            # Distinct minutes keep every request out of the prediction cache
+            date = (START_DATE + timedelta(minutes=i)).isoformat()
+            params = {'home_team': home, 'away_team': away, 'date': date}
+            started = time.perf_counter()
+            response = await client.get('/predict/match_statistics', params=params)
+            latencies.append(time.perf_counter() - started)
+            status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'throughput': args.requests / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'status_codes': status_codes,
+        'avg_batch_size': api.prediction_batcher.metrics()['avg_batch_size'],
+    }
+
+
+async def main_async(args) -> int:
+    os.environ['MODEL_RELOAD_INTERVAL'] = '0'
+    if args.simulated_call_ms is not None:
+        use_simulated_predictors(args.simulated_call_ms, args.simulated_row_ms)
+    import api
+    from team_history_index import read_database
+
+    df = read_database(columns=['home_team', 'away_team'])
+    teams = sorted(set(df['home_team'].dropna()) | set(df['away_team'].dropna()))
+    # Measures throughput, not admission control - no request is rejected with 503
+    api.inference_executor.max_queue = args.requests
+
+    async with api.app.router.lifespan_context(api.app):
+        results = {}
+        for label, batch_size in [('unbatched', 1), ('batched', args.batch_size)]:
+            results[label] = await run(api.app, api, teams, args, batch_size)
+            r = results[label]
+            print(f"{label:>10}: {r['throughput']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+                  f"p99 {r['p99_ms']:7.1f} ms  avg batch {r['avg_batch_size']:5.1f}  {r['status_codes']}")
+
+    gain = results['batched']['throughput'] / results['unbatched']['throughput']
+    print(f"throughput gain: {gain:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main_async(parse_args())))
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import pandas as pd
+
+from model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# "process" runs the ensembles in worker processes with their own copy of the models, "thread" in this process
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "process")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+# Requests allowed to wait for a worker; beyond that the API answers 503 right away
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+# Longest wait for a worker before giving up with 503
+INFERENCE_QUEUE_TIMEOUT = float(os.getenv("INFERENCE_QUEUE_TIMEOUT", "5"))
+
+
+class InferenceOverloaded(Exception):
+    """All workers are busy and the queue is full - the client should retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ModelsChanging(RuntimeError):
+    """The artifacts on disk are not the version the API serves - it swaps to them shortly, the client should retry."""
+
+
+# Models of a worker process, reloaded when the API serves a new version
+_worker_registry: Optional[ModelRegistry] = None
+
+
+def _load_worker_models(models_dir: str, warmup_data: Optional[pd.DataFrame] = None) -> ModelRegistry:
+    global _worker_registry
+    registry = ModelRegistry(models_dir)
+    registry.load(warmup_data)
+    if registry.artifacts_version() != registry.version:
+        # Files replaced while they were read - the next request loads the settled copy
+        raise ModelsChanging(f"Model artifacts in {models_dir} changed while loading")
+    _worker_registry = registry
+    return registry
+
+
+def _init_worker(models_dir: str, warmup_data: Optional[pd.DataFrame]) -> None:
+    # Load and warm the models when the worker starts, not on its first request
+    try:
+        _load_worker_models(models_dir, warmup_data)
+    except Exception as e:
+        # A failing initializer breaks the whole pool - the first request retries the load
+        logger.warning(f"Inference worker started without models: {e}")
+
+
+def _worker_ready() -> None:
+    pass
+
+
+def _predict_in_worker(models_dir: str, version: str, data: pd.DataFrame) -> Dict[str, pd.Series]:
+    registry = _worker_registry
+    if registry is None or registry.version != version:
+        registry = _load_worker_models(models_dir)
+        if registry.version != version:
+            # Never answer with other models than the ones the API keys its cache with
+            raise ModelsChanging(f"Worker found model version {registry.version}, the API serves {version}")
+    return registry.predict_all(data)
+
+
+class InferenceExecutor:
+    """Bounded executor for model predictions with admission control.
+
+    At most `max_workers` predictions run at once and at most `max_queue`
+    wait for a worker. A request that finds the queue full, or waits longer
+    than `queue_timeout`, fails fast with InferenceOverloaded instead of
+    piling up and stretching the latency of every request behind it.
+    """
+
+    def __init__(self, mode: str = INFERENCE_EXECUTOR, max_workers: int = INFERENCE_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE, queue_timeout: float = INFERENCE_QUEUE_TIMEOUT):
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._avg_latency = 0.1  # seconds, moving average of one prediction
+        self.rejected = 0
+
+    def start(self, registry: Optional[ModelRegistry] = None, warmup_data: Optional[pd.DataFrame] = None) -> None:
+        if self.mode == "process":
+            # Spawned workers do not inherit the server's threads or event loop
+            initargs = (str(registry.models_dir), warmup_data) if registry is not None else None
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=mp.get_context("spawn"),
+                initializer=_init_worker if initargs else None, initargs=initargs or (),
+            )
+            if registry is not None and registry.loaded:
+                # Workers are spawned on demand - one task each starts them all, loading in the background
+                for _ in range(self.max_workers):
+                    self._executor.submit(_worker_ready)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = asyncio.Semaphore(self.max_workers)
+        logger.info(f"Inference executor: {self.mode}, {self.max_workers} workers, queue {self.max_queue}")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def retry_after(self) -> int:
+        waiting = max(self._in_flight - self.max_workers, 0) + 1
+        return max(1, math.ceil(self._avg_latency * waiting / self.max_workers))
+
+    async def predict(self, registry: ModelRegistry, data: pd.DataFrame) -> Dict[str, pd.Series]:
+        if self._executor is None:
+            self.start()
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise InferenceOverloaded(self.retry_after())
+
+        self._in_flight += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise InferenceOverloaded(self.retry_after())
+            try:
+                started = time.perf_counter()
+                loop = asyncio.get_running_loop()
+                if self.mode == "process":
+                    result = await loop.run_in_executor(
+                        self._executor, _predict_in_worker, str(registry.models_dir), registry.version, data
+                    )
+                else:
+                    result = await loop.run_in_executor(self._executor, registry.predict_all, data)
+                self._avg_latency = 0.9 * self._avg_latency + 0.1 * (time.perf_counter() - started)
+                return result
+            finally:
+                self._slots.release()
+        finally:
+            self._in_flight -= 1
+
+    def metrics(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self.max_workers, 0),
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "avg_latency_seconds": self._avg_latency,
+        }
+
+
+inference_executor = InferenceExecutor()
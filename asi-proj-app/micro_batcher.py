@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rows predicted together at most; 1 turns batching off
+PREDICTION_BATCH_MAX_SIZE = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", "64"))
+# How long the first request of a batch waits for others to join
+PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", "5"))
+
+Predictions = Dict[str, pd.Series]
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one call per predictor.
+
+    The first request opens a batch and waits at most `max_wait_ms`; the batch
+    is sent earlier once it holds `max_batch_size` rows. Every request gets the
+    predictions of the whole batch and its own row position in them.
+    """
+
+    def __init__(self, predict: Callable[[pd.DataFrame], Awaitable[Predictions]],
+                 max_batch_size: int = PREDICTION_BATCH_MAX_SIZE,
+                 max_wait_ms: float = PREDICTION_BATCH_MAX_WAIT_MS):
+        self.predict = predict
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[pd.DataFrame, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = set()  # keeps in-flight batch tasks referenced
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, row: pd.DataFrame) -> Tuple[Predictions, int]:
+        """Predictions for the batch `row` ended up in, and the row's position in it."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[pd.DataFrame, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.rows += len(batch)
+        try:
+            frame = pd.concat([row for row, _ in batch], ignore_index=True)
+            predictions = await self.predict(frame)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for position, (_, future) in enumerate(batch):
+            # A request cancelled while waiting (client gone) has no one to hand the result to
+            if not future.done():
+                future.set_result((predictions, position))
+
+    def metrics(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": self.rows / self.batches if self.batches else 0.0,
+        }
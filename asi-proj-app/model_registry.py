@@ -0,0 +1,276 @@
+import gc
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+from autogluon.tabular import TabularPredictor
+from fastapi import HTTPException
+
+try:
+    import psutil
+except ImportError:  # optional, model memory falls back to the size on disk
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# "full" serves the trained ensembles, "deploy" the refit-full, pruned exports of the model_training pipeline
+MODEL_SERVING_MODE = os.getenv("MODEL_SERVING_MODE", "full")
+SERVING_MODELS_DIRS = {"full": "data/models", "deploy": "data/models/deploy"}
+if MODEL_SERVING_MODE not in SERVING_MODELS_DIRS:
+    raise ValueError(f"MODEL_SERVING_MODE={MODEL_SERVING_MODE!r}, allowed: {', '.join(SERVING_MODELS_DIRS)}")
+MODELS_DIR = SERVING_MODELS_DIRS[MODEL_SERVING_MODE]
+# Keep every model of the ensembles in memory (TabularPredictor.persist). Without it each predict reads the bagged
+# fold models from disk again. The cost is the RAM of all six ensembles, in every process that serves them - the
+# refit-full "deploy" copies take a fraction of it. 0 trades prediction latency for memory
+MODEL_PERSIST = os.getenv("MODEL_PERSIST", "1") == "1"
+# "eager" loads every model at startup, "lazy" each model on its first prediction
+MODEL_LOADING = os.getenv("MODEL_LOADING", "eager")
+# Memory the loaded models may take together, least recently used ones are dropped above it; 0 is no limit
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+MODEL_NAMES = (
+    "home_goals_model",
+    "away_goals_model",
+    "btts",
+    "goals_classification",
+    "over_2_5",
+    "total_goals_regression",
+)
+# Files rewritten by TabularPredictor.save - enough to detect a new artifact
+ARTIFACT_FILES = ("predictor.pkl", "learner.pkl", "version.txt")
+MB = 2 ** 20
+
+
+def rss_bytes() -> Optional[int]:
+    return psutil.Process().memory_info().rss if psutil else None
+
+
+def directory_bytes(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+class ModelRegistry:
+    """Process-wide holder of the loaded predictors.
+
+    Predictors are loaded once and served from memory. A reload builds a
+    complete new set of predictors next to the current one and swaps the
+    reference in one step, so requests never see a half-updated registry.
+
+    With `lazy` loading a model is only read on its first prediction. With a
+    `memory_budget` the least recently used persisted models are dropped once
+    the loaded ones take more; a dropped model is read again when it is next
+    needed. The memory of a model is the RSS growth while loading, persisting
+    and warming it up, so it is approximate while other requests run.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, model_names=MODEL_NAMES,
+                 persist: bool = MODEL_PERSIST, lazy: bool = MODEL_LOADING == "lazy",
+                 memory_budget_mb: float = MODEL_MEMORY_BUDGET_MB):
+        self.models_dir = Path(models_dir)
+        self.model_names = tuple(model_names)
+        self.persist = persist
+        self.lazy = lazy
+        # Without persist a predictor keeps next to nothing resident, dropping it would not free the models
+        self.memory_budget = int(memory_budget_mb * MB) if persist else 0
+        if memory_budget_mb and not persist:
+            logger.warning("MODEL_MEMORY_BUDGET_MB only applies to persisted models (MODEL_PERSIST=1), ignoring it")
+        # Loaded predictors, least recently used first
+        self._predictors: "OrderedDict[str, TabularPredictor]" = OrderedDict()
+        self._model_stats: Dict[str, dict] = {name: {"memory_bytes": 0, "load_seconds": None, "loads": 0,
+                                                     "evictions": 0} for name in self.model_names}
+        self._version: Optional[str] = None
+        self._pending_version: Optional[str] = None
+        self._warmup_data: Optional[pd.DataFrame] = None
+        self._reload_lock = threading.Lock()
+        # One model is read at a time, so the RSS growth can be attributed to it
+        self._load_lock = threading.RLock()
+        self._lock = threading.Lock()
+        self.preloaded = False
+
+    @property
+    def version(self) -> Optional[str]:
+        """Fingerprint of the artifacts currently served."""
+        return self._version
+
+    @property
+    def loaded(self) -> bool:
+        return self._version is not None
+
+    def artifacts_version(self) -> str:
+        """Fingerprint of the artifacts currently on disk (mtime and size of the predictor files)."""
+        digest = hashlib.sha1()
+        for name in self.model_names:
+            for file_name in ARTIFACT_FILES:
+                path = self.models_dir / name / file_name
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    digest.update(f"{name}/{file_name}:missing".encode())
+                    continue
+                digest.update(f"{name}/{file_name}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        return digest.hexdigest()[:16]
+
+    def load(self, warmup_data: Optional[pd.DataFrame] = None, lazy: Optional[bool] = None) -> None:
+        """Load every predictor, run a warm-up prediction and swap them in.
+
+        Lazily, only check that every model is on disk and drop the loaded
+        ones - each is read again on its first prediction.
+        """
+        lazy = self.lazy if lazy is None else lazy
+        with self._reload_lock:
+            version = self.artifacts_version()
+            predictors = OrderedDict()
+            if lazy:
+                missing = [name for name in self.model_names if not (self.models_dir / name / "predictor.pkl").exists()]
+                if missing:
+                    raise FileNotFoundError(f"Models not found in {self.models_dir}: {', '.join(missing)}")
+            else:
+                for name in self.model_names:
+                    predictors[name] = self._load_model(name, warmup_data)
+                    self._evict_over_budget(predictors)
+
+            with self._lock:
+                self._predictors = predictors
+                self._version = version
+                self._pending_version = None
+                self._warmup_data = warmup_data
+            logger.info(f"✅ {'Found' if lazy else 'Loaded'} {len(self.model_names)} models in {self.models_dir} "
+                        f"(version {version})")
+
+    def preload(self, warmup_data: Optional[pd.DataFrame] = None) -> None:
+        """Load every model before the server forks its workers (gunicorn --preload).
+
+        Forked workers share the pages of the preloaded models copy-on-write
+        instead of each loading its own copy. Freezing the objects keeps the
+        garbage collector from writing to those pages and un-sharing them.
+        """
+        self.load(warmup_data, lazy=False)
+        gc.freeze()
+        self.preloaded = True
+
+    def reload_if_changed(self, warmup_data: Optional[pd.DataFrame] = None) -> bool:
+        """Hot-swap the predictors if new artifacts landed under the models directory.
+
+        A change is only picked up once the fingerprint is the same on two
+        consecutive checks, so a copy that is still in progress is not loaded.
+        A failed reload keeps serving the previous predictors.
+        """
+        version = self.artifacts_version()
+        if version == self._version:
+            self._pending_version = None
+            return False
+        if version != self._pending_version:
+            self._pending_version = version
+            logger.info(f"New model artifacts detected (version {version}), waiting for them to settle")
+            return False
+
+        try:
+            self.load(warmup_data)
+        except Exception as e:
+            logger.error(f"❌ Failed to reload models, keeping version {self._version}: {e}")
+            return False
+        return True
+
+    def _read_predictor(self, name: str) -> TabularPredictor:
+        predictor = TabularPredictor.load(str(self.models_dir / name))
+        if self.persist:
+            predictor.persist()
+        return predictor
+
+    def _load_model(self, name: str, warmup_data: Optional[pd.DataFrame]) -> TabularPredictor:
+        with self._load_lock:
+            rss_before = rss_bytes()
+            started = time.perf_counter()
+            predictor = self._read_predictor(name)
+            if warmup_data is not None:
+                # First predict call initialises lazily loaded models and feature generators
+                predictor.predict(warmup_data)
+            load_seconds = time.perf_counter() - started
+            growth = rss_bytes() - rss_before if rss_before is not None else 0
+
+        stats = self._model_stats[name]
+        # Memory freed by an evicted model is reused without growing the RSS - keep the earlier measurement
+        memory_bytes = growth if growth > 0 else stats["memory_bytes"]
+        if not memory_bytes and psutil is None:
+            memory_bytes = directory_bytes(self.models_dir / name)
+        with self._lock:
+            stats.update(memory_bytes=memory_bytes, load_seconds=load_seconds, loads=stats["loads"] + 1)
+        logger.info(f"Loaded {name} in {load_seconds:.2f}s ({memory_bytes / MB:.0f} MB)")
+        return predictor
+
+    def _evict_over_budget(self, predictors: "OrderedDict[str, TabularPredictor]") -> None:
+        # The most recently used model stays even when it alone exceeds the budget
+        with self._lock:
+            while self.memory_budget and len(predictors) > 1 and self._resident_bytes(predictors) > self.memory_budget:
+                name, _ = predictors.popitem(last=False)
+                self._model_stats[name]["evictions"] += 1
+                logger.info(f"Model {name} dropped from memory, over the {self.memory_budget / MB:.0f} MB budget")
+
+    def _resident_bytes(self, predictors) -> int:
+        return sum(self._model_stats[name]["memory_bytes"] for name in predictors)
+
+    def get(self, name: str, predictors: Optional["OrderedDict[str, TabularPredictor]"] = None) -> TabularPredictor:
+        if self._version is None:
+            raise RuntimeError("Model registry is not loaded")
+        with self._lock:
+            predictors = self._predictors if predictors is None else predictors
+            predictor = predictors.get(name)
+            if predictor is not None:
+                predictors.move_to_end(name)
+                return predictor
+
+        with self._load_lock:
+            # Another request may have loaded it while this one waited
+            predictor = predictors.get(name)
+            if predictor is not None:
+                return predictor
+            predictor = self._load_model(name, self._warmup_data)
+            with self._lock:
+                # A reload while this model was read has swapped the set - it is read again for the new one
+                if self._predictors is predictors:
+                    predictors[name] = predictor
+            self._evict_over_budget(predictors)
+        return predictor
+
+    def predict_all(self, data: pd.DataFrame) -> Dict[str, pd.Series]:
+        """Run every predictor on the same frame."""
+        predictors = self._predictors  # one snapshot for the whole request
+        return {name: self.get(name, predictors).predict(data) for name in self.model_names}
+
+    def metrics(self) -> dict:
+        with self._lock:
+            resident = list(self._predictors)
+            return {
+                "loading": "lazy" if self.lazy else "eager",
+                "persist": self.persist,
+                "preloaded": self.preloaded,
+                "version": self._version,
+                "memory_budget_mb": self.memory_budget / MB if self.memory_budget else None,
+                "resident_mb": self._resident_bytes(resident) / MB,
+                "resident": resident,
+                "models": {
+                    name: {
+                        "resident": name in resident,
+                        "memory_mb": stats["memory_bytes"] / MB,
+                        "load_seconds": stats["load_seconds"],
+                        "loads": stats["loads"],
+                        "evictions": stats["evictions"],
+                    }
+                    for name, stats in self._model_stats.items()
+                },
+            }
+
+
+model_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """FastAPI dependency returning the process-wide registry."""
+    if not model_registry.loaded:
+        raise HTTPException(status_code=503, detail="Models are still loading")
+    return model_registry
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # optional, only needed to share the cache between workers
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+# e.g. redis://localhost:6379/0 - empty keeps the cache in process
+PREDICTION_CACHE_REDIS_URL = os.getenv("PREDICTION_CACHE_REDIS_URL", "")
+
+CacheKey = Tuple[str, str, str, str, str]
+
+
+class PredictionCache:
+    """LRU cache of prediction results with a time-to-live.
+
+    Keys carry the model-artifact and database versions, so refreshed models
+    or data never hit entries of the previous version; those age out through
+    the LRU and the TTL. With a Redis client, results are shared between
+    workers and the TTL is left to Redis.
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl: float = PREDICTION_CACHE_TTL,
+                 redis_client=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self._entries: "OrderedDict[CacheKey, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(home_team: str, away_team: str, date: str, model_version: str, data_version: str) -> CacheKey:
+        return home_team, away_team, date, model_version, data_version
+
+    @staticmethod
+    def redis_key(key: CacheKey) -> str:
+        home_team, away_team, date, model_version, data_version = key
+        return f"prediction:{model_version}:{data_version}:{json.dumps([home_team, away_team, date])}"
+
+    def get(self, key: CacheKey) -> Optional[dict]:
+        if self.redis_client is not None:
+            value = self._redis_get(key)
+        else:
+            value = self._local_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: CacheKey, value: dict) -> None:
+        if self.redis_client is not None:
+            try:
+                self.redis_client.setex(self.redis_key(key), max(int(self.ttl), 1), json.dumps(value))
+            except Exception as e:
+                logger.warning(f"Prediction cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _local_get(self, key: CacheKey) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _redis_get(self, key: CacheKey) -> Optional[dict]:
+        try:
+            value = self.redis_client.get(self.redis_key(key))
+        except Exception as e:
+            # An unreachable Redis degrades to computing every prediction
+            logger.warning(f"Prediction cache read failed: {e}")
+            return None
+        return json.loads(value) if value is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "backend": "redis" if self.redis_client is not None else "memory",
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+            }
+
+
+def create_prediction_cache() -> PredictionCache:
+    """Redis-backed cache when PREDICTION_CACHE_REDIS_URL is set, in-process LRU otherwise."""
+    if PREDICTION_CACHE_REDIS_URL:
+        if redis is None:
+            logger.warning("PREDICTION_CACHE_REDIS_URL is set but redis is not installed, using the in-process cache")
+        else:
+            return PredictionCache(redis_client=redis.Redis.from_url(PREDICTION_CACHE_REDIS_URL))
+    return PredictionCache()
+
+
+prediction_cache = create_prediction_cache()
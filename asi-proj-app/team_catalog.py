@@ -0,0 +1,95 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from typing import List, Optional
+
+from team_feature_snapshot import get_team_feature_snapshot, snapshot_version
+from team_history_index import database_path, database_version, read_database
+
+logger = logging.getLogger(__name__)
+
+# How long clients and proxies may reuse the team list without revalidating
+TEAM_CATALOG_MAX_AGE = int(os.getenv("TEAM_CATALOG_MAX_AGE", "300"))
+TEAM_SEARCH_LIMIT = 10
+
+
+def search_key(text: str) -> str:
+    """Case and accent insensitive form of a name or query, e.g. 'Śląsk' -> 'slask'."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+
+def catalog_version() -> str:
+    """Changes whenever the files the catalog is built from are replaced."""
+    version = snapshot_version()
+    if version is not None:
+        return f"snapshot:{version}"
+    return database_version(database_path())
+
+
+class TeamCatalog:
+    """Sorted list of team names with a prefix index for autocomplete.
+
+    Every word of a name is indexed, so 'lub' finds 'Zaglebie Lubin'. The
+    index is a sorted list of (key, name) pairs and a prefix search is two
+    binary searches, independent of how many matches the names came from.
+    """
+
+    def __init__(self, teams, version: Optional[str] = None):
+        self.version = version
+        self.teams: List[str] = sorted(set(teams))
+        self.etag = '"' + hashlib.sha1(json.dumps(self.teams).encode("utf-8")).hexdigest() + '"'
+
+        entries = set()
+        for team in self.teams:
+            words = search_key(team).split()
+            for i in range(len(words)):
+                entries.add((" ".join(words[i:]), team))
+        self._index = sorted(entries)
+        self._keys = [key for key, _ in self._index]
+
+    @classmethod
+    def load(cls) -> "TeamCatalog":
+        version = catalog_version()
+        snapshot = get_team_feature_snapshot()
+        if snapshot is not None:
+            # Built by the Kedro pipeline - no need to scan the match history
+            teams = snapshot.team_table.index
+        else:
+            df = read_database(columns=["home_team", "away_team"])
+            teams = set(df["home_team"].dropna()) | set(df["away_team"].dropna())
+        return cls(teams, version=version)
+
+    def search(self, prefix: str, limit: int = TEAM_SEARCH_LIMIT) -> List[str]:
+        """Teams with a word starting with `prefix`, names starting with it first."""
+        key = search_key(prefix)
+        if not key:
+            return self.teams[:limit]
+
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key + "\uffff")
+        matches = dict.fromkeys(team for _, team in self._index[start:end])
+        return sorted(matches, key=lambda team: (not search_key(team).startswith(key), team))[:limit]
+
+
+_catalog: Optional[TeamCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_team_catalog() -> TeamCatalog:
+    """Process-wide catalog, rebuilt only when the snapshot or database file changes."""
+    global _catalog
+    version = catalog_version()
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = TeamCatalog.load()
+            logger.info(f"Team catalog loaded ({len(_catalog.teams)} teams)")
+        return _catalog
@@ -0,0 +1,61 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from asi_proj_kedro import goals_features
+
+logger = logging.getLogger(__name__)
+
+# Written by the for_traning_preparation pipeline, shipped next to the match database
+TEAM_SNAPSHOT_PATH = "data/database/team_features_snapshot.parquet"
+PAIR_SNAPSHOT_PATH = "data/database/pair_features_snapshot.parquet"
+# Window sizes the snapshot was built with
+SNAPSHOT_N_MATCHES = goals_features.N_MATCHES
+SNAPSHOT_H2H_MATCHES = goals_features.H2H_MATCHES
+
+
+def snapshot_version() -> Optional[str]:
+    """None when the snapshot has not been shipped, otherwise changes with either file."""
+    try:
+        return f"{os.stat(TEAM_SNAPSHOT_PATH).st_mtime_ns}:{os.stat(PAIR_SNAPSHOT_PATH).st_mtime_ns}"
+    except FileNotFoundError:
+        return None
+
+
+class TeamFeatureSnapshot(goals_features.TeamFeatureSnapshot):
+    """Snapshot tables shipped next to the database, tagged with the version of their files."""
+
+    def __init__(self, team_snapshot: pd.DataFrame, pair_snapshot: pd.DataFrame,
+                 version: Optional[str] = None):
+        super().__init__(team_snapshot, pair_snapshot, SNAPSHOT_N_MATCHES, SNAPSHOT_H2H_MATCHES)
+        self.version = version
+
+    @classmethod
+    def from_files(cls) -> "TeamFeatureSnapshot":
+        version = snapshot_version()
+        return cls(pd.read_parquet(TEAM_SNAPSHOT_PATH), pd.read_parquet(PAIR_SNAPSHOT_PATH), version=version)
+
+
+_snapshot: Optional[TeamFeatureSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_team_feature_snapshot() -> Optional[TeamFeatureSnapshot]:
+    """Process-wide snapshot, reloaded when its files change; None if it was not shipped."""
+    global _snapshot
+    version = snapshot_version()
+    if version is None:
+        return None
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = TeamFeatureSnapshot.from_files()
+            logger.info(f"Team feature snapshot loaded ({len(_snapshot.team_table)} teams, "
+                        f"{len(_snapshot.pair_table)} pairs)")
+        return _snapshot
@@ -0,0 +1,65 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from asi_proj_kedro.goals_features import TeamHistory
+from asi_proj_kedro.match_schema import apply_match_schema
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = "data/database/matches_results_separated.csv"
+# Columnar export of the same table, preferred when present
+DATABASE_PARQUET_PATH = "data/database/matches_results_separated.parquet"
+
+
+def database_path() -> str:
+    return DATABASE_PARQUET_PATH if os.path.exists(DATABASE_PARQUET_PATH) else DATABASE_PATH
+
+
+def database_version(path: str) -> str:
+    """Changes whenever the database file is replaced or switches format."""
+    return f"{os.path.basename(path)}:{os.stat(path).st_mtime_ns}"
+
+
+def read_database(path: Optional[str] = None, columns=None) -> pd.DataFrame:
+    """Read the match database with the pipeline's compact schema, only the given columns if the format allows it."""
+    path = path or database_path()
+    if path.endswith(".parquet"):
+        return apply_match_schema(pd.read_parquet(path, columns=columns), copy=False)
+    return apply_match_schema(pd.read_csv(path, usecols=columns), copy=False)
+
+
+class TeamHistoryIndex(TeamHistory):
+    """`TeamHistory` of the match database, tagged with the database version it was built from."""
+
+    def __init__(self, data: pd.DataFrame, version: Optional[str] = None):
+        super().__init__(data)
+        self.version = version
+
+    @classmethod
+    def from_file(cls, path: str) -> "TeamHistoryIndex":
+        version = database_version(path)
+        return cls(read_database(path), version=version)
+
+
+_index: Optional[TeamHistoryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_team_history_index(path: Optional[str] = None) -> TeamHistoryIndex:
+    """Process-wide index, rebuilt whenever the database file's mtime changes."""
+    global _index
+    path = path or database_path()
+    version = database_version(path)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = TeamHistoryIndex.from_file(path)
+            logger.info(f"Team history index built from {path} ({len(_index.teams)} teams)")
+        return _index
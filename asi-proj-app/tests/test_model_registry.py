@@ -0,0 +1,74 @@
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("autogluon.tabular")
+pytest.importorskip("psutil")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import model_registry  # noqa: E402
+from model_registry import MB, MODEL_NAMES, ModelRegistry  # noqa: E402
+
+MODEL_MB = 40
+
+
+class ResidentPredictor:
+    """Holds MODEL_MB of touched memory, like a persisted ensemble"""
+
+    def __init__(self):
+        self.weights = np.ones(MODEL_MB * MB // 8)
+
+    def predict(self, data):
+        return pd.Series(self.weights[0], index=data.index)
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    for name in MODEL_NAMES:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "predictor.pkl").write_bytes(b"")
+    monkeypatch.setattr(ModelRegistry, "_read_predictor", lambda self, name: ResidentPredictor())
+    return tmp_path
+
+
+def test_lazy_loading_evicts_least_recently_used(models_dir):
+    registry = ModelRegistry(str(models_dir), persist=True, lazy=True, memory_budget_mb=2.5 * MODEL_MB)
+    registry.load()
+    assert registry.metrics()["resident"] == []
+
+    registry.get("btts")
+    registry.get("over_2_5")
+    registry.get("btts")
+    registry.get("home_goals_model")
+
+    metrics = registry.metrics()
+    assert metrics["resident"] == ["btts", "home_goals_model"]
+    assert metrics["models"]["over_2_5"]["evictions"] == 1
+    assert metrics["models"]["btts"]["memory_mb"] == pytest.approx(MODEL_MB, rel=0.25)
+    assert metrics["resident_mb"] <= 2.5 * MODEL_MB
+
+    predictions = registry.predict_all(pd.DataFrame({"a": [1, 2]}))
+    assert set(predictions) == set(MODEL_NAMES)
+    assert len(registry.metrics()["resident"]) == 2
+
+
+def test_budget_needs_persisted_models(models_dir):
+    registry = ModelRegistry(str(models_dir), persist=False, lazy=False, memory_budget_mb=MODEL_MB)
+    registry.load()
+
+    assert registry.metrics()["memory_budget_mb"] is None
+    assert len(registry.metrics()["resident"]) == len(MODEL_NAMES)
+
+
+def test_unknown_serving_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("MODEL_SERVING_MODE", "fast")
+    try:
+        with pytest.raises(ValueError, match="full, deploy"):
+            importlib.reload(model_registry)
+    finally:
+        monkeypatch.delenv("MODEL_SERVING_MODE")
+        importlib.reload(model_registry)
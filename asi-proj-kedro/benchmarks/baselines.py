@@ -0,0 +1,98 @@
+"""JSON baselines for the benchmark scripts.
+
+A benchmark produces named metrics; the first run on a machine (or a run with
+--update-baseline) stores them in benchmarks/baselines/<name>.json, later runs
+compare against that file and exit with 1 when a metric regressed by more
+than --tolerance. Baselines depend on the machine, so they are not committed.
+"""
+import argparse
+import json
+import os
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+Metrics = Dict[str, dict]
+
+
+def metric(value: float, unit: str = "s", better: str = "lower") -> dict:
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--baseline-dir', type=Path, default=BASELINE_DIR)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='allowed relative regression per metric, 0.3 = 30%% slower')
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help='ignore time regressions smaller than this many seconds (timer noise)')
+
+
+def regressions(metrics: Metrics, baseline: Metrics, tolerance: float, min_delta: float) -> List[str]:
+    """Metrics worse than the baseline by more than `tolerance`; new metrics are never regressions."""
+    found = []
+    for name, current in metrics.items():
+        previous = baseline.get(name)
+        if previous is None or previous["value"] <= 0:
+            continue
+        value, reference = current["value"], previous["value"]
+        if current["better"] == "lower":
+            regressed = value > reference * (1 + tolerance)
+            if current["unit"] == "s":
+                regressed = regressed and value - reference > min_delta
+        else:
+            regressed = value < reference / (1 + tolerance)
+        if regressed:
+            found.append(f"{name}: {value:.6g} {current['unit']} vs baseline {reference:.6g}")
+    return found
+
+
+def report(name: str, metrics: Metrics, config: dict, args: argparse.Namespace) -> int:
+    """Print the metrics next to the baseline, store or check it; returns the exit code."""
+    path = args.baseline_dir / f"{name}.json"
+    stored = json.loads(path.read_text()) if path.exists() else {}
+    baseline = stored.get("metrics", {})
+    if baseline and stored.get("config") != config and not args.update_baseline:
+        print(f"Baseline {path} was recorded with {stored.get('config')}, not {config} - "
+              f"rerun with --update-baseline")
+        return 1
+
+    for key, current in metrics.items():
+        previous = baseline.get(key)
+        change = ""
+        if previous and previous["value"]:
+            change = f"{(current['value'] / previous['value'] - 1) * 100:+7.1f}%"
+        print(f"{key:<52} {current['value']:>12.6g} {current['unit']:<6} {change}")
+
+    if args.update_baseline or not baseline:
+        args.baseline_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "benchmark": name,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": machine_info(),
+            "config": config,
+            "metrics": metrics,
+        }, indent=2))
+        print(f"Baseline saved to {path}")
+        return 0
+
+    found = regressions(metrics, baseline, args.tolerance, args.min_delta)
+    for line in found:
+        print(f"REGRESSION {line}")
+    return 1 if found else 0
@@ -0,0 +1,112 @@
+"""Per-node benchmark of data_processing and for_traning_preparation on synthetic data.
+
+Generates raw exports for the chosen scale, then runs every node in pipeline
+order, from standardize_column_names to create_goals_features and the team
+feature snapshot, each on the previous node's output, then the serving side of
+the goals features (TeamHistory, one fixture at a time and a batch). The best of --repeat
+runs per node is compared with the JSON baseline for that scale (stored on
+the first run). Exits with 1 on a regression:
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --scale large --repeat 5
+    python benchmarks/bench_pipeline.py --leagues 3 --seasons 4 --teams 16 --update-baseline
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from baselines import Metrics, add_baseline_arguments, metric, report  # noqa: E402
+from synthetic_data import SCALES, make_raw_exports  # noqa: E402
+
+from asi_proj_kedro.goals_features import TeamHistory, fixture_features, fixtures_features  # noqa: E402
+from asi_proj_kedro.pipelines.data_preparation.nodes import (  # noqa: E402
+    enforce_match_schema,
+    merge_datasets,
+    split_match_scores,
+    split_match_statistics,
+    standardize_column_names,
+    standardize_time_column,
+)
+from asi_proj_kedro.pipelines.for_traning_preparation.nodes import (  # noqa: E402
+    build_team_features_snapshot,
+    create_goals_features,
+    prepare_goals_data,
+)
+
+# Upcoming fixtures per serving batch
+FIXTURES = 200
+
+
+def best_time(func: Callable, *inputs, repeat: int, copy: bool = False):
+    """Best wall time of `repeat` calls and the result of the last one."""
+    best = float('inf')
+    for _ in range(repeat):
+        # Nodes that change their input in place get a fresh copy every time
+        args = [data.copy() for data in inputs] if copy else inputs
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(leagues: int, seasons: int, teams: int, repeat: int) -> Metrics:
+    matches_data, match_statistics = make_raw_exports(leagues, seasons, teams)
+    print(f"{len(matches_data):,d} matches: {leagues} leagues, {seasons} seasons, {teams} teams")
+
+    metrics = {}
+
+    def timed(name, func, *inputs, copy=False):
+        seconds, result = best_time(func, *inputs, repeat=repeat, copy=copy)
+        metrics[name] = metric(seconds)
+        return result
+
+    data = timed('standardize_column_names[matches_data]', standardize_column_names, matches_data)
+    statistics = timed('standardize_column_names[match_statistics]', standardize_column_names, match_statistics)
+    data = timed('standardize_time_column', standardize_time_column, data, copy=True)
+    merged = timed('merge_datasets', merge_datasets, data, statistics)
+    separated = timed('split_match_statistics', split_match_statistics, merged)
+    results = timed('split_match_scores', split_match_scores, separated)
+    results = timed('enforce_match_schema', enforce_match_schema, results)
+    prepared = timed('prepare_goals_data', prepare_goals_data, results)
+    timed('create_goals_features', create_goals_features, prepared)
+    timed('build_team_features_snapshot', build_team_features_snapshot, prepared)
+
+    # Serving side - the API builds the same features for upcoming fixtures
+    history = timed('serving.team_history', TeamHistory, results)
+    fixtures = results[['home_team', 'away_team']].head(FIXTURES).reset_index(drop=True)
+    seconds, _ = best_time(lambda: [fixture_features(history, home, away)
+                                    for home, away in fixtures.itertuples(index=False)], repeat=repeat)
+    metrics['serving.fixture_features_per_call'] = metric(seconds / len(fixtures))
+    timed(f'serving.fixtures_features[{len(fixtures)}]', fixtures_features, history, fixtures)
+
+    metrics['total'] = metric(sum(value['value'] for name, value in metrics.items()
+                                  if not name.startswith('serving.')))
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--leagues', type=int)
+    parser.add_argument('--seasons', type=int)
+    parser.add_argument('--teams', type=int)
+    parser.add_argument('--repeat', type=int, default=3)
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    leagues, seasons, teams = SCALES[args.scale]
+    leagues, seasons, teams = args.leagues or leagues, args.seasons or seasons, args.teams or teams
+    config = {'leagues': leagues, 'seasons': seasons, 'teams': teams, 'repeat': args.repeat}
+    metrics = run(leagues, seasons, teams, args.repeat)
+
+    custom = any(value is not None for value in (args.leagues, args.seasons, args.teams))
+    name = f"pipeline_{leagues}x{seasons}x{teams}" if custom else f"pipeline_{args.scale}"
+    return report(name, metrics, config, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Micro-benchmark for data_preparation.nodes.standardize_time_column.
+
+Times the node on synthetic kickoff times from 10k up to 10M rows and checks
+that the cost per row stays flat, i.e. the node scales linearly:
+
+    python benchmarks/bench_standardize_time_column.py
+    python benchmarks/bench_standardize_time_column.py --sizes 10000 1000000 --repeat 5
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from asi_proj_kedro.pipelines.data_preparation.nodes import standardize_time_column
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def make_times(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Kickoff times every minute of the day, with ~1% missing and ~1% malformed values."""
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(0, 24 * 60, n_rows)
+    times = pd.Series([f"{h:02d}:{m:02d}" for h in range(24) for m in range(60)], dtype=object).to_numpy()[minutes]
+    noise = rng.random(n_rows)
+    times[noise < 0.01] = None
+    times[(noise >= 0.01) & (noise < 0.02)] = "TBA"
+    return pd.DataFrame({'time': times})
+
+
+def measure(n_rows: int, repeat: int) -> float:
+    """Best wall time of `repeat` runs, in seconds."""
+    data = make_times(n_rows)
+    best = float('inf')
+    for _ in range(repeat):
+        df = data.copy()
+        start = time.perf_counter()
+        standardize_time_column(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-slowdown', type=float, default=2.0,
+                        help='fail if ns/row at the largest size exceeds this multiple of the 100k+ baseline')
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in sorted(args.sizes):
+        seconds = measure(n_rows, args.repeat)
+        results.append((n_rows, seconds))
+        print(f"{n_rows:>12,d} rows  {seconds:9.4f} s  {seconds / n_rows * 1e9:8.1f} ns/row")
+
+    # Small inputs are dominated by fixed overhead, so the baseline is the first size >= 100k
+    scaled = [(n, s) for n, s in results if n >= 100_000] or results
+    baseline = scaled[0][1] / scaled[0][0]
+    largest = results[-1][1] / results[-1][0]
+    slowdown = largest / baseline
+    print(f"ns/row at {results[-1][0]:,d} rows vs {scaled[0][0]:,d} rows: x{slowdown:.2f}")
+
+    if slowdown > args.max_slowdown:
+        print(f"FAIL: per-row cost grew more than x{args.max_slowdown}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Synthetic raw exports shaped like data/01_raw/matches_data.csv and match_statistics.csv.
+
+Every league plays a double round robin each season, so the number of matches
+is leagues * seasons * teams * (teams - 1). Match ids grow with the match date
+and rows are written newest first, like the real exports.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from asi_proj_kedro.pipelines.data_preparation.nodes import STATS_COLUMNS
+
+# leagues, seasons, teams per league
+SCALES = {
+    'small': (2, 3, 12),
+    'medium': (4, 8, 18),
+    'large': (10, 20, 20),
+}
+
+# Raw header of every stat column, e.g. 'attempts_on_goal' -> 'Attempts On Goal'
+STAT_HEADERS = {col: col.replace('_', ' ').title() for col in STATS_COLUMNS}
+STAT_RANGES = {'attacks': (40, 140), 'dangerous_attacks': (20, 90), 'throw_ins': (10, 35), 'fauls': (5, 20)}
+
+
+def _pair(home: np.ndarray, away: np.ndarray, sep: str) -> np.ndarray:
+    return np.char.add(np.char.add(home.astype(str), sep), away.astype(str)).astype(object)
+
+
+def make_raw_exports(leagues: int, seasons: int, teams: int, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (matches_data, match_statistics) with raw column names."""
+    rng = np.random.default_rng(seed)
+    home_index, away_index = np.nonzero(~np.eye(teams, dtype=bool))
+    per_season = len(home_index)
+    rounds = 2 * (teams - 1)
+
+    blocks = []
+    for league in range(leagues):
+        names = np.array([f"L{league} Team {team}" for team in range(teams)])
+        for season in range(seasons):
+            order = rng.permutation(per_season)
+            match_round = np.arange(per_season) * rounds // per_season
+            blocks.append(pd.DataFrame({
+                'League': f"League {league}",
+                'Date': pd.Timestamp(2000 + season, 8, 1) + pd.to_timedelta(7 * match_round, unit='D'),
+                'Home Team': names[home_index[order]],
+                'Away Team': names[away_index[order]],
+            }))
+    matches = pd.concat(blocks, ignore_index=True).sort_values(['Date', 'League'], kind='stable', ignore_index=True)
+    n_matches = len(matches)
+
+    matches['Match ID'] = 100000 + np.arange(n_matches)
+    matches['Time'] = rng.choice(['12:30', '15:00', '15:29', '17:30', '20:44', None], n_matches)
+    home_goals = rng.poisson(1.5, n_matches)
+    away_goals = rng.poisson(1.2, n_matches)
+    matches['Full Time Score'] = _pair(home_goals, away_goals, ' - ')
+    matches['Half Time Score'] = _pair(rng.binomial(home_goals, 0.45), rng.binomial(away_goals, 0.45), ' - ')
+
+    statistics = pd.DataFrame({'Match ID': rng.permutation(matches['Match ID'].to_numpy())})
+    for col, header in STAT_HEADERS.items():
+        if col == 'possesion':
+            home = rng.integers(30, 71, n_matches)
+            values = _pair(home, 100 - home, ':')
+        else:
+            low, high = STAT_RANGES.get(col, (0, 12))
+            values = _pair(rng.integers(low, high, n_matches), rng.integers(low, high, n_matches), ':')
+        values[rng.random(n_matches) < 0.02] = None
+        statistics[header] = values
+
+    matches_data = matches[['Date', 'Home Team', 'Away Team', 'Time', 'Match ID', 'League',
+                            'Full Time Score', 'Half Time Score']].iloc[::-1].reset_index(drop=True)
+    matches_data['Date'] = matches_data['Date'].dt.strftime('%Y-%m-%d')
+    return matches_data, statistics
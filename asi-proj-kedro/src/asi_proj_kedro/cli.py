@@ -0,0 +1,41 @@
+"""Project commands: `kedro run` with the node cache.
+
+Same options as Kedro's own `run`, plus:
+- `--invalidate-cache` reruns every node and stores fresh cache entries;
+- `--no-cache` runs without looking at or updating the cache.
+
+Without `--runner` the pipeline runs on `CachedSequentialRunner`.
+"""
+import click
+from kedro.framework.cli.project import run as kedro_run
+
+CACHED_RUNNER = "asi_proj_kedro.runner.CachedSequentialRunner"
+
+
+@click.group(name="asi_proj_kedro")
+def cli():
+    """Command line tools for the asi_proj_kedro project."""
+
+
+@cli.command(
+    name="run",
+    params=[
+        *kedro_run.params,
+        click.Option(["--invalidate-cache"], is_flag=True, help="Rerun every node and refresh the node cache."),
+        click.Option(["--no-cache"], is_flag=True, help="Run without the node cache."),
+    ],
+    help=kedro_run.help,
+)
+@click.pass_context
+def run(ctx, invalidate_cache: bool, no_cache: bool, **kwargs):
+    params = dict(kwargs.get("params") or {})
+    node_cache = dict(params.get("node_cache") or {})
+    if invalidate_cache:
+        node_cache["invalidate"] = True
+    if no_cache:
+        node_cache["enabled"] = False
+    if node_cache:
+        params["node_cache"] = node_cache
+    kwargs["params"] = params
+    kwargs["runner"] = kwargs.get("runner") or CACHED_RUNNER
+    return ctx.invoke(kedro_run.callback, **kwargs)
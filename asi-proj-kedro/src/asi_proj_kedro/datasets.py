@@ -0,0 +1,64 @@
+"""
+Własne typy datasetów katalogu
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from kedro.io import AbstractDataset
+from kedro_datasets.partitions import PartitionedDataset
+
+logger = logging.getLogger(__name__)
+
+
+class OptionalDataset(AbstractDataset):
+    """Another dataset that loads as None while its data does not exist.
+
+    Used for the outputs of an earlier run read back as inputs (`*_previous`),
+    so a first run, or one after the files were removed, reaches the node:
+
+        goals_features_state_previous:
+          type: asi_proj_kedro.datasets.OptionalDataset
+          dataset:
+            type: pickle.PickleDataset
+            filepath: data/05_final_data/goals_features_state.pkl
+    """
+
+    def __init__(self, dataset: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
+        self._dataset = AbstractDataset.from_config("optional", dataset)
+        self.metadata = metadata
+
+    def load(self) -> Any:
+        if not self._dataset.exists():
+            logger.info(f"Brak danych {self._dataset}, wczytano None")
+            return None
+        return self._dataset.load()
+
+    def save(self, data: Any) -> None:
+        self._dataset.save(data)
+
+    def _exists(self) -> bool:
+        return self._dataset.exists()
+
+    def _describe(self) -> Dict[str, Any]:
+        # Opis datasetu w środku - ścieżka pliku dla cache węzłów
+        return self._dataset._describe()
+
+
+class StreamedPartitionedDataset(PartitionedDataset):
+    """PartitionedDataset for a node that yields its partitions one by one.
+
+    Kedro saves every yielded dict on its own, so `overwrite: true` would leave
+    only the last one. This dataset removes the partitions of an earlier run
+    once, before the first save, so stale ones are not read with the new ones.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._cleared = False
+
+    def save(self, data: Dict[str, Any]) -> None:
+        if not self._cleared and self._filesystem.exists(self._normalized_path):
+            self._filesystem.rm(self._normalized_path, recursive=True)
+            logger.info(f"Usunięto poprzednie partycje z {self._path}")
+        self._cleared = True
+        super().save(data)
@@ -0,0 +1,588 @@
+"""
+Cechy do przewidywania goli - wspólne dla pipeline'u treningowego i API
+
+Training calls the batch functions (`calculate_attacking_stats`,
+`calculate_goals_h2h`) on the whole match table: every match gets the stats of
+the matches played strictly before it. Serving builds the features of one or
+many fixtures from the current state, either a `TeamHistory` of all matches or
+a precomputed `TeamFeatureSnapshot`; `fixture_features` and
+`fixtures_features` produce the same columns as training.
+
+Matches are ordered by `match_date` if present, otherwise by `date`, otherwise
+by the index. Only pandas and numpy are needed, so the API imports this module
+without Kedro.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from asi_proj_kedro.match_schema import shared_team_codes
+
+N_MATCHES = 5
+H2H_MATCHES = 10
+DEFAULT_LEAGUE_AVG_GOALS = 2.5
+
+TEAM_STAT_COLUMNS = [
+    'goals_scored', 'goals_conceded', 'avg_goals_scored', 'avg_goals_conceded', 'matches_played',
+    'clean_sheets', 'failed_to_score', 'high_scoring_games', 'clean_sheet_rate', 'fail_to_score_rate',
+    'high_scoring_rate',
+]
+H2H_STAT_COLUMNS = ['h2h_avg_total_goals', 'h2h_over_2_5_rate', 'h2h_btts_rate', 'h2h_matches']
+
+EMPTY_TEAM_STATS = {column: 0 for column in TEAM_STAT_COLUMNS}
+EMPTY_H2H_STATS = {
+    'h2h_avg_total_goals': 2.5,  # Liga average
+    'h2h_over_2_5_rate': 0.5,
+    'h2h_btts_rate': 0.5,
+    'h2h_matches': 0
+}
+
+EMPTY = np.empty(0, dtype=np.float64)
+
+
+def score_columns(data: pd.DataFrame) -> Tuple[str, str]:
+    """Kolumny goli: `home_goals` / `away_goals` po przygotowaniu, `full_time_score_*` w bazie meczów"""
+    if 'home_goals' in data.columns:
+        return 'home_goals', 'away_goals'
+    return 'full_time_score_home', 'full_time_score_away'
+
+
+def match_order_keys(df: pd.DataFrame) -> np.ndarray:
+    """Kolejność meczów: match_date, date albo indeks (jako ranga) - mecze z tego samego dnia są równe"""
+    if 'match_date' in df.columns:
+        keys = df['match_date']
+    elif 'date' in df.columns:
+        keys = pd.to_datetime(df['date'])
+    else:
+        keys = df.index.to_series()
+    return keys.rank(method='dense').to_numpy()
+
+
+def match_tiebreak_keys(df: pd.DataFrame) -> np.ndarray:
+    """Kolejność meczów z tego samego dnia: match_id, potem kolejność wierszy - jak w `TeamHistory`"""
+    if 'match_id' in df.columns:
+        return df['match_id'].rank(method='first').to_numpy()
+    return np.arange(len(df), dtype=np.float64)
+
+
+def pair_key(home_team: str, away_team: str) -> Tuple[str, str]:
+    """Para drużyn niezależnie od tego, kto gra u siebie"""
+    return min(home_team, away_team), max(home_team, away_team)
+
+
+# ========== TRENING: CECHY KAŻDEGO MECZU Z MECZÓW WCZEŚNIEJSZYCH ==========
+
+def _prior_window(group_codes: np.ndarray, order_keys: np.ndarray, tiebreak_keys: np.ndarray, n_matches: int):
+    """Okno ostatnich `n_matches` wpisów grupy, ściśle wcześniejszych niż dany wpis
+
+    Returns the sorter putting entries in (group, order, tiebreak) order and, in
+    sorted positions, the [start, end) bounds of every entry's window. Entries
+    with the same order key (e.g. the same match_date) are never in each other's
+    window; the tiebreak key decides which of them a later window keeps when it
+    ends among them. Entries with a missing group (code -1) get an empty window.
+    """
+    sorter = np.lexsort((tiebreak_keys, order_keys, group_codes))
+    codes = group_codes[sorter]
+    keys = order_keys[sorter]
+
+    positions = np.arange(len(codes))
+    new_group = np.r_[True, codes[1:] != codes[:-1]]
+    new_key = new_group | np.r_[True, keys[1:] != keys[:-1]]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0))
+    # Koniec okna: pierwszy wpis z tym samym kluczem w grupie
+    end = np.maximum.accumulate(np.where(new_key, positions, 0))
+    start = np.maximum(end - n_matches, group_start)
+    start = np.where(codes < 0, end, start)
+    return sorter, start, end
+
+
+def _window_sum(values: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Suma wartości w oknach [start, end) przez sumy prefiksowe, NaN jeśli okno zawiera NaN"""
+    if values.dtype.kind in 'iub':
+        cumulative = np.r_[0, np.cumsum(values, dtype=np.int64)]
+        return cumulative[end] - cumulative[start]
+
+    missing = np.isnan(values)
+    cumulative = np.r_[0.0, np.cumsum(np.where(missing, 0.0, values))]
+    missing_count = np.r_[0, np.cumsum(missing)]
+    sums = cumulative[end] - cumulative[start]
+    return np.where(missing_count[end] - missing_count[start] > 0, np.nan, sums)
+
+
+def calculate_attacking_stats(df: pd.DataFrame, n_matches: int = N_MATCHES) -> tuple:
+    """Statystyki ofensywne i defensywne obu drużyn z ostatnich `n_matches` meczów
+
+    The matches are reshaped into a long table with one entry per (team, match)
+    and every entry gets the aggregates of the team's previous `n_matches`
+    entries. Returns (home_stats, away_stats) frames aligned with `df`.
+    """
+    n_rows = len(df)
+    home_column, away_column = score_columns(df)
+    home_team = df['home_team'].to_numpy()
+    away_team = df['away_team'].to_numpy()
+    home_goals = df[home_column].to_numpy()
+    away_goals = df[away_column].to_numpy()
+    order_keys = match_order_keys(df)
+    tiebreak_keys = match_tiebreak_keys(df)
+
+    # Mecz drużyny z samą sobą liczy się raz, z perspektywy gospodarza
+    not_self = home_team != away_team
+    away_rows = np.flatnonzero(not_self)
+    shared = shared_team_codes(df)
+    if shared is not None:
+        # Kategorie ze wspólnym słownikiem drużyn - kody zamiast porównywania nazw
+        home_codes, away_codes, _ = shared
+        team_codes = np.concatenate([home_codes, away_codes[not_self]])
+    else:
+        team_codes, _ = pd.factorize(np.concatenate([home_team, away_team[not_self]]))
+    team_goals = np.concatenate([home_goals, away_goals[not_self]])
+    opponent_goals = np.concatenate([away_goals, home_goals[not_self]])
+    entry_keys = np.concatenate([order_keys, order_keys[not_self]])
+    entry_tiebreak_keys = np.concatenate([tiebreak_keys, tiebreak_keys[not_self]])
+
+    sorter, start, end = _prior_window(team_codes, entry_keys, entry_tiebreak_keys, n_matches)
+    team_goals = team_goals[sorter]
+    opponent_goals = opponent_goals[sorter]
+    with np.errstate(invalid='ignore'):
+        clean_sheet = (opponent_goals == 0).astype(np.int64)
+        failed_to_score = (team_goals == 0).astype(np.int64)
+        high_scoring = (team_goals + opponent_goals >= 3).astype(np.int64)
+
+    matches_played = end - start
+    goals_scored = _window_sum(team_goals, start, end)
+    goals_conceded = _window_sum(opponent_goals, start, end)
+    clean_sheets = _window_sum(clean_sheet, start, end)
+    failed = _window_sum(failed_to_score, start, end)
+    high = _window_sum(high_scoring, start, end)
+
+    played = np.where(matches_played > 0, matches_played, 1)
+    no_matches = matches_played == 0
+    entry_stats = pd.DataFrame({
+        'goals_scored': goals_scored,
+        'goals_conceded': goals_conceded,
+        'avg_goals_scored': np.where(no_matches, 0.0, goals_scored / played),
+        'avg_goals_conceded': np.where(no_matches, 0.0, goals_conceded / played),
+        'matches_played': matches_played,
+        'clean_sheets': clean_sheets,
+        'failed_to_score': failed,
+        'high_scoring_games': high,
+        'clean_sheet_rate': np.where(no_matches, 0.0, clean_sheets / played),
+        'fail_to_score_rate': np.where(no_matches, 0.0, failed / played),
+        'high_scoring_rate': np.where(no_matches, 0.0, high / played),
+    })
+    if no_matches.all():
+        # Bez żadnej historii wszystkie statystyki to całkowite zera
+        entry_stats = entry_stats.astype(np.int64)
+    # Z powrotem do kolejności wpisów: najpierw gospodarze, potem goście
+    entry_position = np.empty(len(sorter), dtype=np.int64)
+    entry_position[sorter] = np.arange(len(sorter))
+    away_entry = np.arange(n_rows)  # mecz z samym sobą - statystyki wpisu gospodarza
+    away_entry[away_rows] = n_rows + np.arange(len(away_rows))
+
+    home_stats = entry_stats.iloc[entry_position[:n_rows]].reset_index(drop=True)
+    away_stats = entry_stats.iloc[entry_position[away_entry]].reset_index(drop=True)
+    return home_stats, away_stats
+
+
+def calculate_goals_h2h(df: pd.DataFrame, n_matches: int = H2H_MATCHES) -> pd.DataFrame:
+    """Statystyki goli w ostatnich `n_matches` meczach head-to-head, aligned with `df`"""
+    home_column, away_column = score_columns(df)
+    home_goals = df[home_column].to_numpy()
+    away_goals = df[away_column].to_numpy()
+
+    # Para drużyn niezależnie od tego, kto gra u siebie
+    shared = shared_team_codes(df)
+    if shared is not None:
+        home_codes, away_codes, n_teams = shared
+        pair_codes, _ = pd.factorize(np.minimum(home_codes, away_codes) * n_teams
+                                     + np.maximum(home_codes, away_codes))
+    else:
+        home_team = df['home_team'].astype(str).to_numpy()
+        away_team = df['away_team'].astype(str).to_numpy()
+        home_first = home_team <= away_team
+        first_team = np.where(home_first, home_team, away_team)
+        second_team = np.where(home_first, away_team, home_team)
+        pair_codes, _ = pd.factorize(pd.MultiIndex.from_arrays([first_team, second_team]))
+    pair_codes[(df['home_team'].isna() | df['away_team'].isna()).to_numpy()] = -1
+
+    sorter, start, end = _prior_window(pair_codes, match_order_keys(df), match_tiebreak_keys(df), n_matches)
+    home_goals = home_goals[sorter]
+    away_goals = away_goals[sorter]
+    total_goals = home_goals + away_goals
+    with np.errstate(invalid='ignore'):
+        over_2_5 = (total_goals > 2.5).astype(np.int64)
+        btts = ((home_goals > 0) & (away_goals > 0)).astype(np.int64)
+
+    matches_count = end - start
+    no_matches = matches_count == 0
+    played = np.where(no_matches, 1, matches_count)
+    pair_stats = pd.DataFrame({
+        'h2h_avg_total_goals': np.where(no_matches, 2.5, _window_sum(total_goals, start, end) / played),  # Liga average
+        'h2h_over_2_5_rate': np.where(no_matches, 0.5, _window_sum(over_2_5, start, end) / played),
+        'h2h_btts_rate': np.where(no_matches, 0.5, _window_sum(btts, start, end) / played),
+        'h2h_matches': matches_count,
+    })
+
+    entry_position = np.empty(len(sorter), dtype=np.int64)
+    entry_position[sorter] = np.arange(len(sorter))
+    return pair_stats.iloc[entry_position].reset_index(drop=True)
+
+
+# ========== CECHY KOMBINOWANE - TE SAME W TRENINGU I W API ==========
+
+def add_combined_features(features, n_matches: int = N_MATCHES):
+    """Kombinowane cechy ofensywno-defensywne
+
+    `features` is a single feature dict or a DataFrame with one row per match.
+    """
+    home_avg_scored = features[f'home_avg_goals_scored_last{n_matches}']
+    away_avg_scored = features[f'away_avg_goals_scored_last{n_matches}']
+
+    # Potencjał strzelecki meczu
+    features['expected_goals_home'] = home_avg_scored
+    features['expected_goals_away'] = away_avg_scored
+    features['expected_total_goals'] = home_avg_scored + away_avg_scored
+
+    # Defensywna solidność
+    features['defensive_strength_home'] = 1 / (features[f'home_avg_goals_conceded_last{n_matches}'] + 0.1)
+    features['defensive_strength_away'] = 1 / (features[f'away_avg_goals_conceded_last{n_matches}'] + 0.1)
+
+    # Różnica w sile ofensywnej
+    features['attacking_advantage'] = home_avg_scored - away_avg_scored
+
+    # Prawdopodobieństwo wysokowydajnego meczu
+    features['high_scoring_tendency'] = (features[f'home_high_scoring_rate_last{n_matches}'] +
+                                         features[f'away_high_scoring_rate_last{n_matches}']) / 2
+
+    # Solidność defensywna obu drużyn
+    features['defensive_solidity'] = (features[f'home_clean_sheet_rate_last{n_matches}'] +
+                                      features[f'away_clean_sheet_rate_last{n_matches}'])
+
+    # Tendencja do bramek / brak bramek
+    features['btts_likelihood'] = 1 - (features[f'home_fail_to_score_rate_last{n_matches}'] +
+                                       features[f'away_fail_to_score_rate_last{n_matches}'])
+    return features
+
+
+def add_league_avg_features(features, league_avg_goals):
+    """Średnia ligowa i odchylenie od niej - `league_avg_goals` to liczba albo Series"""
+    features['league_avg_goals'] = league_avg_goals
+    features['goals_vs_league_avg'] = features['expected_total_goals'] - league_avg_goals
+    return features
+
+
+def add_league_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Cechy ligowe w treningu - średnia liczona po wszystkich meczach w `df`"""
+    return add_league_avg_features(df, overall_avg_goals(df))
+
+
+def overall_avg_goals(data: pd.DataFrame) -> float:
+    """Średnia ligowa w treningu i serwowaniu: ogólna średnia goli wszystkich meczów
+
+    prepare_goals_data does not keep `league`, so training has always used the
+    overall average. Training, `TeamHistory` and the snapshot all use this one
+    rule, whether or not `data` has a `league` column.
+    """
+    if 'total_goals' in data.columns:
+        total_goals = data['total_goals']
+    else:
+        home_column, away_column = score_columns(data)
+        total_goals = data[home_column] + data[away_column]
+    return float(total_goals.mean()) if total_goals.notna().any() else DEFAULT_LEAGUE_AVG_GOALS
+
+
+# ========== SERWOWANIE: CECHY MECZÓW PO OSTATNIM ZNANYM MECZU ==========
+
+def _goals_array(goals: pd.Series) -> np.ndarray:
+    # Nullable columns from Parquet become plain numpy arrays, NaN only if goals are missing
+    if goals.isna().any():
+        return goals.to_numpy(dtype=np.float64, na_value=np.nan)
+    return goals.to_numpy(dtype=np.int64)
+
+
+def _group_arrays(keys: np.ndarray, order: np.ndarray, first: np.ndarray, second: np.ndarray):
+    # Stable sort by key, then by date order inside every key
+    codes, uniques = pd.factorize(keys)
+    sorter = np.lexsort((order, codes))
+    codes = codes[sorter]
+    first = first[sorter]
+    second = second[sorter]
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(codes)]])
+    return {
+        uniques[codes[start]]: (first[start:end], second[start:end])
+        for start, end in zip(starts, ends)
+    }
+
+
+class TeamHistory:
+    """Columnar, in-memory view of all played matches.
+
+    Every team maps to arrays of goals-for / goals-against and every team pair
+    to arrays of home-side / away-side goals, all sorted by match date, so a
+    last-N window is a plain slice from the end of the array.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self._league_avg_goals = overall_avg_goals(data)
+
+        sort_columns = ['date', 'match_id'] if 'match_id' in data.columns else ['date']
+        matches = data.sort_values(sort_columns, kind='stable')
+        home_column, away_column = score_columns(matches)
+        home_team = matches['home_team'].to_numpy()
+        away_team = matches['away_team'].to_numpy()
+        home_goals = _goals_array(matches[home_column])
+        away_goals = _goals_array(matches[away_column])
+
+        # Long per-team table: one entry per (team, match), a team playing itself counts once
+        not_self = home_team != away_team
+        long_team = np.concatenate([home_team, away_team[not_self]])
+        long_for = np.concatenate([home_goals, away_goals[not_self]])
+        long_against = np.concatenate([away_goals, home_goals[not_self]])
+        long_order = np.concatenate([np.arange(len(matches)), np.flatnonzero(not_self)])
+        self._team_goals = _group_arrays(long_team, long_order, long_for, long_against)
+
+        # Pair key is order independent, goals stay on the home / away side of each match
+        home_name = home_team.astype(str)
+        away_name = away_team.astype(str)
+        home_first = home_name <= away_name
+        pair_keys = pd.Series(list(zip(np.where(home_first, home_name, away_name),
+                                       np.where(home_first, away_name, home_name))))
+        pair_codes, pair_uniques = pd.factorize(pair_keys)
+        grouped = _group_arrays(pair_codes, np.arange(len(matches)), home_goals, away_goals)
+        self._pair_goals = {pair_uniques[code]: arrays for code, arrays in grouped.items()}
+
+    @property
+    def teams(self):
+        return list(self._team_goals.keys())
+
+    def team_window(self, team: str, n_matches: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Goals for and against in the last `n_matches` of a team."""
+        goals_for, goals_against = self._team_goals.get(team, (EMPTY, EMPTY))
+        start = max(len(goals_for) - n_matches, 0)
+        return goals_for[start:], goals_against[start:]
+
+    def h2h_window(self, home_team: str, away_team: str, n_matches: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Home-side and away-side goals in the last `n_matches` between two teams."""
+        home_goals, away_goals = self._pair_goals.get(pair_key(home_team, away_team), (EMPTY, EMPTY))
+        start = max(len(home_goals) - n_matches, 0)
+        return home_goals[start:], away_goals[start:]
+
+    def team_stats(self, team: str, n_matches: int = N_MATCHES) -> dict:
+        """Statystyki ofensywne i defensywne drużyny"""
+
+        # Ostatnie mecze drużyny
+        team_goals, opponent_goals = self.team_window(team, n_matches)
+
+        if len(team_goals) == 0:
+            return dict(EMPTY_TEAM_STATS)
+
+        goals_scored = team_goals.sum()
+        goals_conceded = opponent_goals.sum()
+        clean_sheets = int((opponent_goals == 0).sum())
+        failed_to_score = int((team_goals == 0).sum())
+        high_scoring = int((team_goals + opponent_goals >= 3).sum())
+
+        matches_played = len(team_goals)
+        return {
+            'goals_scored': goals_scored,
+            'goals_conceded': goals_conceded,
+            'avg_goals_scored': goals_scored / matches_played,
+            'avg_goals_conceded': goals_conceded / matches_played,
+            'matches_played': matches_played,
+            'clean_sheets': clean_sheets,
+            'failed_to_score': failed_to_score,
+            'high_scoring_games': high_scoring,
+            'clean_sheet_rate': clean_sheets / matches_played,
+            'fail_to_score_rate': failed_to_score / matches_played,
+            'high_scoring_rate': high_scoring / matches_played
+        }
+
+    def h2h_stats(self, home_team: str, away_team: str, n_matches: int = H2H_MATCHES) -> dict:
+        """Statystyki goli w meczach head-to-head"""
+
+        # Ostatnie mecze head-to-head
+        home_goals, away_goals = self.h2h_window(home_team, away_team, n_matches)
+
+        if len(home_goals) == 0:
+            return dict(EMPTY_H2H_STATS)
+
+        total_goals = home_goals + away_goals
+        matches_count = len(total_goals)
+        return {
+            'h2h_avg_total_goals': np.mean(total_goals),
+            'h2h_over_2_5_rate': int((total_goals > 2.5).sum()) / matches_count,
+            'h2h_btts_rate': int(((home_goals > 0) & (away_goals > 0)).sum()) / matches_count,
+            'h2h_matches': matches_count
+        }
+
+    def league_avg_goals(self, team: str) -> float:
+        return self._league_avg_goals
+
+
+class TeamFeatureSnapshot:
+    """Precomputed current features: one entry per team and one per team pair.
+
+    Built from the tables of `build_team_features_snapshot`. Answers the same
+    lookups as `TeamHistory`, but only for the window sizes it was built with.
+    """
+
+    def __init__(self, team_snapshot: pd.DataFrame, pair_snapshot: pd.DataFrame,
+                 n_matches: int = N_MATCHES, h2h_matches: int = H2H_MATCHES):
+        self.n_matches = n_matches
+        self.h2h_matches = h2h_matches
+        self.team_table = team_snapshot.set_index('team')[TEAM_STAT_COLUMNS]
+        self.pair_table = pair_snapshot.set_index(['first_team', 'second_team'])[H2H_STAT_COLUMNS]
+        self._team_stats: Dict[str, dict] = self.team_table.to_dict(orient='index')
+        self._pair_stats: Dict[Tuple[str, str], dict] = self.pair_table.to_dict(orient='index')
+        self._league_avg_goals: Dict[str, float] = team_snapshot.set_index('team')['league_avg_goals'].to_dict()
+        self._default_league_avg_goals = (float(team_snapshot['overall_avg_goals'].iloc[0])
+                                          if len(team_snapshot) else DEFAULT_LEAGUE_AVG_GOALS)
+
+    def team_stats(self, team: str, n_matches: int = N_MATCHES) -> dict:
+        if n_matches != self.n_matches:
+            raise ValueError(f"Snapshot was built for {self.n_matches} matches, not {n_matches}")
+        return self._team_stats.get(team, EMPTY_TEAM_STATS)
+
+    def h2h_stats(self, home_team: str, away_team: str, n_matches: int = H2H_MATCHES) -> dict:
+        if n_matches != self.h2h_matches:
+            raise ValueError(f"Snapshot was built for {self.h2h_matches} H2H matches, not {n_matches}")
+        return self._pair_stats.get(pair_key(home_team, away_team), EMPTY_H2H_STATS)
+
+    def league_avg_goals(self, team: str) -> float:
+        return self._league_avg_goals.get(team, self._default_league_avg_goals)
+
+
+def _snapshot_sum(values: pd.Series, groups) -> pd.Series:
+    # Brakujący wynik w oknie daje NaN, jak w TeamHistory
+    sums = values.groupby(groups, sort=False, observed=True).sum()
+    missing = values.isna().groupby(groups, sort=False, observed=True).any()
+    return sums.mask(missing)
+
+
+def build_team_features_snapshot(data: pd.DataFrame, n_matches: int = N_MATCHES,
+                                 h2h_matches: int = H2H_MATCHES) -> tuple:
+    """
+    Aktualny stan cech dla API: ostatnie `n_matches` meczów każdej drużyny i `h2h_matches` każdej pary
+
+    Returns a table keyed by team and a table keyed by the (first_team,
+    second_team) pair in sorted name order. Windows end at the latest match,
+    matches are ordered by date and match_id like in `TeamHistory`.
+    """
+    sort_columns = ['date', 'match_id'] if 'match_id' in data.columns else ['date']
+    matches = data.sort_values(sort_columns, kind='stable').reset_index(drop=True)
+    home_column, away_column = score_columns(matches)
+    home_goals = matches[home_column].astype('float64')
+    away_goals = matches[away_column].astype('float64')
+
+    # Jeden wiersz na (drużyna, mecz), mecz drużyny z samą sobą liczony raz
+    not_self = matches['home_team'] != matches['away_team']
+    long = pd.concat([
+        pd.DataFrame({'team': matches['home_team'], 'scored': home_goals, 'conceded': away_goals,
+                      'order': matches.index}),
+        pd.DataFrame({'team': matches['away_team'], 'scored': away_goals, 'conceded': home_goals,
+                      'order': matches.index})[not_self],
+    ]).sort_values('order', kind='stable')
+    last = long.groupby('team', sort=False, observed=True).tail(n_matches)
+    last = last.assign(total=last['scored'] + last['conceded'])
+    groups = last['team']
+
+    team_snapshot = pd.DataFrame({
+        'goals_scored': _snapshot_sum(last['scored'], groups),
+        'goals_conceded': _snapshot_sum(last['conceded'], groups),
+        'matches_played': groups.groupby(groups, sort=False, observed=True).size(),
+        'clean_sheets': (last['conceded'] == 0).groupby(groups, sort=False, observed=True).sum(),
+        'failed_to_score': (last['scored'] == 0).groupby(groups, sort=False, observed=True).sum(),
+        'high_scoring_games': (last['total'] >= 3).groupby(groups, sort=False, observed=True).sum(),
+    })
+    matches_played = team_snapshot['matches_played']
+    team_snapshot['avg_goals_scored'] = team_snapshot['goals_scored'] / matches_played
+    team_snapshot['avg_goals_conceded'] = team_snapshot['goals_conceded'] / matches_played
+    team_snapshot['clean_sheet_rate'] = team_snapshot['clean_sheets'] / matches_played
+    team_snapshot['fail_to_score_rate'] = team_snapshot['failed_to_score'] / matches_played
+    team_snapshot['high_scoring_rate'] = team_snapshot['high_scoring_games'] / matches_played
+
+    # Średnia ligowa - ogólna średnia, jak w treningu
+    team_snapshot['league_avg_goals'] = team_snapshot['overall_avg_goals'] = overall_avg_goals(data)
+    team_snapshot.index.name = 'team'
+    team_snapshot = team_snapshot.reset_index()
+
+    # Para drużyn niezależna od kolejności, gole zostają po stronie gospodarzy / gości meczu
+    home_team = matches['home_team'].astype(str)
+    away_team = matches['away_team'].astype(str)
+    pairs = pd.DataFrame({
+        'first_team': np.where(home_team <= away_team, home_team, away_team),
+        'second_team': np.where(home_team <= away_team, away_team, home_team),
+        'total': home_goals + away_goals,
+        'btts': (home_goals > 0) & (away_goals > 0),
+    })
+    last_pairs = pairs.groupby(['first_team', 'second_team'], sort=False).tail(h2h_matches)
+    pair_groups = [last_pairs['first_team'], last_pairs['second_team']]
+    h2h_matches_count = last_pairs.groupby(pair_groups, sort=False).size()
+    pair_snapshot = pd.DataFrame({
+        'h2h_avg_total_goals': _snapshot_sum(last_pairs['total'], pair_groups) / h2h_matches_count,
+        'h2h_over_2_5_rate': (last_pairs['total'] > 2.5).groupby(pair_groups, sort=False).sum() / h2h_matches_count,
+        'h2h_btts_rate': last_pairs['btts'].groupby(pair_groups, sort=False).sum() / h2h_matches_count,
+        'h2h_matches': h2h_matches_count,
+    }).reset_index()
+
+    return team_snapshot, pair_snapshot
+
+
+def fixture_features(source, home_team: str, away_team: str,
+                     n_matches: int = N_MATCHES, h2h_matches: int = H2H_MATCHES) -> dict:
+    """Cechy jednego meczu - `source` to TeamHistory albo TeamFeatureSnapshot"""
+
+    # Budowanie słownika wynikowego
+    result = {
+        'home_team': home_team,
+        'away_team': away_team,
+
+        # Statystyki drużyny domowej
+        **{f'home_{key}_last{n_matches}': value for key, value in source.team_stats(home_team, n_matches).items()},
+
+        # Statystyki drużyny gości
+        **{f'away_{key}_last{n_matches}': value for key, value in source.team_stats(away_team, n_matches).items()},
+    }
+    result = add_combined_features(result, n_matches)
+
+    # Statystyki head-to-head
+    result.update(source.h2h_stats(home_team, away_team, h2h_matches))
+
+    # Średnia ligowa (liga z pierwszego meczu domowego drużyny)
+    return add_league_avg_features(result, source.league_avg_goals(home_team))
+
+
+def fixtures_features(source, fixtures: pd.DataFrame,
+                      n_matches: int = N_MATCHES, h2h_matches: int = H2H_MATCHES) -> pd.DataFrame:
+    """Cechy dla całej listy meczów - one row per fixture, same columns as `fixture_features`.
+
+    Every team and every pair is looked up once, however many fixtures share it,
+    and the combined features are computed column-wise over the whole frame.
+    """
+    home_team = fixtures['home_team'].reset_index(drop=True)
+    away_team = fixtures['away_team'].reset_index(drop=True)
+    teams = pd.unique(pd.concat([home_team, away_team]))
+    pairs = pd.MultiIndex.from_arrays([home_team, away_team])
+
+    team_stats = pd.DataFrame.from_dict(
+        {team: source.team_stats(team, n_matches) for team in teams}, orient='index'
+    )
+    h2h_stats = pd.DataFrame.from_dict(
+        {pair: source.h2h_stats(pair[0], pair[1], h2h_matches) for pair in pairs.unique()}, orient='index'
+    )
+    h2h_stats.index = pd.MultiIndex.from_tuples(h2h_stats.index)
+
+    result = pd.concat([
+        pd.DataFrame({'home_team': home_team, 'away_team': away_team}),
+        team_stats.reindex(home_team).reset_index(drop=True).rename(columns=lambda key: f'home_{key}_last{n_matches}'),
+        team_stats.reindex(away_team).reset_index(drop=True).rename(columns=lambda key: f'away_{key}_last{n_matches}'),
+    ], axis=1)
+    result = add_combined_features(result, n_matches)
+    h2h = h2h_stats.reindex(pairs).reset_index(drop=True)
+    for key in h2h.columns:
+        result[key] = h2h[key].to_numpy()
+
+    return add_league_avg_features(result, home_team.map(source.league_avg_goals))
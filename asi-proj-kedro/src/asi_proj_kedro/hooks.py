@@ -0,0 +1,328 @@
+"""Project hooks.
+
+`PerformanceHooks` records, for every node, wall time, CPU time, memory and
+the rows and bytes of its inputs and outputs, and for every dataset load and
+save its duration and size. Chosen nodes can also be profiled with cProfile or
+pyinstrument. At the end of a run the report is written as JSON under
+`profiling.report_dir` and a one-line summary is appended to `history.jsonl`
+there, so runs can be compared. Settings are under `profiling` in
+`conf/base/parameters_profiling.yml`.
+"""
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import pandas as pd
+from kedro.framework.hooks import hook_impl
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # optional, only needed for profiler: pyinstrument
+    PyinstrumentProfiler = None
+
+logger = logging.getLogger(__name__)
+
+MB = 2 ** 20
+
+
+def cpu_seconds() -> float:
+    """CPU time of this process and of its finished child processes (process pools)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def rss_mb() -> Optional[float]:
+    return psutil.Process().memory_info().rss / MB if psutil else None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water mark of this process' RSS so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / MB if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def data_size(data: Any, deep: bool = False) -> Dict[str, Optional[int]]:
+    """Rows and in-memory bytes of a dataset; None for data that is not a DataFrame."""
+    if isinstance(data, pd.DataFrame):
+        return {"rows": len(data), "bytes": int(data.memory_usage(index=True, deep=deep).sum())}
+    if isinstance(data, pd.Series):
+        return {"rows": len(data), "bytes": int(data.memory_usage(index=True, deep=deep))}
+    if isinstance(data, dict) and data and all(isinstance(value, pd.DataFrame) for value in data.values()):
+        # Partitions yielded by a generator node
+        sizes = [data_size(value, deep) for value in data.values()]
+        return {"rows": sum(size["rows"] for size in sizes), "bytes": sum(size["bytes"] for size in sizes)}
+    return {"rows": None, "bytes": None}
+
+
+def names(value) -> set:
+    # `--params "profiling.profile_nodes=a,b"` arrives as a string
+    if not value:
+        return set()
+    if isinstance(value, str):
+        return {name.strip() for name in value.split(",") if name.strip()}
+    return set(value)
+
+
+class PerformanceHooks:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.report_dir: Optional[Path] = None
+        self.deep_memory_usage = False
+        self.profile_nodes: set = set()
+        self.profiler = "cprofile"
+        self._reset()
+
+    def _reset(self) -> None:
+        self.run: Dict[str, Any] = {}
+        self.nodes: list = []
+        self.datasets: list = []
+        self._running_nodes: Dict[str, dict] = {}
+        self._running_datasets: Dict[tuple, float] = {}
+        self._profilers: Dict[str, Any] = {}
+        self._generator_nodes: Dict[str, dict] = {}
+
+    @hook_impl
+    def after_context_created(self, context) -> None:
+        settings = context.params.get("profiling") or {}
+        self.enabled = bool(settings.get("enabled", False))
+        self.report_dir = Path(context.project_path) / settings.get("report_dir", "data/08_reporting/performance")
+        self.deep_memory_usage = bool(settings.get("deep_memory_usage", False))
+        self.profile_nodes = names(settings.get("profile_nodes"))
+        self.profiler = settings.get("profiler", "cprofile")
+        if self.profiler == "pyinstrument" and PyinstrumentProfiler is None:
+            logger.warning("pyinstrument is not installed, profiling with cProfile")
+            self.profiler = "cprofile"
+
+    # ========== PIPELINE ==========
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self._reset()
+        self.run = {
+            "session_id": run_params.get("session_id"),
+            "pipeline_name": run_params.get("pipeline_name") or "__default__",
+            "env": run_params.get("env"),
+            "runner": run_params.get("runner"),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "_stamp": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+            "_wall": time.perf_counter(),
+            "_cpu": cpu_seconds(),
+        }
+
+    @hook_impl
+    def after_pipeline_run(self) -> None:
+        if self.enabled:
+            self._write_report("success")
+
+    @hook_impl
+    def on_pipeline_error(self, error: Exception) -> None:
+        if self.enabled:
+            self._write_report("error", error)
+
+    # ========== NODES ==========
+
+    @hook_impl
+    def before_node_run(self, node, inputs: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        record = {
+            "node": node.name,
+            "inputs": {name: data_size(data, self.deep_memory_usage) for name, data in inputs.items()
+                       if not name.startswith("params:") and name != "parameters"},
+            "rss_before_mb": rss_mb(),
+            "_wall": time.perf_counter(),
+            "_cpu": cpu_seconds(),
+        }
+        with self._lock:
+            self._running_nodes[node.name] = record
+        if node.name in self.profile_nodes:
+            self._start_profiler(node.name)
+
+    @hook_impl
+    def after_node_run(self, node, outputs: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        if outputs and all(isinstance(data, Iterator) for data in outputs.values()):
+            # Generator node - the work happens while its chunks are saved, see _finish_dataset
+            with self._lock:
+                record = self._running_nodes.pop(node.name, None)
+                if record is not None:
+                    record.update({"status": "success", "generator": True, "outputs": {}})
+                    self._generator_nodes[node.name] = record
+                    self.nodes.append(record)
+            if record is not None:
+                self._update_node_end(record)
+            return
+        self._finish_node(node, "success", outputs)
+
+    @hook_impl
+    def on_node_error(self, error: Exception, node) -> None:
+        if self.enabled:
+            self._finish_node(node, "error", {}, error)
+
+    def _finish_node(self, node, status: str, outputs: Dict[str, Any], error: Optional[Exception] = None) -> None:
+        wall = time.perf_counter()
+        cpu = cpu_seconds()
+        profile_path = self._stop_profiler(node.name)
+        with self._lock:
+            record = self._running_nodes.pop(node.name, None)
+        if record is None:
+            return
+        record.update({
+            "status": status,
+            "wall_seconds": round(wall - record.pop("_wall"), 6),
+            "cpu_seconds": round(cpu - record.pop("_cpu"), 6),
+            "rss_after_mb": rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+            "outputs": {name: data_size(data, self.deep_memory_usage) for name, data in outputs.items()},
+        })
+        if profile_path is not None:
+            record["profile"] = str(profile_path)
+        if error is not None:
+            record["error"] = repr(error)
+        with self._lock:
+            self.nodes.append(record)
+
+    # ========== DATASETS ==========
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str) -> None:
+        if self.enabled:
+            self._running_datasets[("load", dataset_name, threading.get_ident())] = time.perf_counter()
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str, data: Any, node) -> None:
+        if self.enabled:
+            self._finish_dataset("load", dataset_name, data, node)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str) -> None:
+        if self.enabled:
+            self._running_datasets[("save", dataset_name, threading.get_ident())] = time.perf_counter()
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any, node) -> None:
+        if self.enabled:
+            self._finish_dataset("save", dataset_name, data, node)
+
+    def _finish_dataset(self, operation: str, dataset_name: str, data: Any, node) -> None:
+        started = self._running_datasets.pop((operation, dataset_name, threading.get_ident()), None)
+        if started is None:
+            return
+        record = {
+            "dataset": dataset_name,
+            "operation": operation,
+            "node": node.name if node is not None else None,
+            "wall_seconds": round(time.perf_counter() - started, 6),
+            **data_size(data, self.deep_memory_usage),
+        }
+        with self._lock:
+            self.datasets.append(record)
+            generator_node = self._generator_nodes.get(record["node"]) if operation == "save" else None
+        if generator_node is not None:
+            # A generator node runs until its last chunk is saved
+            output = generator_node["outputs"].setdefault(dataset_name, {"rows": 0, "bytes": 0, "chunks": 0})
+            output["chunks"] += 1
+            for key in ("rows", "bytes"):
+                output[key] = None if output[key] is None or record[key] is None else output[key] + record[key]
+            self._update_node_end(generator_node)
+
+    @staticmethod
+    def _update_node_end(record: dict) -> None:
+        record["wall_seconds"] = round(time.perf_counter() - record["_wall"], 6)
+        record["cpu_seconds"] = round(cpu_seconds() - record["_cpu"], 6)
+        record["rss_after_mb"] = rss_mb()
+        record["peak_rss_mb"] = peak_rss_mb()
+
+    # ========== PROFILERS ==========
+
+    def _start_profiler(self, node_name: str) -> None:
+        if self.profiler == "pyinstrument":
+            profiler = PyinstrumentProfiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        with self._lock:
+            self._profilers[node_name] = profiler
+
+    def _stop_profiler(self, node_name: str) -> Optional[Path]:
+        with self._lock:
+            profiler = self._profilers.pop(node_name, None)
+        if profiler is None:
+            return None
+        profile_dir = self.report_dir / "profiles"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        stamp = self.run["_stamp"]
+        if self.profiler == "pyinstrument":
+            profiler.stop()
+            path = profile_dir / f"{stamp}_{node_name}.html"
+            path.write_text(profiler.output_html(), encoding="utf-8")
+        else:
+            profiler.disable()
+            path = profile_dir / f"{stamp}_{node_name}.prof"
+            profiler.dump_stats(str(path))
+        return path
+
+    # ========== REPORT ==========
+
+    def _write_report(self, status: str, error: Optional[Exception] = None) -> None:
+        # Generator nodes are profiled until the end of the run
+        for node_name in list(self._profilers):
+            path = self._stop_profiler(node_name)
+            if node_name in self._generator_nodes:
+                self._generator_nodes[node_name]["profile"] = str(path)
+        for record in self._generator_nodes.values():
+            record.pop("_wall", None)
+            record.pop("_cpu", None)
+
+        run = dict(self.run)
+        report = {
+            **{key: value for key, value in run.items() if not key.startswith("_")},
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": status,
+            "wall_seconds": round(time.perf_counter() - run["_wall"], 6),
+            "cpu_seconds": round(cpu_seconds() - run["_cpu"], 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "nodes": self.nodes,
+            "datasets": self.datasets,
+        }
+        if error is not None:
+            report["error"] = repr(error)
+
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f"{run['_stamp']}_{report['pipeline_name']}.json"
+        path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+
+        summary = {key: report[key] for key in ("started_at", "pipeline_name", "status", "wall_seconds",
+                                                "cpu_seconds", "peak_rss_mb")}
+        summary["nodes"] = {node["node"]: node["wall_seconds"] for node in self.nodes}
+        with open(self.report_dir / "history.jsonl", "a", encoding="utf-8") as history:
+            history.write(json.dumps(summary) + "\n")
+
+        slowest = sorted(self.nodes, key=lambda node: node["wall_seconds"], reverse=True)[:5]
+        logger.info(f"Raport wydajności: {path}")
+        for node in slowest:
+            logger.info(f"  {node['node']}: {node['wall_seconds']:.2f}s wall, {node['cpu_seconds']:.2f}s CPU")
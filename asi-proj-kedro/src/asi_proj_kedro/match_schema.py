@@ -0,0 +1,108 @@
+"""
+Typ kolumn tabeli meczów - wspólny dla pipeline'ów i API
+
+After the stat and score columns are split, `apply_match_schema` casts the
+match table to its compact schema:
+- stats and scores become nullable Int16, or Float32 for stats with fractions;
+- home_team and away_team become categoricals over one shared team dictionary;
+- league and time become categoricals;
+- date becomes datetime64.
+
+The cast is idempotent and only touches the columns present, so readers of a
+CSV copy (or a column subset) get the same schema as readers of the Parquet
+one. A stat column with parts that are not numbers (raw strings kept by the
+stat splitting) stays an object column, so those values are not lost. Only
+pandas and numpy are needed, so the API imports this module without Kedro.
+"""
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+STATS_COLUMNS = [
+    'attacks', 'attempts_on_goal', 'corners', 'dangerous_attacks',
+    'fauls', 'free_kicks', 'goal_kicks', 'offsides', 'penalties',
+    'possesion', 'red_cards', 'saves', 'shots_blocked',
+    'shots_off_target', 'shots_on_target', 'substitutions',
+    'throw_ins', 'treatments', 'yellow_cards'
+]
+SCORE_COLUMNS = ['half_time_score', 'full_time_score']
+TEAM_COLUMNS = ['home_team', 'away_team']
+CATEGORICAL_COLUMNS = TEAM_COLUMNS + ['league', 'time']
+
+# Percentages - fractional in some exports, Float32 in every partition
+FLOAT_STATS = {'possesion'}
+SPLIT_COLUMNS = [f"{col}_{side}" for col in STATS_COLUMNS + SCORE_COLUMNS for side in ('home', 'away')]
+FLOAT_COLUMNS = {f"{col}_{side}" for col in FLOAT_STATS for side in ('home', 'away')}
+
+INTEGER_DTYPES = ['Int16', 'Int32', 'Int64']
+
+logger = logging.getLogger(__name__)
+
+
+def compact_numeric(values: pd.Series, fractional: bool = False) -> pd.Series:
+    """Nullable Int16 (wider only if a value does not fit), Float32 for fractions
+
+    Values that are not numbers are kept: the column stays object, with numbers
+    (integral ones as int) next to the raw strings.
+    """
+    numeric = pd.to_numeric(values, errors='coerce')
+    not_numeric = numeric.isna() & values.notna()
+    if not_numeric.any():
+        logger.warning(f"{values.name}: {int(not_numeric.sum())} wartości nie są liczbami, kolumna zostaje typu object")
+        kept = [raw if is_raw else None if pd.isna(x) else int(x) if float(x).is_integer() and not fractional else x
+                for raw, is_raw, x in zip(values, not_numeric, numeric)]
+        return pd.Series(kept, index=values.index, name=values.name, dtype=object)
+    present = numeric.dropna().to_numpy(dtype=np.float64)
+    if fractional or not (np.isfinite(present).all() and (present == present.round()).all()):
+        return numeric.astype('Float32')
+    low, high = (present.min(), present.max()) if len(present) else (0, 0)
+    dtype = next(dtype for dtype in INTEGER_DTYPES
+                 if np.iinfo(dtype.lower()).min <= low and high <= np.iinfo(dtype.lower()).max)
+    # Float with NaN goes through Float64 so missing values become <NA>
+    return (numeric.astype('Float64') if numeric.dtype.kind == 'f' else numeric).astype(dtype)
+
+
+def team_dtype(df: pd.DataFrame) -> pd.CategoricalDtype:
+    """One dictionary of all teams, home and away codes point into the same categories"""
+    teams = [df[col].cat.categories if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].dropna().unique()
+             for col in TEAM_COLUMNS if col in df.columns]
+    return pd.CategoricalDtype(sorted(set().union(*teams)) if teams else [])
+
+
+def apply_match_schema(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """Cast the columns of `df` that belong to the match table to the compact schema"""
+    result_df = df.copy() if copy else df
+
+    for col in SPLIT_COLUMNS:
+        if col in result_df.columns:
+            result_df[col] = compact_numeric(result_df[col], fractional=col in FLOAT_COLUMNS)
+
+    if any(col in result_df.columns for col in TEAM_COLUMNS):
+        dtype = team_dtype(result_df)
+        for col in TEAM_COLUMNS:
+            if col in result_df.columns and result_df[col].dtype != dtype:
+                result_df[col] = result_df[col].astype(object).astype(dtype)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in result_df.columns and col not in TEAM_COLUMNS:
+            values = result_df[col].astype('category')
+            # "" (e.g. an unknown kickoff time) is missing, as it is after a CSV round trip
+            if '' in values.cat.categories:
+                values = values.cat.remove_categories('')
+            result_df[col] = values
+
+    if 'date' in result_df.columns and not pd.api.types.is_datetime64_any_dtype(result_df['date']):
+        result_df['date'] = pd.to_datetime(result_df['date'])
+
+    return result_df
+
+
+def shared_team_codes(df: pd.DataFrame) -> Optional[tuple]:
+    """(home_codes, away_codes, n_teams) if both team columns share one dictionary, else None"""
+    home_team, away_team = df['home_team'], df['away_team']
+    if not isinstance(home_team.dtype, pd.CategoricalDtype) or home_team.dtype != away_team.dtype:
+        return None
+    return (home_team.cat.codes.to_numpy(np.int64), away_team.cat.codes.to_numpy(np.int64),
+            len(home_team.cat.categories))
@@ -0,0 +1,212 @@
+"""
+Content-addressed node cache.
+
+The key of a node is a hash of
+- the source of the node function's module and of every project module it uses,
+- the values of its parameters,
+- the content of its input files (or partition directories) and their catalog config.
+
+After a node runs, its key and the content hashes of its outputs are stored in
+`<cache_dir>/index.json`. When a later run computes the same key and the output
+files still have the stored hashes, the node is skipped and the outputs on disk
+are reused. Nodes that read or write anything that is not a local file (e.g.
+MemoryDataset) always run. File hashes are memoised by size and mtime, like
+the S3 sync manifest, so unchanged files are not re-read on every run.
+
+`CachedSequentialRunner` (`asi_proj_kedro.runner`) applies the cache; the
+settings are under `node_cache` in `conf/base/parameters_node_cache.yml`.
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from kedro.io import MemoryDataset
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_json(value: Any) -> str:
+    return hash_bytes(json.dumps(value, sort_keys=True, default=str).encode())
+
+
+def _project_modules(module, package: str) -> List[Any]:
+    """`module` and every module of `package` it reaches through its globals"""
+    seen = {module.__name__: module}
+    todo = [module]
+    while todo:
+        for value in vars(todo.pop()).values():
+            if inspect.ismodule(value):
+                name = value.__name__
+            else:
+                name = getattr(value, "__module__", None)
+            if not isinstance(name, str) or not name.startswith(package) or name in seen:
+                continue
+            dependency = sys.modules.get(name) or importlib.import_module(name)
+            seen[name] = dependency
+            todo.append(dependency)
+    return [seen[name] for name in sorted(seen)]
+
+
+def code_fingerprint(func) -> str:
+    """Hash of the source of the module defining `func` and of the project modules it uses"""
+    while isinstance(func, partial):
+        func = func.func
+    func = inspect.unwrap(func)
+    module = inspect.getmodule(func)
+    if module is None:
+        return hash_bytes(repr(func).encode())
+    package = module.__name__.split(".")[0]
+    sources = {}
+    for dependency in _project_modules(module, package):
+        path = getattr(dependency, "__file__", None)
+        sources[dependency.__name__] = hash_bytes(Path(path).read_bytes()) if path else None
+    return hash_json({"function": func.__qualname__, "modules": sources})
+
+
+class NodeCache:
+    def __init__(self, cache_dir: Path, invalidate: bool = False, invalidate_nodes: Iterable[str] = (),
+                 exclude_nodes: Iterable[str] = ()):
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "index.json"
+        self.invalidate = invalidate
+        self.invalidate_nodes = set(invalidate_nodes)
+        self.exclude_nodes = set(exclude_nodes)
+        index = json.loads(self.index_path.read_text()) if self.index_path.exists() else {}
+        self.nodes: Dict[str, dict] = index.get("nodes", {})
+        # path -> [size, mtime_ns, sha256]
+        self.files: Dict[str, list] = index.get("files", {})
+        self.report: List[dict] = []
+
+    # ========== FINGERPRINTS ==========
+
+    def file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        cached = self.files.get(str(path))
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        self.files[str(path)] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path_hash(self, path: Path) -> Optional[str]:
+        """Hash of a file, or of every file in a directory (partitions) with its relative path"""
+        if path.is_file():
+            return self.file_hash(path)
+        if path.is_dir():
+            files = sorted(file for file in path.rglob("*") if file.is_file())
+            return hash_json([[file.relative_to(path).as_posix(), self.file_hash(file)] for file in files])
+        return None
+
+    @staticmethod
+    def local_path(catalog, name: str) -> Optional[Path]:
+        """Local file or directory of a dataset, None for MemoryDataset and remote storage"""
+        dataset = catalog._get_dataset(name)
+        if isinstance(dataset, MemoryDataset):
+            return None
+        description = dataset._describe()
+        path = description.get("filepath") or description.get("path")
+        if path is None or description.get("protocol", "file") != "file" or "://" in str(path):
+            return None
+        return Path(path)
+
+    def dataset_fingerprint(self, catalog, name: str) -> Optional[str]:
+        """Content hash of a dataset, None if it is not a local file or directory"""
+        if name == "parameters" or name.startswith("params:"):
+            return hash_json(catalog.load(name))
+        path = self.local_path(catalog, name)
+        if path is None:
+            return None
+        description = catalog._get_dataset(name)._describe()
+        content = self.path_hash(path)
+        if content is None:
+            return None
+        config = {key: value for key, value in description.items() if key not in ("filepath", "path")}
+        return hash_json({"content": content, "config": config})
+
+    def node_key(self, node, catalog) -> Optional[str]:
+        """Key of `node` for the current inputs, None if the node cannot be cached"""
+        if node.name in self.exclude_nodes or not node.outputs:
+            return None
+        if any(self.local_path(catalog, name) is None for name in node.outputs):
+            return None
+        inputs = {}
+        for name in node.inputs:
+            fingerprint = self.dataset_fingerprint(catalog, name)
+            if fingerprint is None:
+                return None
+            inputs[name] = fingerprint
+        return hash_json({"code": code_fingerprint(node.func), "inputs": inputs, "outputs": sorted(node.outputs)})
+
+    def output_fingerprints(self, node, catalog) -> Optional[Dict[str, str]]:
+        outputs = {name: self.dataset_fingerprint(catalog, name) for name in node.outputs}
+        if not outputs or any(fingerprint is None for fingerprint in outputs.values()):
+            return None
+        return outputs
+
+    # ========== LOOKUP / RECORD ==========
+
+    def is_hit(self, node, catalog, key: Optional[str]) -> bool:
+        if key is None or self.invalidate or node.name in self.invalidate_nodes:
+            return False
+        entry = self.nodes.get(node.name)
+        if entry is None or entry["key"] != key:
+            return False
+        # Outputs must still be the files this key produced
+        return self.output_fingerprints(node, catalog) == entry["outputs"]
+
+    def record(self, node, catalog, key: str, seconds: float) -> None:
+        outputs = self.output_fingerprints(node, catalog)
+        if outputs is None:
+            return
+        self.nodes[node.name] = {
+            "key": key,
+            "outputs": outputs,
+            "seconds": round(seconds, 3),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def add_report(self, node, status: str, seconds: float) -> None:
+        entry = {"node": node.name, "status": status, "seconds": round(seconds, 3)}
+        if status == "hit":
+            # Time the node took when its outputs were produced
+            entry["saved_seconds"] = self.nodes[node.name].get("seconds")
+        self.report.append(entry)
+
+    def save(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Forget hashes of files that no longer exist
+        self.files = {path: value for path, value in self.files.items() if os.path.exists(path)}
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"nodes": self.nodes, "files": self.files}, indent=2))
+        os.replace(tmp_path, self.index_path)
+
+    def write_report(self, path: Path) -> dict:
+        counts = {status: sum(entry["status"] == status for entry in self.report)
+                  for status in ("hit", "miss", "uncached")}
+        summary = {
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **counts,
+            "saved_seconds": round(sum(entry.get("saved_seconds") or 0 for entry in self.report), 3),
+            "nodes": self.report,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(summary, indent=2))
+        return summary
+
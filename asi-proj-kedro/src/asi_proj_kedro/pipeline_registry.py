@@ -7,9 +7,20 @@ from .pipelines import data_preparation, model_training, for_traning_preparation
 
 
 def register_pipelines() -> dict[str, Pipeline]:
-    return {
+    pipelines = {
         "data_processing": data_preparation.create_pipeline(),
+        "data_processing_streaming": data_preparation.create_streaming_pipeline(),
         "model_training": model_training.create_pipeline(),
         "for_traning_preparation": for_traning_preparation.create_pipeline(),
+        "for_traning_preparation_incremental": for_traning_preparation.create_incremental_pipeline(),
         "upload_model": upload_model.create_pipeline()
     }
+    # `kedro run` without --pipeline: raw exports -> match database -> goals features -> models -> S3,
+    # as one DAG, so independent branches can run side by side on ThreadRunner/ParallelRunner
+    pipelines["__default__"] = (
+        pipelines["data_processing"]
+        + pipelines["for_traning_preparation"]
+        + pipelines["model_training"]
+        + pipelines["upload_model"]
+    )
+    return pipelines
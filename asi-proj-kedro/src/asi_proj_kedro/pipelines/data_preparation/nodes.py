@@ -3,12 +3,52 @@ This is a boilerplate pipeline 'data_preparation'
 generated using Kedro 0.19.12
 """
 
+import glob
+import logging
+import multiprocessing as mp
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Union
 
 from sqlalchemy import false
 
+from asi_proj_kedro.match_schema import SCORE_COLUMNS, STATS_COLUMNS, apply_match_schema
+
+logger = logging.getLogger(__name__)
+
+
+# ========== PARTITION-PARALLEL EXECUTION OF ROW-INDEPENDENT NODES ==========
+
+def parallel_workers(parallel: Optional[Dict[str, Any]], rows: int) -> int:
+    """Worker processes to use for `rows` rows - 1 runs in this process"""
+    if not parallel:
+        return 1
+    workers = parallel.get('workers') or 1
+    if workers < 0:
+        workers = os.cpu_count() or 1
+    # Small frames are not worth starting a pool for
+    return max(1, min(workers, rows // max(parallel.get('min_rows_per_partition', 1), 1)))
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn - workers import only this module, not whatever the Kedro session has loaded
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+
+
+def run_in_partitions(func: Callable[[pd.DataFrame], pd.DataFrame], df: pd.DataFrame,
+                      workers: int) -> pd.DataFrame:
+    """Apply a row-independent `func` to contiguous row blocks in parallel, concatenated in row order"""
+    bounds = np.linspace(0, len(df), workers + 1).astype(int)
+    partitions = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    logger.info(f"{func.__name__}: {len(df)} wierszy w {workers} procesach")
+    with process_pool(workers) as executor:
+        return pd.concat(list(executor.map(func, partitions)))
+
 
 def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
     df_copy = df.copy()
@@ -26,19 +66,18 @@ def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
 
     return df_copy
 
-def standardize_time_column(df: pd.DataFrame) -> pd.DataFrame:
-    def round_time_to_nearest_15_minutes(time_str: str) -> str:
-        if pd.isna(time_str):
-            return ""
-        try:
-            time = pd.to_datetime(time_str, format='%H:%M')
-            rounded_time = time.round('15min')
-            return rounded_time.strftime('%H:%M')
-        except ValueError:
-            return ""
+def standardize_time_column(df: pd.DataFrame, parallel: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    # Kickoff times repeat a lot: parse and round every distinct value once,
+    # then broadcast back. Missing or unparseable times become ""
+    workers = parallel_workers(parallel, len(df))
+    if workers > 1:
+        return run_in_partitions(standardize_time_column, df, workers)
 
     if 'time' in df.columns:
-        df['time'] = df['time'].apply(round_time_to_nearest_15_minutes)
+        codes, uniques = pd.factorize(df['time'])
+        times = pd.to_datetime(pd.Series(uniques, dtype=object), format='%H:%M', errors='coerce')
+        rounded = times.dt.round('15min').dt.strftime('%H:%M').fillna("").to_numpy(dtype=object)
+        df['time'] = np.append(rounded, "")[codes]
 
     return df
 
@@ -51,32 +90,81 @@ def merge_datasets(df_initial: pd.DataFrame, df_new: pd.DataFrame) -> pd.DataFra
     return df_merged
 
 
-def split_match_statistics(df: pd.DataFrame) -> pd.DataFrame:
-    stats_columns = [
-        'attacks', 'attempts_on_goal', 'corners', 'dangerous_attacks',
-        'fauls', 'free_kicks', 'goal_kicks', 'offsides', 'penalties',
-        'possesion', 'red_cards', 'saves', 'shots_blocked',
-        'shots_off_target', 'shots_on_target', 'substitutions',
-        'throw_ins', 'treatments', 'yellow_cards'
-    ]
+def split_match_statistics(df: pd.DataFrame, parallel: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    workers = parallel_workers(parallel, len(df))
+    if workers > 1:
+        result_df = run_in_partitions(split_match_statistics, df, workers)
+        # Typ kolumny (Int64, Float64 albo object) zależy od wszystkich wierszy - ustalany raz, po złączeniu bloków
+        for col in STATS_COLUMNS:
+            for side in ('home', 'away'):
+                if f"{col}_{side}" in result_df.columns:
+                    result_df[f"{col}_{side}"] = parse_stat_part(result_df[f"{col}_{side}"])
+        return result_df
 
-    result_df = df.copy()
+    split_columns = {}
 
-    for col in stats_columns:
+    for col in STATS_COLUMNS:
         if col in df.columns:
-            home_col = f"{col}_home"
-            away_col = f"{col}_away"
+            home, away = split_stat_column(df[col])
+            split_columns[f"{col}_home"] = home
+            split_columns[f"{col}_away"] = away
+
+    return replace_with_split_columns(df, split_columns)
+
+
+def split_stat_column(values: pd.Series) -> tuple:
+    # Vectorized split_stat_value over a whole column: "home:away" -> nullable numbers.
+    # Stat cells repeat a lot, so every distinct value is split once and broadcast back.
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    text = text[text.str.contains(':', regex=False)]
+    parts = text.str.split(':', expand=True)
+
+    if not len(parts):
+        empty = pd.Series(pd.NA, index=values.index, dtype='Int64')
+        return empty, empty.copy()
+
+    unique_index = pd.RangeIndex(len(uniques))
+    home = parse_stat_part(parts[0]).reindex(unique_index)
+    away = parse_stat_part(parts[1]).reindex(unique_index)
+    return broadcast_unique(home, codes, values.index), broadcast_unique(away, codes, values.index)
 
-            result_df[home_col] = df[col].apply(
-                lambda x: split_stat_value(x)[0] if pd.notna(x) else None
-            )
-            result_df[away_col] = df[col].apply(
-                lambda x: split_stat_value(x)[1] if pd.notna(x) else None
-            )
 
-            result_df = result_df.drop(columns=[col])
+def parse_stat_part(part: pd.Series) -> pd.Series:
+    numeric = pd.to_numeric(part, errors='coerce')
+    not_numeric = numeric.isna() & part.notna()
 
-    return result_df
+    if not not_numeric.any():
+        return to_nullable_numeric(numeric)
+
+    # Rare parts to_numeric rejects (e.g. "1_000", or real text) go through the scalar parser
+    # so they keep split_stat_value's result: a number if float() accepts it, else the raw string
+    parsed = numeric.astype(object)
+    parsed[not_numeric] = part[not_numeric].map(lambda x: split_stat_value(f"{x}:")[0])
+    return parsed.where(parsed.notna(), None)
+
+
+def broadcast_unique(unique_values: pd.Series, codes: np.ndarray, index: pd.Index) -> pd.Series:
+    # Missing cells have code -1 and become NA / None
+    result = pd.Series(unique_values.array.take(codes, allow_fill=True), index=index)
+    if result.dtype == object:
+        result = result.where(result.notna(), None)
+    return result
+
+
+def to_nullable_numeric(values: pd.Series) -> pd.Series:
+    # Integral columns as nullable integers, anything with fractions as nullable floats
+    present = values.dropna()
+    if np.isfinite(present).all() and (present == present.round()).all():
+        return values.astype('Int64')
+    return values.astype('Float64')
+
+
+def replace_with_split_columns(df: pd.DataFrame, split_columns: Dict[str, pd.Series]) -> pd.DataFrame:
+    # Source columns are dropped and the split pairs appended in one step
+    source_columns = {col.rsplit('_', 1)[0] for col in split_columns}
+    result_df = df.drop(columns=[col for col in df.columns if col in source_columns or col in split_columns])
+    return pd.concat([result_df, pd.DataFrame(split_columns, index=df.index)], axis=1)
 
 
 def split_stat_value(value: Any) -> tuple:
@@ -107,26 +195,21 @@ def split_stat_value(value: Any) -> tuple:
     return (home, away)
 
 
-def split_match_scores(df: pd.DataFrame) -> pd.DataFrame:
-    score_columns = ['half_time_score', 'full_time_score']
+def split_match_scores(df: pd.DataFrame, parallel: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    workers = parallel_workers(parallel, len(df))
+    if workers > 1:
+        return run_in_partitions(split_match_scores, df, workers)
 
-    result_df = df.copy()
+    split_columns = {}
 
-    for col in score_columns:
+    for col in SCORE_COLUMNS:
         if col in df.columns:
-            home_col = f"{col}_home"
-            away_col = f"{col}_away"
+            codes, uniques = pd.factorize(df[col])
+            scores = pd.Series(uniques, dtype=object).astype(str).str.extract(r'^(\d+)\s*-\s*(\d+)')
+            split_columns[f"{col}_home"] = broadcast_unique(pd.to_numeric(scores[0]).astype('Int64'), codes, df.index)
+            split_columns[f"{col}_away"] = broadcast_unique(pd.to_numeric(scores[1]).astype('Int64'), codes, df.index)
 
-            result_df[home_col] = df[col].apply(
-                lambda x: split_score(x)[0] if pd.notna(x) else None
-            )
-            result_df[away_col] = df[col].apply(
-                lambda x: split_score(x)[1] if pd.notna(x) else None
-            )
-
-            result_df = result_df.drop(columns=[col])
-
-    return result_df
+    return replace_with_split_columns(df, split_columns)
 
 
 def split_score(value: Any) -> tuple:
@@ -143,3 +226,111 @@ def split_score(value: Any) -> tuple:
         return (home_score, away_score)
     else:
         return (None, None)
+
+
+def enforce_match_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact typed schema of the match table, see `asi_proj_kedro.match_schema`
+
+    Stats and scores as nullable Int16 (Float32 where a stat has fractions),
+    teams as categoricals sharing one dictionary, league and time as
+    categoricals and the date as datetime64.
+    """
+    return apply_match_schema(df)
+
+
+# ========== STREAMING: RAW EXPORTS IN CHUNKS, OUTPUT PARTITIONED BY MATCH_ID RANGE ==========
+
+Chunks = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+def spill_match_chunks(chunks: Chunks, spill_dir: str, name: str, match_id_range: int,
+                       prepare: Callable[[pd.DataFrame], pd.DataFrame] = standardize_column_names) -> int:
+    """Prepare every chunk and write it to disk split by match_id range, returns the number of rows.
+
+    Every range gets its own directory, so both sides of the merge can later be
+    read back one range at a time.
+    """
+    if isinstance(chunks, pd.DataFrame):
+        # Catalog entry without chunksize - the whole file is one chunk
+        chunks = [chunks]
+
+    rows = 0
+    for number, chunk in enumerate(chunks):
+        chunk = prepare(chunk)
+        chunk = chunk[chunk['match_id'].notna()]
+        rows += len(chunk)
+        ranges = (chunk['match_id'] // match_id_range).astype('int64')
+        for match_range, part in chunk.groupby(ranges, sort=False):
+            directory = os.path.join(spill_dir, str(match_range))
+            os.makedirs(directory, exist_ok=True)
+            part.to_pickle(os.path.join(directory, f"{name}-{number:06d}.pkl"))
+    return rows
+
+
+def load_spilled_range(directory: str, name: str) -> Optional[pd.DataFrame]:
+    files = sorted(glob.glob(os.path.join(directory, f"{name}-*.pkl")))
+    if not files:
+        return None
+    return pd.concat([pd.read_pickle(file) for file in files], ignore_index=True)
+
+
+def process_match_range(matches_data: pd.DataFrame, matches_statistics: pd.DataFrame) -> pd.DataFrame:
+    """Same steps as the data_processing pipeline after standardization, for one match_id range"""
+    df = merge_datasets(matches_data, matches_statistics)
+    df = split_match_statistics(df)
+    df = split_match_scores(df)
+    return enforce_match_schema(df)
+
+
+def process_spilled_range(directory: str) -> Optional[pd.DataFrame]:
+    # Runs in a worker process when the ranges are processed in parallel
+    matches_data = load_spilled_range(directory, 'matches_data')
+    matches_statistics = load_spilled_range(directory, 'matches_statistics')
+    if matches_data is None or matches_statistics is None:
+        return None
+    return process_match_range(matches_data, matches_statistics)
+
+
+def stream_match_data(matches_data_chunks: Chunks, matches_statistics_chunks: Chunks,
+                      params: Dict[str, Any],
+                      parallel: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, pd.DataFrame]]:
+    """
+    Streaming data_processing: standardize, time rounding, merge on match_id and splitting in bounded memory
+
+    Both raw exports are read in chunks (`chunksize` of their catalog entries)
+    and spilled to a temporary directory by match_id range. The ranges are
+    then merged and split one at a time and yielded as partitions named after
+    their first match_id. Peak memory is one chunk or one range, whichever is
+    larger; match ids grow with time, so a range holds a bounded number of
+    matches however many seasons are ingested. With `parallel.workers` above 1
+    the ranges are processed in a process pool, still yielded in range order.
+    """
+    match_id_range = params['match_id_range']
+    with tempfile.TemporaryDirectory(prefix='match_spill_', dir=params.get('spill_dir')) as spill_dir:
+        data_rows = spill_match_chunks(
+            matches_data_chunks, spill_dir, 'matches_data', match_id_range,
+            prepare=lambda chunk: standardize_time_column(standardize_column_names(chunk))
+        )
+        statistics_rows = spill_match_chunks(matches_statistics_chunks, spill_dir, 'matches_statistics',
+                                             match_id_range)
+        logger.info(f"Streaming: {data_rows} meczów, {statistics_rows} statystyk")
+
+        match_ranges = sorted(int(name) for name in os.listdir(spill_dir))
+        directories = [os.path.join(spill_dir, str(match_range)) for match_range in match_ranges]
+        workers = min(parallel_workers(parallel, data_rows), len(match_ranges))
+        if workers > 1:
+            executor = process_pool(workers)
+            # map keeps range order; only the ranges in flight and finished ones waiting to be saved are in memory
+            results = executor.map(process_spilled_range, directories)
+        else:
+            executor = None
+            results = map(process_spilled_range, directories)
+
+        try:
+            for match_range, result in zip(match_ranges, results):
+                if result is not None:
+                    yield {f"matches_{match_range * match_id_range:012d}": result}
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
@@ -4,7 +4,8 @@ generated using Kedro 0.19.12
 """
 
 from kedro.pipeline import node, Pipeline, pipeline  # noqa
-from .nodes import merge_datasets, standardize_column_names, split_match_statistics, split_match_scores, standardize_time_column
+from .nodes import merge_datasets, standardize_column_names, split_match_statistics, split_match_scores, standardize_time_column, \
+    enforce_match_schema, stream_match_data
 
 
 def create_pipeline(**kwargs) -> Pipeline:
@@ -23,7 +24,7 @@ def create_pipeline(**kwargs) -> Pipeline:
         ),
         node(
             func=standardize_time_column,
-            inputs="matches_data_standardized",
+            inputs=["matches_data_standardized", "params:parallel"],
             outputs="matches_data_time_standardized",
             name="standardize_matches_data_time_node"
         ),
@@ -35,14 +36,32 @@ def create_pipeline(**kwargs) -> Pipeline:
         ),
         node(
             func=split_match_statistics,
-            inputs="matches_data_merged",
+            inputs=["matches_data_merged", "params:parallel"],
             outputs="matches_statistics_separated",
             name="split_match_statistics_node"
         ),
         node(
             func=split_match_scores,
-            inputs="matches_statistics_separated",
-            outputs="matches_results_separated",
+            inputs=["matches_statistics_separated", "params:parallel"],
+            outputs="matches_results_split",
             name="split_match_scores_node"
+        ),
+        node(
+            func=enforce_match_schema,
+            inputs="matches_results_split",
+            outputs="matches_results_separated",
+            name="enforce_match_schema_node"
+        )
+    ])
+
+
+def create_streaming_pipeline(**kwargs) -> Pipeline:
+    """Same output as create_pipeline, computed chunk by chunk and written as match_id-range partitions"""
+    return pipeline([
+        node(
+            func=stream_match_data,
+            inputs=["matches_data_chunks", "matches_statistics_chunks", "params:streaming", "params:parallel"],
+            outputs="matches_results_partitioned",
+            name="stream_match_data_node"
         )
     ])
@@ -3,8 +3,8 @@ This is a boilerplate pipeline 'for_traning_preparation'
 generated using Kedro 0.19.12
 """
 
-from .pipeline import create_pipeline
+from .pipeline import create_pipeline, create_incremental_pipeline
 
-__all__ = ["create_pipeline"]
+__all__ = ["create_pipeline", "create_incremental_pipeline"]
 
 __version__ = "0.1"
@@ -6,17 +6,48 @@ generated using Kedro 0.19.12
 import pandas as pd
 import numpy as np
 import logging
+from typing import Callable, Dict, Optional, Union
+
+from asi_proj_kedro import goals_features
+from asi_proj_kedro.goals_features import (
+    H2H_MATCHES,
+    N_MATCHES,
+    add_combined_features,
+    add_league_features,
+    calculate_attacking_stats,
+    calculate_goals_h2h,
+    match_order_keys,
+)
+from asi_proj_kedro.match_schema import apply_match_schema
 
 logger = logging.getLogger(__name__)
 
 
-def prepare_goals_data(raw_data: pd.DataFrame) -> pd.DataFrame:
+def load_match_partitions(partitions: Dict[str, Callable[[], pd.DataFrame]], columns) -> pd.DataFrame:
+    """Concatenate partitions in partition order, keeping only `columns` of each one"""
+    parts = []
+    for _, load_partition in sorted(partitions.items()):
+        part = load_partition()
+        parts.append(part[[col for col in columns if col in part.columns]])
+    return pd.concat(parts, ignore_index=True)
+
+
+def prepare_goals_data(raw_data: Union[pd.DataFrame, Dict[str, Callable[[], pd.DataFrame]]]) -> pd.DataFrame:
     """
     Przygotowanie danych dla przewidywania liczby goli
+
+    `raw_data` is the match table, or its partitions written by the
+    data_processing_streaming pipeline (`--env streaming`).
     """
     expected_columns = ['date', 'home_team', 'away_team', 'full_time_score_home', 'full_time_score_away']
-    data = raw_data.copy()
-    data = data[expected_columns]
+    if isinstance(raw_data, dict):
+        # Partycje wczytywane po kolei - w pamięci tylko potrzebne kolumny
+        raw_data = load_match_partitions(raw_data, ['match_id'] + expected_columns)
+    if 'match_id' in raw_data.columns:
+        # Klucz meczu - potrzebny w trybie przyrostowym
+        expected_columns = ['match_id'] + expected_columns
+    # Schemat tabeli meczów (kategorie drużyn, Int16, datetime) także po wczytaniu z CSV
+    data = apply_match_schema(raw_data[expected_columns])
 
     # Sprawdź wymagane kolumny
     required_cols = ['full_time_score_home', 'full_time_score_home']
@@ -38,28 +69,25 @@ def prepare_goals_data(raw_data: pd.DataFrame) -> pd.DataFrame:
     # 3. Gole gości
     data['target_away_goals'] = data['away_goals']
 
+    # Brakujący wynik (<NA>) nie spełnia żadnego progu, jak NaN
+    total_goals = data['total_goals'].to_numpy(dtype=np.float64, na_value=np.nan)
+    home_goals = data['home_goals'].to_numpy(dtype=np.float64, na_value=np.nan)
+    away_goals = data['away_goals'].to_numpy(dtype=np.float64, na_value=np.nan)
+
     # 4. Over/Under 2.5 gola (popularne w zakładach)
-    data['over_2_5'] = (data['total_goals'] > 2.5).astype(int)
+    data['over_2_5'] = (total_goals > 2.5).astype(int)
 
     # 5. Over/Under 1.5 gola
-    data['over_1_5'] = (data['total_goals'] > 1.5).astype(int)
+    data['over_1_5'] = (total_goals > 1.5).astype(int)
 
     # 6. Over/Under 3.5 gola
-    data['over_3_5'] = (data['total_goals'] > 3.5).astype(int)
+    data['over_3_5'] = (total_goals > 3.5).astype(int)
 
     # 7. Both Teams To Score (BTTS)
-    data['btts'] = ((data['home_goals'] > 0) & (data['away_goals'] > 0)).astype(int)
-
-    # 8. Kategorie goli (dla klasyfikacji)
-    def categorize_goals(total):
-        if total <= 1:
-            return 'low'  # 0-1 goli
-        elif total <= 3:
-            return 'medium'  # 2-3 gole
-        else:
-            return 'high'  # 4+ goli
+    data['btts'] = ((home_goals > 0) & (away_goals > 0)).astype(int)
 
-    data['goals_category'] = data['total_goals'].apply(categorize_goals)
+    # 8. Kategorie goli (dla klasyfikacji): 0-1 low, 2-3 medium, 4+ high
+    data['goals_category'] = np.where(total_goals <= 1, 'low', np.where(total_goals <= 3, 'medium', 'high'))
 
     # Statystyki rozkładu goli
     logger.info(f"Średnia liczba goli: {data['total_goals'].mean():.2f}")
@@ -79,189 +107,111 @@ def create_goals_features(data: pd.DataFrame) -> pd.DataFrame:
 
     # ========== OFENSYWNE I DEFENSYWNE STATYSTYKI ==========
 
-    def calculate_attacking_stats(df, team_col, n_matches=5):
-        """Statystyki ofensywne drużyny"""
-        attacking_stats = []
-
-        for idx, row in df.iterrows():
-            team = row[team_col]
-            match_date = row.get('match_date', idx)
-
-            # Ostatnie mecze tej drużyny
-            if 'match_date' in df.columns:
-                recent_matches = df[
-                    ((df['home_team'] == team) | (df['away_team'] == team)) &
-                    (df['match_date'] < match_date)
-                    ].sort_values('match_date', ascending=False).head(n_matches)
-            else:
-                recent_matches = df[
-                    ((df['home_team'] == team) | (df['away_team'] == team)) &
-                    (df.index < idx)
-                    ].tail(n_matches)
-
-            if len(recent_matches) == 0:
-                attacking_stats.append({
-                    'goals_scored': 0,
-                    'goals_conceded': 0,
-                    'avg_goals_scored': 0,
-                    'avg_goals_conceded': 0,
-                    'matches_played': 0,
-                    'clean_sheets': 0,
-                    'failed_to_score': 0,
-                    'high_scoring_games': 0,
-                    'clean_sheet_rate': 0,
-                    'fail_to_score_rate': 0,
-                    'high_scoring_rate': 0
-                })
-                continue
-
-            goals_scored = goals_conceded = clean_sheets = failed_to_score = high_scoring = 0
-
-            for _, match in recent_matches.iterrows():
-                is_home = match['home_team'] == team
-                total_goals_in_match = match['home_goals'] + match['away_goals']
-
-                if is_home:
-                    team_goals = match['home_goals']
-                    opponent_goals = match['away_goals']
-                else:
-                    team_goals = match['away_goals']
-                    opponent_goals = match['home_goals']
-
-                goals_scored += team_goals
-                goals_conceded += opponent_goals
-
-                if opponent_goals == 0:
-                    clean_sheets += 1
-                if team_goals == 0:
-                    failed_to_score += 1
-                if total_goals_in_match >= 3:
-                    high_scoring += 1
-
-            matches_played = len(recent_matches)
-            attacking_stats.append({
-                'goals_scored': goals_scored,
-                'goals_conceded': goals_conceded,
-                'avg_goals_scored': goals_scored / matches_played,
-                'avg_goals_conceded': goals_conceded / matches_played,
-                'matches_played': matches_played,
-                'clean_sheets': clean_sheets,
-                'failed_to_score': failed_to_score,
-                'high_scoring_games': high_scoring,
-                'clean_sheet_rate': clean_sheets / matches_played,
-                'fail_to_score_rate': failed_to_score / matches_played,
-                'high_scoring_rate': high_scoring / matches_played
-            })
-
-        return attacking_stats
+    home_stats, away_stats = calculate_attacking_stats(df, n_matches=N_MATCHES)
 
     # Statystyki dla drużyny domowej
-    home_stats = calculate_attacking_stats(df, 'home_team', n_matches=5)
-    for key in home_stats[0].keys():
-        df[f'home_{key}_last5'] = [stat[key] for stat in home_stats]
+    for key in home_stats.columns:
+        df[f'home_{key}_last{N_MATCHES}'] = home_stats[key].to_numpy()
 
     # Statystyki dla drużyny gości
-    away_stats = calculate_attacking_stats(df, 'away_team', n_matches=5)
-    for key in away_stats[0].keys():
-        df[f'away_{key}_last5'] = [stat[key] for stat in away_stats]
+    for key in away_stats.columns:
+        df[f'away_{key}_last{N_MATCHES}'] = away_stats[key].to_numpy()
 
     # logs new created columns
     logger.info(f"Nowe kolumny ofensywne i defensywne: {df.columns.tolist()}")
 
     # ========== KOMBINOWANE CECHY OFENSYWNO-DEFENSYWNE ==========
 
-    # Potencjał strzelecki meczu
-    df['expected_goals_home'] = df['home_avg_goals_scored_last5']
-    df['expected_goals_away'] = df['away_avg_goals_scored_last5']
-    df['expected_total_goals'] = df['expected_goals_home'] + df['expected_goals_away']
-
-    # Defensywna solidność
-    df['defensive_strength_home'] = 1 / (df['home_avg_goals_conceded_last5'] + 0.1)
-    df['defensive_strength_away'] = 1 / (df['away_avg_goals_conceded_last5'] + 0.1)
-
-    # Różnica w sile ofensywnej
-    df['attacking_advantage'] = df['home_avg_goals_scored_last5'] - df['away_avg_goals_scored_last5']
-
-    # Prawdopodobieństwo wysokowydajnego meczu
-    df['high_scoring_tendency'] = (df['home_high_scoring_rate_last5'] + df['away_high_scoring_rate_last5']) / 2
-
-    # Solidność defensywna obu drużyn
-    df['defensive_solidity'] = df['home_clean_sheet_rate_last5'] + df['away_clean_sheet_rate_last5']
-
-    # Tendencja do bramek / brak bramek
-    df['btts_likelihood'] = 1 - (df['home_fail_to_score_rate_last5'] + df['away_fail_to_score_rate_last5'])
+    df = add_combined_features(df, N_MATCHES)
 
     # ========== CECHY HISTORYCZNE HEAD-TO-HEAD ==========
 
-    def calculate_goals_h2h(df, n_matches=10):
-        """Statystyki goli w meczach head-to-head"""
-        h2h_goals_stats = []
-
-        for idx, row in df.iterrows():
-            home_team = row['home_team']
-            away_team = row['away_team']
-            match_date = row.get('match_date', idx)
-
-            if 'match_date' in df.columns:
-                h2h_matches = df[
-                    (((df['home_team'] == home_team) & (df['away_team'] == away_team)) |
-                     ((df['home_team'] == away_team) & (df['away_team'] == home_team))) &
-                    (df['match_date'] < match_date)
-                    ].sort_values('match_date', ascending=False).head(n_matches)
-            else:
-                h2h_matches = df[
-                    (((df['home_team'] == home_team) & (df['away_team'] == away_team)) |
-                     ((df['home_team'] == away_team) & (df['away_team'] == home_team))) &
-                    (df.index < idx)
-                    ].tail(n_matches)
-
-            if len(h2h_matches) == 0:
-                h2h_goals_stats.append({
-                    'h2h_avg_total_goals': 2.5,  # Liga average
-                    'h2h_over_2_5_rate': 0.5,
-                    'h2h_btts_rate': 0.5,
-                    'h2h_matches': 0
-                })
-                continue
-
-            total_goals_list = []
-            over_2_5_count = 0
-            btts_count = 0
-
-            for _, match in h2h_matches.iterrows():
-                total_goals = match['home_goals'] + match['away_goals']
-                total_goals_list.append(total_goals)
-
-                if total_goals > 2.5:
-                    over_2_5_count += 1
-
-                if match['home_goals'] > 0 and match['away_goals'] > 0:
-                    btts_count += 1
-
-            matches_count = len(h2h_matches)
-            h2h_goals_stats.append({
-                'h2h_avg_total_goals': np.mean(total_goals_list),
-                'h2h_over_2_5_rate': over_2_5_count / matches_count,
-                'h2h_btts_rate': btts_count / matches_count,
-                'h2h_matches': matches_count
-            })
-
-        return h2h_goals_stats
-
-    h2h_data = calculate_goals_h2h(df)
-    for key in h2h_data[0].keys():
-        df[key] = [stat[key] for stat in h2h_data]
+    h2h_data = calculate_goals_h2h(df, n_matches=H2H_MATCHES)
+    for key in h2h_data.columns:
+        df[key] = h2h_data[key].to_numpy()
 
     # ========== CECHY LIGOWE I SEZONOWE ==========
 
-    # Średnia ligowa (jeśli masz info o lidze)
-    if 'league' in df.columns:
-        league_averages = df.groupby('league')['total_goals'].mean().to_dict()
-        df['league_avg_goals'] = df['league'].map(league_averages)
-    else:
-        df['league_avg_goals'] = df['total_goals'].mean()  # Ogólna średnia
+    return add_league_features(df)
+
 
-    # Odchylenie od średniej ligowej
-    df['goals_vs_league_avg'] = df['expected_total_goals'] - df['league_avg_goals']
+def build_goals_features_state(data: pd.DataFrame, n_matches: int = N_MATCHES,
+                               h2h_matches: int = H2H_MATCHES) -> pd.DataFrame:
+    """
+    Stan do trybu przyrostowego: wiersze `prepared_goals_data` potrzebne do okien kolejnych meczów
 
-    return df
\ No newline at end of file
+    Keeps the last `n_matches` matches of every team and the last `h2h_matches`
+    matches of every team pair, in match order and with their original index.
+    """
+    data = data.iloc[np.argsort(match_order_keys(data), kind='stable')]
+    rows = pd.Series(data.index)
+
+    team_rows = pd.concat([
+        pd.DataFrame({'team': data['home_team'].to_numpy(), 'row': rows}),
+        pd.DataFrame({'team': data['away_team'].to_numpy(), 'row': rows}),
+    ]).sort_values('row', kind='stable')
+    last_team_rows = team_rows.groupby('team').tail(n_matches)['row']
+
+    home_team = data['home_team'].astype(str)
+    away_team = data['away_team'].astype(str)
+    pairs = pd.DataFrame({
+        'first_team': np.where(home_team <= away_team, home_team, away_team),
+        'second_team': np.where(home_team <= away_team, away_team, home_team),
+        'row': rows,
+    })
+    last_pair_rows = pairs.groupby(['first_team', 'second_team']).tail(h2h_matches)['row']
+
+    state = data.loc[data.index.isin(pd.concat([last_team_rows, last_pair_rows]))]
+    logger.info(f"Stan cech: {len(state)} z {len(data)} meczów")
+    return state
+
+
+def update_goals_features(data: pd.DataFrame, previous_features: Optional[pd.DataFrame],
+                          state: Optional[pd.DataFrame]) -> tuple:
+    """
+    Przyrostowe tworzenie cech - tylko dla meczów, których nie ma w `previous_features`
+
+    New matches (by match_id) are computed on top of the saved state and their
+    feature rows are appended. The windows are exact as long as new matches are
+    played after every match in the state; otherwise all features are recomputed.
+    So are they when there are no previous features or state (None), or no
+    match_id to tell new matches apart.
+    """
+    if previous_features is None or state is None:
+        logger.warning("Brak poprzednich cech lub stanu - przeliczam wszystkie cechy")
+        return create_goals_features(data), build_goals_features_state(data)
+    if 'match_id' not in data.columns or 'match_id' not in previous_features.columns:
+        logger.warning("Brak match_id w danych lub poprzednich cechach - przeliczam wszystkie cechy")
+        return create_goals_features(data), build_goals_features_state(data)
+
+    new_matches = data[~data['match_id'].isin(previous_features['match_id'])]
+    if new_matches.empty:
+        logger.info("Brak nowych meczów - cechy bez zmian")
+        return previous_features, state
+
+    # Etykiety indeksu stanu i nowych meczów mogą się powtarzać (np. baza od najnowszych) - wiersze po pozycji
+    history = pd.concat([state, new_matches], ignore_index=True)
+    order_keys = match_order_keys(history)
+    if len(state) and order_keys[len(state):].min() <= order_keys[:len(state)].max():
+        logger.warning("Nowe mecze nie są późniejsze niż zapisany stan - przeliczam wszystkie cechy")
+        return create_goals_features(data), build_goals_features_state(data)
+
+    logger.info(f"Nowe mecze: {len(new_matches)}, przeliczam cechy przyrostowo")
+    new_features = create_goals_features(history).iloc[len(state):]
+    new_features.index = new_matches.index
+
+    features = pd.concat([previous_features, new_features[previous_features.columns]])
+    # Średnie ligowe zależą od wszystkich meczów
+    features = add_league_features(features)
+
+    return features, build_goals_features_state(history)
+
+
+def build_team_features_snapshot(data: pd.DataFrame, n_matches: int = N_MATCHES,
+                                 h2h_matches: int = H2H_MATCHES) -> tuple:
+    """
+    Aktualny stan cech dla API - see `goals_features.build_team_features_snapshot`
+    """
+    team_snapshot, pair_snapshot = goals_features.build_team_features_snapshot(data, n_matches, h2h_matches)
+    logger.info(f"Snapshot cech: {len(team_snapshot)} drużyn, {len(pair_snapshot)} par")
+    return team_snapshot, pair_snapshot
@@ -4,7 +4,13 @@ generated using Kedro 0.19.12
 """
 
 from kedro.pipeline import node, Pipeline, pipeline
-from .nodes import prepare_goals_data, create_goals_features
+from .nodes import (
+    prepare_goals_data,
+    create_goals_features,
+    build_goals_features_state,
+    update_goals_features,
+    build_team_features_snapshot,
+)
 
 
 def create_pipeline(**kwargs) -> Pipeline:
@@ -20,5 +26,41 @@ def create_pipeline(**kwargs) -> Pipeline:
             inputs="prepared_goals_data",
             outputs="goals_features_data",
             name="create_goals_features_node"
+        ),
+        node(
+            func=build_goals_features_state,
+            inputs="prepared_goals_data",
+            outputs="goals_features_state",
+            name="build_goals_features_state_node"
+        ),
+        node(
+            func=build_team_features_snapshot,
+            inputs="prepared_goals_data",
+            outputs=["team_features_snapshot", "pair_features_snapshot"],
+            name="build_team_features_snapshot_node"
+        )
+    ])
+
+
+def create_incremental_pipeline(**kwargs) -> Pipeline:
+    """Dopisuje cechy tylko dla nowych meczów - wymaga wcześniejszego pełnego uruchomienia"""
+    return pipeline([
+        node(
+            func=prepare_goals_data,
+            inputs="matches_results_separated",
+            outputs="prepared_goals_data",
+            name="prepare_goals_data_node"
+        ),
+        node(
+            func=update_goals_features,
+            inputs=["prepared_goals_data", "goals_features_data_previous", "goals_features_state_previous"],
+            outputs=["goals_features_data", "goals_features_state"],
+            name="update_goals_features_node"
+        ),
+        node(
+            func=build_team_features_snapshot,
+            inputs="prepared_goals_data",
+            outputs=["team_features_snapshot", "pair_features_snapshot"],
+            name="build_team_features_snapshot_node"
         )
     ])
@@ -2,11 +2,26 @@
 This is a boilerplate pipeline 'model_training'
 generated using Kedro 0.19.12
 """
-from typing import Dict, Any
+import hashlib
+import json
+import math
+import multiprocessing as mp
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List
 
+import numpy as np
 import pandas as pd
 from autogluon.tabular import TabularPredictor
 import logging
+
+try:
+    import psutil
+except ImportError:  # raport bez pomiaru pamięci
+    psutil = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,182 +51,271 @@ def train_automl_model(data: pd.DataFrame) -> TabularPredictor:
 
     return predictor
 
-def train_goals_models(train_data: pd.DataFrame) -> Dict[str, TabularPredictor]:
+REGRESSION_HYPERPARAMETERS = {
+    'GBM': {'num_boost_round': 300, 'learning_rate': 0.05, 'max_depth': 6},
+    'XGB': {'n_estimators': 300, 'learning_rate': 0.05, 'max_depth': 6, 'subsample': 0.8},
+    'RF': {'n_estimators': 200, 'max_depth': 10, 'min_samples_split': 5},
+    'NN_TORCH': {'num_epochs': 100, 'learning_rate': 0.01, 'weight_decay': 0.01}
+}
+BINARY_HYPERPARAMETERS = {
+    'GBM': {'num_boost_round': 400, 'learning_rate': 0.04, 'max_depth': 7},
+    'CAT': {'iterations': 500, 'learning_rate': 0.04, 'depth': 8},
+    'XGB': {'n_estimators': 400, 'learning_rate': 0.04, 'max_depth': 7, 'subsample': 0.85},
+    'RF': {'n_estimators': 300, 'max_depth': 12, 'min_samples_split': 4},
+    'NN_TORCH': {'num_epochs': 150, 'learning_rate': 0.008, 'weight_decay': 0.005}
+}
+
+# Modele dla przewidywania goli: klucz w wyniku, label, katalog w models_dir, typ problemu, metryka, hiperparametry
+GOALS_MODELS = [
+    ('total_goals_regression', 'total_goals', 'total_goals_regression', 'regression',
+     'root_mean_squared_error', REGRESSION_HYPERPARAMETERS),
+    ('goals_classification', 'goals_category', 'goals_classification', 'multiclass', 'accuracy', {
+        'GBM': {'num_boost_round': 350, 'learning_rate': 0.045, 'max_depth': 7},
+        'CAT': {'iterations': 600, 'learning_rate': 0.03, 'depth': 8},
+        'XGB': {'n_estimators': 350, 'learning_rate': 0.045, 'max_depth': 7},
+    }),
+    ('over_2_5', 'over_2_5', 'over_2_5', 'binary', 'roc_auc', BINARY_HYPERPARAMETERS),
+    ('btts', 'btts', 'btts', 'binary', 'roc_auc', BINARY_HYPERPARAMETERS),
+    ('home_goals', 'home_goals', 'home_goals_model', 'regression',
+     'root_mean_squared_error', REGRESSION_HYPERPARAMETERS),
+    ('away_goals', 'away_goals', 'away_goals_model', 'regression',
+     'root_mean_squared_error', REGRESSION_HYPERPARAMETERS),
+]
+
+# Zapisywany po udanym treningu - model z tym plikiem, tymi samymi danymi i konfiguracją jest pomijany przy wznowieniu
+TRAINING_MARKER = "training_complete.json"
+GOALS_MODELS_PRESETS = 'high_quality'
+
+
+def select_feature_columns(train_data: pd.DataFrame) -> List[str]:
+    """Cechy bez targetów"""
+    return [col for col in train_data.columns
+            if not col.startswith(('target_', 'total_goals', 'over_', 'btts', 'goals_category'))
+            and col not in ['home_goals', 'away_goals', 'result', 'match_id']]
+
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """Skrót danych treningowych - wznowienie pomija tylko modele wytrenowane na tych samych danych"""
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes() + ",".join(data.columns).encode()).hexdigest()
+
+
+def training_fingerprint(data: pd.DataFrame, config: Dict[str, Any]) -> str:
+    """Skrót danych jednego modelu (cechy i label) i jego konfiguracji - zmiana któregokolwiek wymusza trening"""
+    config_json = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1((data_fingerprint(data) + config_json).encode()).hexdigest()
+
+
+def is_trained(path: str, fingerprint: str) -> bool:
+    try:
+        with open(os.path.join(path, TRAINING_MARKER)) as f:
+            return json.load(f).get("training_fingerprint") == fingerprint
+    except (OSError, ValueError):
+        return False
+
+
+def fit_goals_model(label: str, path: str, problem_type: str, eval_metric: str,
+                    hyperparameters: Dict[str, Any], data: pd.DataFrame, time_limit: float,
+                    num_cpus: int, max_memory_usage_ratio: float, fingerprint: str) -> str:
+    """
+    Trening jednego modelu - uruchamiany w osobnym procesie, zwraca ścieżkę modelu
+    """
+    marker = os.path.join(path, TRAINING_MARKER)
+    if os.path.exists(marker):
+        os.remove(marker)
+
+    predictor = TabularPredictor(
+        label=label,
+        path=path,
+        problem_type=problem_type,
+        eval_metric=eval_metric
+    ).fit(
+        data,
+        time_limit=time_limit,
+        presets=GOALS_MODELS_PRESETS,
+        verbosity=2,
+        hyperparameters=hyperparameters,
+        save_bag_folds=True,
+        num_cpus=num_cpus,
+        ag_args_fit={'max_memory_usage_ratio': max_memory_usage_ratio}
+    )
+
+    with open(marker, "w") as f:
+        json.dump({"label": label, "training_fingerprint": fingerprint, "time_limit": time_limit,
+                   "num_cpus": num_cpus, "best_model": predictor.model_best}, f)
+    return path
+
+
+def train_goals_models(train_data: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, TabularPredictor]:
     """
     Trenowanie różnych modeli dla przewidywania goli
+
+    The six targets are trained concurrently in a process pool. Cores and the
+    memory share are split between the jobs running at once, and the wall-clock
+    `time_limit` is spread over the waves of jobs. A failed target does not
+    stop the others; a rerun with `resume` only trains targets without a
+    completed model for the same features, label and model configuration.
     """
+    models_dir = params.get("models_dir", "data/08_reporting")
+    time_limit = params.get("time_limit", 600)
+    resume = params.get("resume", True)
+    total_cpus = params.get("num_cpus") or os.cpu_count() or 1
+
+    feature_columns = select_feature_columns(train_data)
+    logger.info(f"Używam {len(feature_columns)} cech do trenowania")
+
+    jobs = {}
+    for key, label, directory, problem_type, eval_metric, hyperparameters in GOALS_MODELS:
+        path = os.path.join(models_dir, directory)
+        # Skonfigurowany time_limit, nie czas na falę - ten zależy od liczby modeli do wytrenowania
+        fingerprint = training_fingerprint(train_data[feature_columns + [label]], {
+            "label": label, "problem_type": problem_type, "eval_metric": eval_metric,
+            "hyperparameters": hyperparameters, "presets": GOALS_MODELS_PRESETS, "time_limit": time_limit,
+        })
+        if resume and is_trained(path, fingerprint):
+            logger.info(f"Model {key} już wytrenowany w {path} - pomijam")
+            continue
+        jobs[key] = (label, path, problem_type, eval_metric, hyperparameters, fingerprint)
+
+    if jobs:
+        max_parallel_jobs = max(1, min(params.get("max_parallel_jobs", len(GOALS_MODELS)), len(jobs)))
+        waves = math.ceil(len(jobs) / max_parallel_jobs)
+        job_time_limit = time_limit / waves
+        num_cpus = max(1, total_cpus // max_parallel_jobs)
+        max_memory_usage_ratio = params.get("max_memory_usage_ratio", 1.0) / max_parallel_jobs
+        logger.info(f"Trenowanie {len(jobs)} modeli, {max_parallel_jobs} równolegle: "
+                    f"{job_time_limit:.0f}s, {num_cpus} CPU i {max_memory_usage_ratio:.0%} pamięci na model")
+
+        # spawn - forking a process that already imported torch / OpenMP can deadlock
+        failed = {}
+        with ProcessPoolExecutor(max_workers=max_parallel_jobs, mp_context=mp.get_context("spawn")) as executor:
+            futures = {
+                executor.submit(
+                    fit_goals_model, label, path, problem_type, eval_metric, hyperparameters,
+                    train_data[feature_columns + [label]], job_time_limit, num_cpus, max_memory_usage_ratio,
+                    fingerprint
+                ): key
+                for key, (label, path, problem_type, eval_metric, hyperparameters, fingerprint) in jobs.items()
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    logger.info(f"Model {key} wytrenowany w {future.result()}")
+                except Exception as e:
+                    logger.error(f"❌ Trening modelu {key} nie powiódł się: {e}")
+                    failed[key] = e
+
+        if failed:
+            raise RuntimeError(f"Nie udało się wytrenować modeli: {sorted(failed)}. "
+                               f"Ponowne uruchomienie wytrenuje tylko te modele.")
+
     models = {}
-    time_per_model = 600
+    for key, label, directory, problem_type, eval_metric, hyperparameters in GOALS_MODELS:
+        models[key] = TabularPredictor.load(os.path.join(models_dir, directory))
+        logger.info(f"Model {key} ({label}). Leaderboard:")
+        logger.info(models[key].leaderboard())
 
-    # Przygotuj cechy (bez targetów)
-    feature_columns = [col for col in train_data.columns
-                       if not col.startswith(('target_', 'total_goals', 'over_', 'btts', 'goals_category'))
-                       and col not in ['home_goals', 'away_goals', 'result']]
+    return models
 
-    logger.info(f"Używam {len(feature_columns)} cech do trenowania")
 
-    # 1. MODEL REGRESYJNY - łączna liczba goli
-    logger.info("Trenowanie modelu regresyjnego dla łącznej liczby goli...")
-    # log columns used for training
+def export_serving_model(predictor: TabularPredictor, path: str) -> TabularPredictor:
+    """
+    Lekka wersja modelu do serwowania: najlepszy model dopasowany na wszystkich danych, bez foldów baggingu
 
-    total_goals_regression_model_columns = feature_columns + ['total_goals']
-    logger.info(f"Columns used for training total_goals_regression_model: {total_goals_regression_model_columns}")
+    The trained predictor is cloned to `path` first, so the full ensemble stays
+    untouched. In the clone the best model and its stack ancestors are refit
+    on all the data, every other model is deleted and training artifacts are
+    dropped.
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    clone = predictor.clone(path=path, return_clone=True)
+    clone.refit_full(model="best", set_best_to_refit_full=True)
+    clone.delete_models(models_to_keep="best", dry_run=False)
+    clone.save_space()
+    return clone
 
-    total_goals_regression_model = TabularPredictor(
-        label='total_goals',
-        path="data/08_reporting/total_goals_regression",
-        problem_type='regression',
-        eval_metric='root_mean_squared_error'
-    ).fit(
-        train_data[total_goals_regression_model_columns],
-        time_limit=time_per_model,
-        presets='high_quality',
-        verbosity=2,
-        hyperparameters={
-            'GBM': {'num_boost_round': 300, 'learning_rate': 0.05, 'max_depth': 6},
-            'XGB': {'n_estimators': 300, 'learning_rate': 0.05, 'max_depth': 6, 'subsample': 0.8},
-            'RF': {'n_estimators': 200, 'max_depth': 10, 'min_samples_split': 5},
-            'NN_TORCH': {'num_epochs': 100, 'learning_rate': 0.01, 'weight_decay': 0.01}
-        },
-        save_bag_folds=True
-    )
 
-    models['total_goals_regression'] = total_goals_regression_model
-    logger.info(f"Model regresyjny dla łącznej liczby goli wytrenowany. Leaderboard:")
-    logger.info(total_goals_regression_model.leaderboard())
+def directory_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 2**20
 
-    logger.info("Trenowanie modelu klasyfikacyjnego dla kategorii goli...")
 
-    goals_classification_model = TabularPredictor(
-        label='goals_category',
-        path="data/08_reporting/goals_classification",
-        problem_type='multiclass',
-        eval_metric='accuracy'
-    ).fit(
-        train_data[feature_columns + ['goals_category']],
-        time_limit=time_per_model,
-        presets='high_quality',
-        verbosity=2,
-        hyperparameters={
-            'GBM': {'num_boost_round': 350, 'learning_rate': 0.045, 'max_depth': 7},
-            'CAT': {'iterations': 600, 'learning_rate': 0.03, 'depth': 8},
-            'XGB': {'n_estimators': 350, 'learning_rate': 0.045, 'max_depth': 7},
-        },
-        save_bag_folds = True
+def measure_predictor(path: str, data: pd.DataFrame, repeats: int) -> Dict[str, Any]:
+    """Czas predykcji i pamięć świeżo wczytanego predyktora"""
+    rss_before = psutil.Process().memory_info().rss if psutil else None
+    predictor = TabularPredictor.load(path)
+    single_row = data.iloc[[-1]]
+    predictor.predict(single_row)  # pierwsze wywołanie wczytuje modele z dysku
+    rss_mb = (psutil.Process().memory_info().rss - rss_before) / 2**20 if psutil else np.nan
 
-    )
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        predictor.predict(single_row)
+        latencies.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    predictions = predictor.predict(data)
+    batch_seconds = time.perf_counter() - started
 
-    models['goals_classification'] = goals_classification_model
-    logger.info(f"Model klasyfikacyjny dla kategorii goli wytrenowany. Leaderboard:")
-    logger.info(goals_classification_model.leaderboard())
+    score = predictor.evaluate(data, silent=True)[predictor.eval_metric.name]
+    return {
+        "models": len(predictor.model_names()),
+        "disk_mb": directory_size_mb(path),
+        "rss_mb": rss_mb,
+        "single_row_ms": float(np.median(latencies)) * 1000,
+        "batch_ms": batch_seconds * 1000,
+        "metric": predictor.eval_metric.name,
+        "score": score,
+        "predictions": predictions,
+    }
 
-    logger.info("Trenowanie modelu Over/Under 2.5...")
-    over_2_5_model = TabularPredictor(
-        label='over_2_5',
-        path="data/08_reporting/over_2_5",
-        problem_type='binary',
-        eval_metric='roc_auc'
-    ).fit(
-        train_data[feature_columns + ['over_2_5']],
-        time_limit=time_per_model,
-        presets='high_quality',
-        verbosity=2,
-        hyperparameters={
-            'GBM': {'num_boost_round': 400, 'learning_rate': 0.04, 'max_depth': 7},
-            'CAT': {'iterations': 500, 'learning_rate': 0.04, 'depth': 8},
-            'XGB': {'n_estimators': 400, 'learning_rate': 0.04, 'max_depth': 7, 'subsample': 0.85},
-            'RF': {'n_estimators': 300, 'max_depth': 12, 'min_samples_split': 4},
-            'NN_TORCH': {'num_epochs': 150, 'learning_rate': 0.008, 'weight_decay': 0.005}
-        },
-        save_bag_folds=True
-    )
 
-    models['over_2_5'] = over_2_5_model
-    logger.info(f"Model Over/Under 2.5 wytrenowany. Leaderboard:")
-    logger.info(over_2_5_model.leaderboard())
+def export_serving_models(models: Dict[str, TabularPredictor], train_data: pd.DataFrame,
+                          params: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Eksport lekkich modeli do serwowania i raport porównujący je z pełnymi ensemblami
 
-    logger.info("Trenowanie modelu BTTS...")
-    btts_model = TabularPredictor(
-        label='btts',
-        path="data/08_reporting/btts",
-        problem_type='binary',
-        eval_metric='roc_auc'
-    ).fit(
-        train_data[feature_columns + ['btts']],
-        time_limit=time_per_model,
-        presets='high_quality',
-        verbosity=2,
-        hyperparameters={
-            'GBM': {'num_boost_round': 400, 'learning_rate': 0.04, 'max_depth': 7},
-            'CAT': {'iterations': 500, 'learning_rate': 0.04, 'depth': 8},
-            'XGB': {'n_estimators': 400, 'learning_rate': 0.04, 'max_depth': 7, 'subsample': 0.85},
-            'RF': {'n_estimators': 300, 'max_depth': 12, 'min_samples_split': 4},
-            'NN_TORCH': {'num_epochs': 150, 'learning_rate': 0.008, 'weight_decay': 0.005}
-        },
-        save_bag_folds=True
-    )
+    Each variant is measured on the `eval_rows` most recent rows: model count,
+    size on disk, memory of a freshly loaded predictor, median single-row and
+    batch latency, the eval metric and how close its predictions are to the
+    full ensemble. Both variants have seen these rows in training, so the
+    metric delta shows what the export loses, not the generalisation error.
+    """
+    export_dir = params.get("export_dir", "data/08_reporting/deploy")
+    repeats = params.get("latency_repeats", 20)
+    eval_data = train_data.tail(params.get("eval_rows", 1000))
 
-    models['btts'] = btts_model
-    logger.info(f"Model BTTS wytrenowany. Leaderboard:")
-    logger.info(btts_model.leaderboard())
+    rows = []
+    for key, predictor in models.items():
+        path = os.path.join(export_dir, os.path.basename(os.path.normpath(predictor.path)))
+        logger.info(f"Eksport modelu {key} do {path}")
+        export_serving_model(predictor, path)
 
-    # 5. MODELE DLA GOLI OSOBNO
-    logger.info("Trenowanie modeli dla goli osobno...")
+        full = measure_predictor(predictor.path, eval_data, repeats)
+        deploy = measure_predictor(path, eval_data, repeats)
+        # Zgodność z pełnym ensemblem: MAE dla regresji, odsetek identycznych klas dla klasyfikacji
+        if predictor.problem_type == "regression":
+            difference = {"prediction_mae": float(np.mean(np.abs(full["predictions"] - deploy["predictions"]))),
+                          "prediction_agreement": np.nan}
+        else:
+            difference = {"prediction_mae": np.nan,
+                          "prediction_agreement": float((full["predictions"] == deploy["predictions"]).mean())}
+        identical = {name: value if pd.isna(value) else float(name == "prediction_agreement")
+                     for name, value in difference.items()}
 
-    home_goals_model = TabularPredictor(
-        label='home_goals',
-        path="data/08_reporting/home_goals_model",
-        problem_type='regression',
-        eval_metric='root_mean_squared_error'
-    ).fit(
-        train_data[feature_columns + ['home_goals']],
-        time_limit=time_per_model,
-        presets='high_quality',
-        verbosity=2,
-        hyperparameters={
-            'GBM': {'num_boost_round': 300, 'learning_rate': 0.05, 'max_depth': 6},
-            'XGB': {'n_estimators': 300, 'learning_rate': 0.05, 'max_depth': 6, 'subsample': 0.8},
-            'RF': {'n_estimators': 200, 'max_depth': 10, 'min_samples_split': 5},
-            'NN_TORCH': {'num_epochs': 100, 'learning_rate': 0.01, 'weight_decay': 0.01}
-        },
-        save_bag_folds=True
-    )
-    models['home_goals'] = home_goals_model
-    logger.info(f"Model dla home_goals wytrenowany. Leaderboard:")
-    logger.info(home_goals_model.leaderboard())
-
-    # Model for away_goals
-    away_goals_model = TabularPredictor(
-        label='away_goals',
-        path="data/08_reporting/away_goals_model",
-        problem_type='regression',
-        eval_metric='root_mean_squared_error'
-    ).fit(
-        train_data[feature_columns + ['away_goals']],
-        time_limit=time_per_model,
-        presets='high_quality',
-        verbosity=2,
-        hyperparameters={
-            'GBM': {'num_boost_round': 300, 'learning_rate': 0.05, 'max_depth': 6},
-            'XGB': {'n_estimators': 300, 'learning_rate': 0.05, 'max_depth': 6, 'subsample': 0.8},
-            'RF': {'n_estimators': 200, 'max_depth': 10, 'min_samples_split': 5},
-            'NN_TORCH': {'num_epochs': 100, 'learning_rate': 0.01, 'weight_decay': 0.01}
-        },
-        save_bag_folds=True
-    )
-    models['away_goals'] = away_goals_model
-
-    logger.info(f"Model Over/Under 2.5 wytrenowany. Leaderboard:")
-    logger.info(over_2_5_model.leaderboard())
-    logger.info(f"Model BTTS wytrenowany. Leaderboard:")
-    logger.info(btts_model.leaderboard())
-    logger.info(f"Model dla home_goals wytrenowany. Leaderboard:")
-    logger.info(home_goals_model.leaderboard())
-    logger.info(f"Model dla away_goals wytrenowany. Leaderboard:")
-    logger.info(away_goals_model.leaderboard())
-    logger.info(f"Model klasyfikacyjny dla kategorii goli wytrenowany. Leaderboard:")
-    logger.info(goals_classification_model.leaderboard())
-    logger.info(f"Model regresyjny dla łącznej liczby goli wytrenowany. Leaderboard:")
-    logger.info(total_goals_regression_model.leaderboard())
-
-    return models
\ No newline at end of file
+        for variant, result in [("full", full), ("deploy", deploy)]:
+            rows.append({
+                "target": key,
+                "variant": variant,
+                **{name: value for name, value in result.items() if name != "predictions"},
+                "score_delta": result["score"] - full["score"],
+                **(difference if variant == "deploy" else identical),
+            })
+        logger.info(f"Model {key}: {full['single_row_ms']:.1f} ms -> {deploy['single_row_ms']:.1f} ms na wiersz, "
+                    f"{full['disk_mb']:.0f} MB -> {deploy['disk_mb']:.0f} MB, "
+                    f"{full['metric']} {full['score']:.4f} -> {deploy['score']:.4f}")
+
+    return pd.DataFrame(rows)
@@ -4,15 +4,21 @@ generated using Kedro 0.19.12
 """
 
 from kedro.pipeline import node, Pipeline, pipeline  # noqa
-from .nodes import train_automl_model, train_goals_models
+from .nodes import train_automl_model, train_goals_models, export_serving_models
 
 
 def create_pipeline(**kwargs) -> Pipeline:
     return pipeline([
         node(
             func=train_goals_models,
-            inputs="goals_features_data",
+            inputs=["goals_features_data", "params:goals_models"],
             outputs="trained_model",
             name="train_goals_models_node",
         ),
+        node(
+            func=export_serving_models,
+            inputs=["trained_model", "goals_features_data", "params:serving_models"],
+            outputs="serving_models_report",
+            name="export_serving_models_node",
+        ),
     ])
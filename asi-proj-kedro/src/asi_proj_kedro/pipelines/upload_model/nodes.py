@@ -4,70 +4,95 @@ generated using Kedro 0.19.12
 """
 
 import pandas as pd
-from autogluon.tabular import TabularPredictor
 import boto3
 from pathlib import Path
 import logging
+from typing import Any, Dict
+
+from asi_proj_kedro.s3_sync import MAX_WORKERS, S3Sync
 
 logger = logging.getLogger(__name__)
 
 AWS_ACCESS_KEY_ID = "AWS_ACCESS_KEY_ID"
 AWS_SECRET_ACCESS_KEY = "AWS_SECRET_ACCESS_KEY"
 AWS_REGION = "eu-central-1"
+# Katalogi w data/08_reporting wysyłane do models/ - modele celów i ich kopie do serwowania
+MODEL_DIRECTORIES = [
+    "home_goals_model",
+    "away_goals_model",
+    "btts",
+    "goals_classification",
+    "over_2_5",
+    "total_goals_regression",
+    "deploy",
+]
 
 
-def upload_everything(_input: TabularPredictor) -> pd.DataFrame:
-    """Upload całego katalogu do S3"""
+def upload_everything(_input: pd.DataFrame, params: Dict[str, Any], s3_client=None) -> pd.DataFrame:
+    """Upload całego katalogu do S3 - wysyłane są tylko nowe lub zmienione pliki"""
 
     bucket_name = "my-football-models"
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name=AWS_REGION
-    )
+    if s3_client is None:
+        s3_client = boto3.client(
+            's3',
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+            region_name=AWS_REGION
+        )
     models_dir = './../../data/08_reporting/'
     local_path = Path(models_dir).resolve()
+    sync = S3Sync(s3_client, bucket_name, max_workers=params.get("max_workers", MAX_WORKERS))
+    # Jeden manifest dla modeli i bazy - klucze to klucze S3
+    manifest_path = params.get("manifest_path")
 
     logger.info(f"🚀 Wysyłam wszystko z {local_path} do s3://{bucket_name}/")
 
     file_count = 0
+    failed = {}
 
     # Sprawdź, czy katalog istnieje
-    # if not local_path.exists() or not local_path.is_dir():
-    #     logger.error(f"❌ Katalog {local_path} nie istnieje lub nie jest katalogiem.")
-    #     return pd.DataFrame({"status": ["error"], "message": ["Directory does not exist or is not a directory"]})
-    # for file_path in local_path.rglob("*"):
-    #     if file_path.is_file():
-    #         # Użyj relatywnej ścieżki jako klucz S3
-    #         model_key = str(file_path.relative_to(local_path)).replace("\\", "/")
-    #         s3_key = f"models/{model_key}"
-    #
-    #         try:
-    #             s3_client.upload_file(str(file_path), bucket_name, s3_key)
-    #             file_count += 1
-    #
-    #             if file_count % 50 == 0:
-    #                 logger.info(f"📤 {file_count} plików...")
-    #
-    #         except Exception as e:
-    #             logger.error(f"❌ Błąd: {file_path} -> {e}")
-    #             continue
-
-    logger.info(f"✅ Wysłano {file_count} plików do s3://{bucket_name}/models/")
+    if not params.get("upload_models", True):
+        logger.info("Wysyłanie modeli wyłączone (upload_models: false)")
+    elif not local_path.exists() or not local_path.is_dir():
+        logger.error(f"❌ Katalog {local_path} nie istnieje lub nie jest katalogiem.")
+        return pd.DataFrame({"status": ["error"], "message": ["Directory does not exist or is not a directory"]})
+    else:
+        # Tylko katalogi modeli - raporty, historia wydajności i metadane cache zostają lokalnie
+        for directory in params.get("model_directories", MODEL_DIRECTORIES):
+            model_path = local_path / directory
+            if not model_path.is_dir():
+                logger.warning(f"Katalog modelu {model_path} nie istnieje, nie został wysłany.")
+                continue
+            prefix = f"models/{directory.strip('/')}/"
+            result = sync.upload_directory(model_path, prefix, manifest_path=manifest_path)
+            file_count += len(result.transferred)
+            failed.update(result.failed)
+            logger.info(f"✅ Wysłano {len(result.transferred)} plików do s3://{bucket_name}/{prefix}, "
+                        f"{len(result.skipped)} bez zmian")
 
-    try:
-        additional_file = Path("./../../data/05_final_data/goals_features_data.csv")
-        if additional_file.exists():
-            s3_key = f"database/{additional_file.name}"
-            s3_client.upload_file(str(additional_file), bucket_name, s3_key)
-            file_count += 1
-            logger.info(f"📤 Dodatkowy plik {additional_file} wysłany jako {s3_key}")
-        else:
-            logger.warning(f"Plik {additional_file} nie istnieje, nie został wysłany.")
-    except Exception as e:
-        logger.error(f"❌ Błąd podczas wysyłania dodatkowego pliku: {e}")
+    # Pliki bazy dla API - parquet tylko po uruchomieniu z `--env parquet`
+    database_files = [
+        Path("./../../data/05_final_data/goals_features_data.csv"),
+        Path("./../../data/04_separated_statistics/matches_results_separated.parquet"),
+        Path("./../../data/05_final_data/team_features_snapshot.parquet"),
+        Path("./../../data/05_final_data/pair_features_snapshot.parquet"),
+    ]
+    for additional_file in database_files:
+        try:
+            if additional_file.exists():
+                s3_key = f"database/{additional_file.name}"
+                result = sync.upload_file(additional_file, s3_key, manifest_path=manifest_path)
+                file_count += len(result.transferred)
+                failed.update(result.failed)
+                if result.transferred:
+                    logger.info(f"📤 Dodatkowy plik {additional_file} wysłany jako {s3_key}")
+            else:
+                logger.warning(f"Plik {additional_file} nie istnieje, nie został wysłany.")
+        except Exception as e:
+            logger.error(f"❌ Błąd podczas wysyłania dodatkowego pliku: {e}")
 
+    if failed:
+        # Ponowne uruchomienie wyśle tylko pliki, których brakuje w S3
+        logger.error(f"❌ Nie udało się wysłać {len(failed)} plików: {sorted(failed)}")
+        return pd.DataFrame({"status": ["partial"], "files_uploaded": [file_count], "files_failed": [len(failed)]})
     return pd.DataFrame({"status": ["success"], "files_uploaded": [file_count]})
-
-
@@ -11,7 +11,7 @@ def create_pipeline(**kwargs) -> Pipeline:
     return pipeline([
         node(
             func=upload_everything,
-            inputs="trained_model",
+            inputs=["serving_models_report", "params:s3_sync"],
             outputs="empty_output",
             name="upload_everything_node"
         )
@@ -0,0 +1,88 @@
+"""
+Project runners.
+
+`CachedSequentialRunner` is the default runner of `kedro run` (see `cli.py`). It
+runs nodes in the same order as `SequentialRunner`, but skips every node whose
+key in the node cache (`asi_proj_kedro.node_cache`) matches the previous run and
+whose outputs are still on disk. With `node_cache.enabled: false` it behaves
+exactly like `SequentialRunner`.
+
+`InMemoryParallelRunner` is Kedro's `ParallelRunner` for the `in_memory`
+environment: intermediate datasets declared there as `MemoryDataset` are handed
+between worker processes through shared memory instead of being rejected.
+"""
+import time
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+
+from kedro.io import MemoryDataset, SharedMemoryDataset
+from kedro.runner import ParallelRunner, SequentialRunner
+from kedro.runner.task import Task
+
+from asi_proj_kedro.hooks import names
+from asi_proj_kedro.node_cache import NodeCache
+
+
+class CachedSequentialRunner(SequentialRunner):
+    # The loop below is the sequential branch of Kedro's AbstractRunner._run, with its private helpers.
+    # Kedro is pinned exactly and tests/test_node_cache.py fails when that code changes
+    def _run(self, pipeline, catalog, hook_manager=None, session_id=None) -> None:
+        settings = catalog.load("parameters").get("node_cache") or {}
+        if not settings.get("enabled", False):
+            return super()._run(pipeline, catalog, hook_manager, session_id)
+
+        cache = NodeCache(
+            Path(settings.get("cache_dir", "data/09_node_cache")),
+            invalidate=bool(settings.get("invalidate", False)),
+            invalidate_nodes=names(settings.get("invalidate_nodes")),
+            exclude_nodes=names(settings.get("exclude_nodes")),
+        )
+
+        nodes = pipeline.nodes
+        self._validate_catalog(catalog, pipeline)
+        self._validate_nodes(nodes)
+        self._set_manager_datasets(catalog, pipeline)
+        load_counts = Counter(chain.from_iterable(node.inputs for node in nodes))
+        done_nodes = set()
+
+        try:
+            for node in nodes:
+                started = time.perf_counter()
+                key = cache.node_key(node, catalog)
+                if cache.is_hit(node, catalog, key):
+                    cache.add_report(node, "hit", time.perf_counter() - started)
+                    self._logger.info("Node cache hit, outputs reused: %s", node.name)
+                else:
+                    try:
+                        Task(node=node, catalog=catalog, hook_manager=hook_manager,
+                             is_async=self._is_async, session_id=session_id).execute()
+                    except Exception:
+                        self._suggest_resume_scenario(pipeline, done_nodes, catalog)
+                        raise
+                    seconds = time.perf_counter() - started
+                    if key is not None:
+                        cache.record(node, catalog, key, seconds)
+                    cache.add_report(node, "miss" if key is not None else "uncached", seconds)
+                    self._logger.info("Completed node: %s", node.name)
+                done_nodes.add(node)
+                self._logger.info("Completed %d out of %d tasks", len(done_nodes), len(nodes))
+                self._release_datasets(node, catalog, load_counts, pipeline)
+        finally:
+            # Nodes finished before a failure keep their entries
+            cache.save()
+            summary = cache.write_report(Path(settings.get("report_path", "data/08_reporting/node_cache.json")))
+            self._logger.info(
+                f"Node cache: {summary['hit']} hits, {summary['miss']} misses, {summary['uncached']} uncached, "
+                f"~{summary['saved_seconds']:.1f}s saved"
+            )
+
+
+class InMemoryParallelRunner(ParallelRunner):
+    def _run(self, pipeline, catalog, hook_manager=None, session_id=None) -> None:
+        # ParallelRunner refuses MemoryDataset outputs - their content would stay in the worker
+        # that produced it. SharedMemoryDataset keeps it in the runner's manager process instead
+        for name in pipeline.all_outputs():
+            if isinstance(catalog._get_dataset(name), MemoryDataset):
+                catalog.add(name, SharedMemoryDataset(), replace=True)
+        return super()._run(pipeline, catalog, hook_manager, session_id)
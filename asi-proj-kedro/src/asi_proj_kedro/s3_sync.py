@@ -0,0 +1,237 @@
+"""
+Incremental S3 sync shared by the Kedro upload pipeline and the API's fetch on start-up.
+
+Listing is paginated, transfers run in a thread pool (large files as multipart
+transfers) and a file is only transferred when its size or ETag differs from
+the other side. Local ETags are cached in a manifest next to the files, keyed
+by size and mtime, so unchanged files are not re-hashed on every run and an
+interrupted sync resumes with the files that did not finish.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".s3_sync_manifest.json"
+# boto3 defaults - the local ETag of a multipart object is only reproducible with the same part size
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MAX_WORKERS = 16
+# Completed transfers between manifest checkpoints
+MANIFEST_SAVE_EVERY = 50
+
+
+@dataclass
+class SyncResult:
+    transferred: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+def list_objects(s3_client, bucket: str, prefix: str) -> Dict[str, Tuple[int, str]]:
+    """All objects under `prefix` as key -> (size, ETag), following pagination."""
+    objects = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith("/"):
+                continue  # skip folders
+            objects[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+    return objects
+
+
+def file_etag(path: Path, multipart_threshold: int = MULTIPART_THRESHOLD,
+              multipart_chunksize: int = MULTIPART_CHUNKSIZE) -> str:
+    """ETag S3 assigns to `path` when uploaded with the given transfer settings."""
+    size = path.stat().st_size
+    part_digests = []
+    whole = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(multipart_chunksize), b""):
+            if size < multipart_threshold:
+                whole.update(chunk)
+            else:
+                part_digests.append(hashlib.md5(chunk).digest())
+    if size < multipart_threshold:
+        return whole.hexdigest()
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+class SyncManifest:
+    """Local file state (size, mtime) and the ETag it was last synced as, keyed by S3 key."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def cached_etag(self, key: str, local_file: Path) -> Optional[str]:
+        entry = self._entries.get(key)
+        stat = local_file.stat()
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["etag"]
+        return None
+
+    def record(self, key: str, local_file: Path, etag: str) -> None:
+        stat = local_file.stat()
+        with self._lock:
+            self._entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "etag": etag}
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class S3Sync:
+    """Parallel, incremental transfers between a local directory and an S3 prefix."""
+
+    def __init__(self, s3_client, bucket: str, max_workers: int = MAX_WORKERS,
+                 multipart_threshold: int = MULTIPART_THRESHOLD,
+                 multipart_chunksize: int = MULTIPART_CHUNKSIZE):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        # Files are already transferred in parallel, parts of one file use a few extra threads
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=4,
+        )
+
+    def local_etag(self, manifest: SyncManifest, key: str, local_file: Path) -> str:
+        etag = manifest.cached_etag(key, local_file)
+        if etag is None:
+            etag = file_etag(local_file, self.multipart_threshold, self.multipart_chunksize)
+            manifest.record(key, local_file, etag)
+        return etag
+
+    def is_synced(self, manifest: SyncManifest, key: str, local_file: Path, size: int, etag: str) -> bool:
+        if not local_file.is_file() or local_file.stat().st_size != size:
+            return False
+        return self.local_etag(manifest, key, local_file) == etag
+
+    def download_prefix(self, prefix: str, local_dir, manifest_path=None) -> SyncResult:
+        """Download every object under `prefix` that is missing or different in `local_dir`."""
+        local_dir = Path(local_dir).resolve()
+        manifest = SyncManifest(Path(manifest_path) if manifest_path else local_dir / MANIFEST_NAME)
+        remote = list_objects(self.s3_client, self.bucket, prefix)
+        if not remote:
+            logger.warning(f"No files found in s3://{self.bucket}/{prefix}")
+
+        result = SyncResult()
+        jobs = {}
+        for key, (size, etag) in remote.items():
+            local_file = local_dir / key[len(prefix):]
+            if self.is_synced(manifest, key, local_file, size, etag):
+                result.skipped.append(key)
+            else:
+                jobs[key] = (local_file, etag)
+
+        logger.info(f"⬇️ s3://{self.bucket}/{prefix}: {len(jobs)} to download, {len(result.skipped)} up to date")
+        self._run(jobs, self._download, manifest, result)
+        return result
+
+    def upload_directory(self, local_dir, prefix: str, manifest_path=None) -> SyncResult:
+        """Upload every file of `local_dir` that is missing or different under `prefix`."""
+        local_dir = Path(local_dir).resolve()
+        manifest = SyncManifest(Path(manifest_path) if manifest_path else local_dir / MANIFEST_NAME)
+        remote = list_objects(self.s3_client, self.bucket, prefix)
+
+        result = SyncResult()
+        jobs = {}
+        for local_file in self._local_files(local_dir):
+            key = prefix + local_file.relative_to(local_dir).as_posix()
+            etag = self.local_etag(manifest, key, local_file)
+            if key in remote and remote[key] == (local_file.stat().st_size, etag):
+                result.skipped.append(key)
+            else:
+                jobs[key] = (local_file, etag)
+
+        logger.info(f"📤 {local_dir} -> s3://{self.bucket}/{prefix}: "
+                    f"{len(jobs)} to upload, {len(result.skipped)} up to date")
+        self._run(jobs, self._upload, manifest, result)
+        return result
+
+    def upload_file(self, local_file, key: str, manifest_path=None) -> SyncResult:
+        """Upload a single file unless the object under `key` already matches it."""
+        local_file = Path(local_file).resolve()
+        manifest = SyncManifest(Path(manifest_path) if manifest_path else local_file.parent / MANIFEST_NAME)
+        remote = list_objects(self.s3_client, self.bucket, key)
+
+        result = SyncResult()
+        etag = self.local_etag(manifest, key, local_file)
+        if remote.get(key) == (local_file.stat().st_size, etag):
+            result.skipped.append(key)
+            manifest.save()
+            return result
+        self._run({key: (local_file, etag)}, self._upload, manifest, result)
+        return result
+
+    @staticmethod
+    def _local_files(local_dir: Path) -> Iterator[Path]:
+        for path in sorted(local_dir.rglob("*")):
+            if path.is_file() and path.name != MANIFEST_NAME and not path.name.endswith(".s3tmp"):
+                yield path
+
+    def _download(self, key: str, local_file: Path, etag: str, manifest: SyncManifest) -> None:
+        local_file.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the target and renamed, an interrupted download never leaves a truncated file
+        tmp_file = local_file.with_name(local_file.name + ".s3tmp")
+        try:
+            self.s3_client.download_file(self.bucket, key, str(tmp_file), Config=self.transfer_config)
+            os.replace(tmp_file, local_file)
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+        manifest.record(key, local_file, etag)
+
+    def _upload(self, key: str, local_file: Path, etag: str, manifest: SyncManifest) -> None:
+        self.s3_client.upload_file(str(local_file), self.bucket, key, Config=self.transfer_config)
+        manifest.record(key, local_file, etag)
+
+    def _run(self, jobs: Dict[str, Tuple[Path, str]], transfer, manifest: SyncManifest, result: SyncResult) -> None:
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(transfer, key, local_file, etag, manifest): key
+                    for key, (local_file, etag) in jobs.items()
+                }
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        future.result()
+                        result.transferred.append(key)
+                    except Exception as e:
+                        logger.error(f"❌ Failed to transfer {key}: {e}")
+                        result.failed[key] = str(e)
+                        continue
+                    if len(result.transferred) % MANIFEST_SAVE_EVERY == 0:
+                        manifest.save()
+                        logger.info(f"{len(result.transferred)}/{len(jobs)} files transferred...")
+        finally:
+            manifest.save()
@@ -7,6 +7,9 @@ https://docs.kedro.org/en/stable/kedro_project_setup/settings.html."""
 # from asi_proj_kedro.hooks import ProjectHooks
 # Hooks are executed in a Last-In-First-Out (LIFO) order.
 # HOOKS = (ProjectHooks(),)
+from asi_proj_kedro.hooks import PerformanceHooks
+
+HOOKS = (PerformanceHooks(),)
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
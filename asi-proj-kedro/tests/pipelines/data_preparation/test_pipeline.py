@@ -7,3 +7,148 @@ Kedro recommends using `pytest` framework, more info about it can be found
 in the official documentation:
 https://docs.pytest.org/en/latest/getting-started.html
 """
+import io
+
+import numpy as np
+import pandas as pd
+
+from asi_proj_kedro.match_schema import apply_match_schema
+from asi_proj_kedro.pipelines.data_preparation.nodes import (
+    enforce_match_schema,
+    merge_datasets,
+    split_match_scores,
+    split_match_statistics,
+    standardize_column_names,
+    standardize_time_column,
+    stream_match_data,
+)
+
+
+def make_raw_exports(n_matches: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    match_ids = rng.permutation(np.arange(600000, 600000 + 3 * n_matches, 3))
+    teams = np.array([f"Team {i}" for i in range(10)])
+    home_goals = rng.poisson(1.5, n_matches)
+    away_goals = rng.poisson(1.2, n_matches)
+    matches_data = pd.DataFrame({
+        'Match ID': match_ids,
+        'Date': pd.Timestamp('2020-08-01') + pd.to_timedelta(rng.integers(0, 900, n_matches), unit='D'),
+        'Home Team': rng.choice(teams, n_matches),
+        'Away Team': rng.choice(teams, n_matches),
+        'Time': rng.choice(['15:29', '18:00', '20:44', None], n_matches),
+        'Full Time Score': [f"{home} - {away}" for home, away in zip(home_goals, away_goals)],
+        'Half Time Score': [f"{home // 2} - {away // 2}" for home, away in zip(home_goals, away_goals)],
+    })
+    matches_statistics = pd.DataFrame({
+        'Match ID': rng.permutation(match_ids),
+        'Attacks': [f"{a}:{b}" for a, b in rng.integers(50, 130, (n_matches, 2))],
+        'Corners': rng.choice(['3:5', '0:1', '7:2', None], n_matches),
+        'Possesion': rng.choice(['50.5:49.5', '60:40', '45:55'], n_matches),
+    })
+    return matches_data, matches_statistics
+
+
+def chunked(df: pd.DataFrame, chunksize: int) -> list:
+    return [df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize)]
+
+
+def test_stream_match_data_matches_batch_pipeline():
+    matches_data, matches_statistics = make_raw_exports(500)
+    expected = enforce_match_schema(split_match_scores(split_match_statistics(merge_datasets(
+        standardize_time_column(standardize_column_names(matches_data)),
+        standardize_column_names(matches_statistics),
+    ))))
+
+    partitions = {}
+    for partition in stream_match_data(chunked(matches_data, 80), chunked(matches_statistics, 200),
+                                       {'match_id_range': 300, 'spill_dir': None}):
+        assert not partitions.keys() & partition.keys()
+        partitions.update(partition)
+
+    assert list(partitions) == sorted(partitions)
+    assert len(partitions) > 1
+    result = pd.concat([partitions[key] for key in sorted(partitions)], ignore_index=True)
+    expected = expected.sort_values('match_id', ignore_index=True)
+    result = result.sort_values('match_id', ignore_index=True)
+    # Categories differ per partition, values do not
+    pd.testing.assert_frame_equal(result, expected, check_categorical=False)
+
+
+def test_enforce_match_schema_is_compact_and_survives_csv():
+    matches_data, matches_statistics = make_raw_exports(300, seed=3)
+    separated = split_match_scores(split_match_statistics(merge_datasets(
+        standardize_time_column(standardize_column_names(matches_data)),
+        standardize_column_names(matches_statistics),
+    )))
+    result = enforce_match_schema(separated)
+
+    assert result['attacks_home'].dtype == 'Int16'
+    assert result['corners_away'].dtype == 'Int16'
+    assert result['full_time_score_home'].dtype == 'Int16'
+    assert result['possesion_home'].dtype == 'Float32'
+    assert pd.api.types.is_datetime64_any_dtype(result['date'])
+    # One team dictionary - equal codes mean the same team on both sides
+    assert isinstance(result['home_team'].dtype, pd.CategoricalDtype)
+    assert result['home_team'].dtype == result['away_team'].dtype
+    assert result.memory_usage(deep=True).sum() < separated.memory_usage(deep=True).sum() / 2
+
+    # Readers of the CSV copy get the same frame back
+    from_csv = apply_match_schema(pd.read_csv(io.StringIO(result.to_csv(index=False))))
+    pd.testing.assert_frame_equal(from_csv, result)
+
+
+def test_apply_match_schema_keeps_non_numeric_stat_parts():
+    statistics = pd.DataFrame({'match_id': [1, 2, 3], 'attacks': ['abc:1', '3:2', None]})
+    result = apply_match_schema(split_match_statistics(statistics))
+
+    assert result['attacks_home'].dtype == object
+    assert result['attacks_home'].tolist() == ['abc', 3, None]
+    assert result['attacks_away'].dtype == 'Int16'
+    assert result['attacks_away'].tolist() == [1, 2, pd.NA]
+    # Idempotent, also after a CSV round trip
+    pd.testing.assert_frame_equal(apply_match_schema(result), result)
+    from_csv = apply_match_schema(pd.read_csv(io.StringIO(result.to_csv(index=False))))
+    pd.testing.assert_frame_equal(from_csv[['attacks_home', 'attacks_away']], result[['attacks_home', 'attacks_away']])
+
+
+PARALLEL = {'workers': 3, 'min_rows_per_partition': 1}
+
+
+def test_parallel_nodes_match_single_process():
+    matches_data, matches_statistics = make_raw_exports(600, seed=1)
+    merged = merge_datasets(standardize_column_names(matches_data), standardize_column_names(matches_statistics))
+
+    pd.testing.assert_frame_equal(standardize_time_column(merged.copy(), PARALLEL),
+                                  standardize_time_column(merged.copy()))
+    separated = split_match_statistics(merged)
+    pd.testing.assert_frame_equal(split_match_statistics(merged, PARALLEL), separated)
+    pd.testing.assert_frame_equal(split_match_scores(separated, PARALLEL), split_match_scores(separated))
+
+
+def test_parallel_split_match_statistics_infers_dtypes_on_whole_columns():
+    # Text and fractions in one row block only - per block they would give object, Float64 and Int64
+    statistics = pd.DataFrame({
+        'match_id': range(9),
+        'attacks': ['1:2', '3:4', '5:6', 'abc:1', '7:8', '9:1', '2:3', '4:5.5', '6:7'],
+        'corners': ['1:2', '0:1', '3:3'] + [None] * 6,
+    })
+
+    expected = split_match_statistics(statistics)
+    result = split_match_statistics(statistics, PARALLEL)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert [type(value) for value in result['attacks_home']] == [type(value) for value in expected['attacks_home']]
+    assert result['attacks_away'].dtype == 'Float64'
+
+
+def test_parallel_stream_match_data_keeps_range_order():
+    matches_data, matches_statistics = make_raw_exports(400, seed=2)
+    params = {'match_id_range': 200, 'spill_dir': None}
+
+    sequential = list(stream_match_data(chunked(matches_data, 150), chunked(matches_statistics, 150), params))
+    parallel = list(stream_match_data(chunked(matches_data, 150), chunked(matches_statistics, 150), params, PARALLEL))
+
+    assert [list(partition) for partition in parallel] == [list(partition) for partition in sequential]
+    for expected, result in zip(sequential, parallel):
+        key, = expected
+        pd.testing.assert_frame_equal(result[key], expected[key])
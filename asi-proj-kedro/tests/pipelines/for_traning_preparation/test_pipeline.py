@@ -7,3 +7,353 @@ Kedro recommends using `pytest` framework, more info about it can be found
 in the official documentation:
 https://docs.pytest.org/en/latest/getting-started.html
 """
+import numpy as np
+import pandas as pd
+import pytest
+
+from asi_proj_kedro.pipelines.for_traning_preparation.nodes import (
+    build_goals_features_state,
+    build_team_features_snapshot,
+    create_goals_features,
+    update_goals_features,
+)
+
+
+def make_goals_data(n_matches: int, n_teams: int = 8, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    teams = [f"Team {i}" for i in range(n_teams)]
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+    data = pd.DataFrame({
+        'date': pd.date_range('2020-08-01', periods=n_matches, freq='D').strftime('%Y-%m-%d'),
+        'home_team': np.array(teams)[home],
+        'away_team': np.array(teams)[away],
+        'home_goals': rng.poisson(1.5, n_matches),
+        'away_goals': rng.poisson(1.2, n_matches),
+    })
+    data['total_goals'] = data['home_goals'] + data['away_goals']
+    data.insert(0, 'match_id', np.arange(600000, 600000 + n_matches))
+    return data
+
+
+def reference_create_goals_features(data: pd.DataFrame) -> pd.DataFrame:
+    """Row-by-row implementation the vectorized node has to reproduce"""
+    df = data.copy()
+
+    # ========== OFENSYWNE I DEFENSYWNE STATYSTYKI ==========
+
+    def calculate_attacking_stats(df, team_col, n_matches=5):
+        """Statystyki ofensywne drużyny"""
+        attacking_stats = []
+
+        for idx, row in df.iterrows():
+            team = row[team_col]
+            match_date = row.get('match_date', idx)
+
+            # Ostatnie mecze tej drużyny
+            if 'match_date' in df.columns:
+                recent_matches = df[
+                    ((df['home_team'] == team) | (df['away_team'] == team)) &
+                    (df['match_date'] < match_date)
+                    ].sort_values('match_date', ascending=False).head(n_matches)
+            else:
+                recent_matches = df[
+                    ((df['home_team'] == team) | (df['away_team'] == team)) &
+                    (df.index < idx)
+                    ].tail(n_matches)
+
+            if len(recent_matches) == 0:
+                attacking_stats.append({
+                    'goals_scored': 0,
+                    'goals_conceded': 0,
+                    'avg_goals_scored': 0,
+                    'avg_goals_conceded': 0,
+                    'matches_played': 0,
+                    'clean_sheets': 0,
+                    'failed_to_score': 0,
+                    'high_scoring_games': 0,
+                    'clean_sheet_rate': 0,
+                    'fail_to_score_rate': 0,
+                    'high_scoring_rate': 0
+                })
+                continue
+
+            goals_scored = goals_conceded = clean_sheets = failed_to_score = high_scoring = 0
+
+            for _, match in recent_matches.iterrows():
+                is_home = match['home_team'] == team
+                total_goals_in_match = match['home_goals'] + match['away_goals']
+
+                if is_home:
+                    team_goals = match['home_goals']
+                    opponent_goals = match['away_goals']
+                else:
+                    team_goals = match['away_goals']
+                    opponent_goals = match['home_goals']
+
+                goals_scored += team_goals
+                goals_conceded += opponent_goals
+
+                if opponent_goals == 0:
+                    clean_sheets += 1
+                if team_goals == 0:
+                    failed_to_score += 1
+                if total_goals_in_match >= 3:
+                    high_scoring += 1
+
+            matches_played = len(recent_matches)
+            attacking_stats.append({
+                'goals_scored': goals_scored,
+                'goals_conceded': goals_conceded,
+                'avg_goals_scored': goals_scored / matches_played,
+                'avg_goals_conceded': goals_conceded / matches_played,
+                'matches_played': matches_played,
+                'clean_sheets': clean_sheets,
+                'failed_to_score': failed_to_score,
+                'high_scoring_games': high_scoring,
+                'clean_sheet_rate': clean_sheets / matches_played,
+                'fail_to_score_rate': failed_to_score / matches_played,
+                'high_scoring_rate': high_scoring / matches_played
+            })
+
+        return attacking_stats
+
+    # Statystyki dla drużyny domowej
+    home_stats = calculate_attacking_stats(df, 'home_team', n_matches=5)
+    for key in home_stats[0].keys():
+        df[f'home_{key}_last5'] = [stat[key] for stat in home_stats]
+
+    # Statystyki dla drużyny gości
+    away_stats = calculate_attacking_stats(df, 'away_team', n_matches=5)
+    for key in away_stats[0].keys():
+        df[f'away_{key}_last5'] = [stat[key] for stat in away_stats]
+
+    # ========== KOMBINOWANE CECHY OFENSYWNO-DEFENSYWNE ==========
+
+    # Potencjał strzelecki meczu
+    df['expected_goals_home'] = df['home_avg_goals_scored_last5']
+    df['expected_goals_away'] = df['away_avg_goals_scored_last5']
+    df['expected_total_goals'] = df['expected_goals_home'] + df['expected_goals_away']
+
+    # Defensywna solidność
+    df['defensive_strength_home'] = 1 / (df['home_avg_goals_conceded_last5'] + 0.1)
+    df['defensive_strength_away'] = 1 / (df['away_avg_goals_conceded_last5'] + 0.1)
+
+    # Różnica w sile ofensywnej
+    df['attacking_advantage'] = df['home_avg_goals_scored_last5'] - df['away_avg_goals_scored_last5']
+
+    # Prawdopodobieństwo wysokowydajnego meczu
+    df['high_scoring_tendency'] = (df['home_high_scoring_rate_last5'] + df['away_high_scoring_rate_last5']) / 2
+
+    # Solidność defensywna obu drużyn
+    df['defensive_solidity'] = df['home_clean_sheet_rate_last5'] + df['away_clean_sheet_rate_last5']
+
+    # Tendencja do bramek / brak bramek
+    df['btts_likelihood'] = 1 - (df['home_fail_to_score_rate_last5'] + df['away_fail_to_score_rate_last5'])
+
+    # ========== CECHY HISTORYCZNE HEAD-TO-HEAD ==========
+
+    def calculate_goals_h2h(df, n_matches=10):
+        """Statystyki goli w meczach head-to-head"""
+        h2h_goals_stats = []
+
+        for idx, row in df.iterrows():
+            home_team = row['home_team']
+            away_team = row['away_team']
+            match_date = row.get('match_date', idx)
+
+            if 'match_date' in df.columns:
+                h2h_matches = df[
+                    (((df['home_team'] == home_team) & (df['away_team'] == away_team)) |
+                     ((df['home_team'] == away_team) & (df['away_team'] == home_team))) &
+                    (df['match_date'] < match_date)
+                    ].sort_values('match_date', ascending=False).head(n_matches)
+            else:
+                h2h_matches = df[
+                    (((df['home_team'] == home_team) & (df['away_team'] == away_team)) |
+                     ((df['home_team'] == away_team) & (df['away_team'] == home_team))) &
+                    (df.index < idx)
+                    ].tail(n_matches)
+
+            if len(h2h_matches) == 0:
+                h2h_goals_stats.append({
+                    'h2h_avg_total_goals': 2.5,  # Liga average
+                    'h2h_over_2_5_rate': 0.5,
+                    'h2h_btts_rate': 0.5,
+                    'h2h_matches': 0
+                })
+                continue
+
+            total_goals_list = []
+            over_2_5_count = 0
+            btts_count = 0
+
+            for _, match in h2h_matches.iterrows():
+                total_goals = match['home_goals'] + match['away_goals']
+                total_goals_list.append(total_goals)
+
+                if total_goals > 2.5:
+                    over_2_5_count += 1
+
+                if match['home_goals'] > 0 and match['away_goals'] > 0:
+                    btts_count += 1
+
+            matches_count = len(h2h_matches)
+            h2h_goals_stats.append({
+                'h2h_avg_total_goals': np.mean(total_goals_list),
+                'h2h_over_2_5_rate': over_2_5_count / matches_count,
+                'h2h_btts_rate': btts_count / matches_count,
+                'h2h_matches': matches_count
+            })
+
+        return h2h_goals_stats
+
+    h2h_data = calculate_goals_h2h(df)
+    for key in h2h_data[0].keys():
+        df[key] = [stat[key] for stat in h2h_data]
+
+    # ========== CECHY LIGOWE I SEZONOWE ==========
+
+    # Średnia ligowa (jeśli masz info o lidze)
+    if 'league' in df.columns:
+        league_averages = df.groupby('league')['total_goals'].mean().to_dict()
+        df['league_avg_goals'] = df['league'].map(league_averages)
+    else:
+        df['league_avg_goals'] = df['total_goals'].mean()  # Ogólna średnia
+
+    # Odchylenie od średniej ligowej
+    df['goals_vs_league_avg'] = df['expected_total_goals'] - df['league_avg_goals']
+
+    return df
+
+
+@pytest.mark.parametrize("n_matches, n_teams", [(1, 2), (60, 3), (300, 8), (400, 20)])
+def test_create_goals_features_matches_reference(n_matches, n_teams):
+    data = make_goals_data(n_matches, n_teams)
+
+    expected = reference_create_goals_features(data)
+    result = create_goals_features(data)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_create_goals_features_with_missing_goals():
+    data = make_goals_data(200, 6, seed=1)
+    data['home_goals'] = data['home_goals'].astype(float)
+    data.loc[[10, 57, 120], 'home_goals'] = np.nan
+    data['total_goals'] = data['home_goals'] + data['away_goals']
+
+    pd.testing.assert_frame_equal(create_goals_features(data), reference_create_goals_features(data))
+
+
+def test_create_goals_features_orders_by_match_date():
+    data = make_goals_data(250, 6, seed=2)
+    data['match_date'] = pd.to_datetime(data['date'])
+    data = data.sample(frac=1, random_state=3)
+
+    pd.testing.assert_frame_equal(create_goals_features(data), reference_create_goals_features(data))
+
+
+def test_create_goals_features_excludes_same_day_matches():
+    # Matches are ordered by date, so matches of one day are not in each other's windows.
+    # Training before used the row order and also counted the earlier rows of the same day
+    data = make_goals_data(60, 4, seed=8)
+    data['date'] = data['date'].iloc[::3].repeat(3).to_numpy()
+
+    result = create_goals_features(data)
+
+    # Old training output of every match played right after the days before it
+    expected = pd.concat([
+        reference_create_goals_features(pd.concat([data[data['date'] < date], data.loc[[idx]]])).iloc[[-1]]
+        for idx, date in data['date'].items()
+    ])
+    # League averages are over the whole frame, not the matches before
+    window_columns = result.columns.drop(list(data.columns) + ['league_avg_goals', 'goals_vs_league_avg'])
+    pd.testing.assert_frame_equal(result[window_columns], expected[window_columns])
+    assert not result[window_columns].equals(reference_create_goals_features(data)[window_columns])
+
+
+def test_update_goals_features_matches_full_run():
+    data = make_goals_data(300, 8, seed=4)
+    first_run = data.iloc[:240]
+
+    features, state = update_goals_features(
+        data.iloc[:270], create_goals_features(first_run), build_goals_features_state(first_run)
+    )
+    features, state = update_goals_features(data, features, state)
+
+    pd.testing.assert_frame_equal(features, create_goals_features(data))
+    assert len(state) < len(data)
+
+
+def test_update_goals_features_newest_first():
+    # Newest-first database: every run numbers the rows from 0 again, so the labels of
+    # new matches overlap the labels of the matches kept in the state
+    data = make_goals_data(300, 8, seed=6).iloc[::-1].reset_index(drop=True)
+    first_run = data.iloc[60:].reset_index(drop=True)
+
+    features, state = update_goals_features(
+        data, create_goals_features(first_run), build_goals_features_state(first_run)
+    )
+
+    def by_match_id(df):
+        return df.sort_values('match_id').reset_index(drop=True)
+
+    assert features['match_id'].is_unique
+    pd.testing.assert_frame_equal(by_match_id(features), by_match_id(create_goals_features(data)))
+
+
+@pytest.mark.parametrize("previous", ["no_match_id", "no_state", "first_run"])
+def test_update_goals_features_falls_back_to_full_run(previous):
+    data = make_goals_data(200, 6, seed=7)
+    features = create_goals_features(data.iloc[:150])
+    state = build_goals_features_state(data.iloc[:150])
+    if previous == "no_match_id":
+        # Features saved before match_id was kept
+        features = features.drop(columns='match_id')
+    elif previous == "no_state":
+        state = None
+    else:
+        features, state = None, None
+
+    updated, updated_state = update_goals_features(data, features, state)
+
+    pd.testing.assert_frame_equal(updated, create_goals_features(data))
+    pd.testing.assert_frame_equal(updated_state, build_goals_features_state(data))
+
+
+def test_update_goals_features_without_new_matches():
+    data = make_goals_data(100, 5, seed=5)
+    features = create_goals_features(data)
+    state = build_goals_features_state(data)
+
+    updated, updated_state = update_goals_features(data, features, state)
+
+    assert updated is features
+    assert updated_state is state
+
+
+def test_team_features_snapshot_matches_next_match_features():
+    data = make_goals_data(200, 6, seed=6)
+    team_snapshot, pair_snapshot = build_team_features_snapshot(data)
+
+    # Features of the next match of a pair see exactly the history the snapshot summarises
+    teams = sorted(data['home_team'].unique())
+    features = pd.concat([
+        create_goals_features(pd.concat([data, pd.DataFrame([{
+            'match_id': 10**7, 'date': '2099-01-01', 'home_team': home, 'away_team': away
+        }])], ignore_index=True)).iloc[[-1]]
+        for home in teams for away in teams if home < away
+    ], ignore_index=True)
+
+    team_stats = team_snapshot.set_index('team')
+    for side in ['home', 'away']:
+        expected = team_stats.reindex(features[f'{side}_team']).reset_index(drop=True)
+        for column in ['goals_scored', 'avg_goals_conceded', 'matches_played', 'high_scoring_rate']:
+            np.testing.assert_allclose(features[f'{side}_{column}_last5'], expected[column])
+
+    pair_stats = pair_snapshot.set_index(['first_team', 'second_team'])
+    expected = pair_stats.reindex(pd.MultiIndex.from_frame(features[['home_team', 'away_team']]))
+    for column in ['h2h_avg_total_goals', 'h2h_over_2_5_rate', 'h2h_btts_rate', 'h2h_matches']:
+        np.testing.assert_allclose(features[column].fillna(-1), expected[column].fillna(-1))
+    assert team_stats['league_avg_goals'].eq(data['total_goals'].mean()).all()
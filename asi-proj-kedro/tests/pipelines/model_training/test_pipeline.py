@@ -7,3 +7,21 @@ Kedro recommends using `pytest` framework, more info about it can be found
 in the official documentation:
 https://docs.pytest.org/en/latest/getting-started.html
 """
+import pandas as pd
+import pytest
+
+pytest.importorskip("autogluon.tabular")
+
+from asi_proj_kedro.pipelines.model_training.nodes import training_fingerprint  # noqa: E402
+
+
+def test_training_fingerprint_covers_label_and_config():
+    data = pd.DataFrame({"feature": [1.0, 2.0, 3.0], "btts": ["yes", "no", "yes"]})
+    config = {"label": "btts", "hyperparameters": {"GBM": {"num_boost_round": 400}}, "time_limit": 600}
+
+    fingerprint = training_fingerprint(data, config)
+
+    assert training_fingerprint(data.copy(), dict(config)) == fingerprint
+    assert training_fingerprint(data.assign(btts=["no", "no", "yes"]), config) != fingerprint
+    assert training_fingerprint(data, {**config, "hyperparameters": {"GBM": {"num_boost_round": 500}}}) != fingerprint
+    assert training_fingerprint(data, {**config, "time_limit": 300}) != fingerprint
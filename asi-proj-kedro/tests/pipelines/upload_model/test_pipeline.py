@@ -7,3 +7,37 @@ Kedro recommends using `pytest` framework, more info about it can be found
 in the official documentation:
 https://docs.pytest.org/en/latest/getting-started.html
 """
+import boto3
+import pytest
+from moto import mock_aws
+
+from asi_proj_kedro.pipelines.upload_model.nodes import upload_everything
+from asi_proj_kedro.s3_sync import list_objects
+
+BUCKET = "my-football-models"
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def test_only_model_directories_are_uploaded(s3_client, tmp_path, monkeypatch):
+    reporting = tmp_path / "data" / "08_reporting"
+    for name in ["btts/predictor.pkl", "deploy/btts/predictor.pkl", "performance/history.jsonl",
+                 "node_cache.json", "serving_models_report.csv"]:
+        (reporting / name).parent.mkdir(parents=True, exist_ok=True)
+        (reporting / name).write_text(name)
+    # The node resolves data/ two levels above the working directory
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / "a" / "b")
+
+    upload_everything(None, {"manifest_path": str(tmp_path / "manifest.json")}, s3_client=s3_client)
+
+    assert sorted(list_objects(s3_client, BUCKET, "")) == ["models/btts/predictor.pkl",
+                                                           "models/deploy/btts/predictor.pkl"]
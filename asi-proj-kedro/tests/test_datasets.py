@@ -0,0 +1,43 @@
+import pandas as pd
+from kedro.io import DataCatalog
+
+from asi_proj_kedro.node_cache import NodeCache
+
+
+def test_optional_dataset_loads_none_until_the_file_exists(tmp_path):
+    filepath = tmp_path / "state.pkl"
+    catalog = DataCatalog.from_config({
+        "state_previous": {
+            "type": "asi_proj_kedro.datasets.OptionalDataset",
+            "dataset": {"type": "pickle.PickleDataset", "filepath": str(filepath)},
+        },
+    })
+
+    assert catalog.load("state_previous") is None
+
+    state = pd.DataFrame({"match_id": [1, 2]})
+    catalog.save("state_previous", state)
+    pd.testing.assert_frame_equal(catalog.load("state_previous"), state)
+    # The node cache still sees the file behind the wrapper
+    assert NodeCache.local_path(catalog, "state_previous") == filepath
+
+
+def test_streamed_partitioned_dataset_replaces_previous_partitions(tmp_path):
+    path = tmp_path / "partitions"
+    path.mkdir()
+    # Range no longer produced, e.g. left by a run with another match_id_range
+    (path / "000009000000.csv").write_text("match_id\n9000000\n")
+    catalog = DataCatalog.from_config({
+        "partitions": {
+            "type": "asi_proj_kedro.datasets.StreamedPartitionedDataset",
+            "path": str(path),
+            "dataset": "pandas.CSVDataset",
+            "filename_suffix": ".csv",
+        },
+    })
+
+    # One save per yielded partition, as for a generator node
+    for first_id in [600000, 600100]:
+        catalog.save("partitions", {f"{first_id:012d}": pd.DataFrame({"match_id": [first_id]})})
+
+    assert sorted(file.name for file in path.iterdir()) == ["000000600000.csv", "000000600100.csv"]
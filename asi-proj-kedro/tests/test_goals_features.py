@@ -0,0 +1,78 @@
+"""Training/serving skew: the features the API builds for a fixture equal the
+training features of that fixture played after the same history."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from asi_proj_kedro.goals_features import (
+    TeamFeatureSnapshot,
+    TeamHistory,
+    build_team_features_snapshot,
+    fixture_features,
+    fixtures_features,
+)
+from asi_proj_kedro.pipelines.for_traning_preparation.nodes import create_goals_features
+
+from tests.pipelines.for_traning_preparation.test_pipeline import make_goals_data
+
+
+def training_features_of_next_matches(data: pd.DataFrame, fixtures: pd.DataFrame) -> pd.DataFrame:
+    # Every fixture is appended on its own, so fixtures never see each other as history
+    return pd.concat([
+        create_goals_features(pd.concat([data, pd.DataFrame([{
+            'match_id': 10**7, 'date': '2099-01-01', 'home_team': home, 'away_team': away
+        }])], ignore_index=True)).iloc[[-1]]
+        for home, away in fixtures[['home_team', 'away_team']].itertuples(index=False)
+    ], ignore_index=True)
+
+
+@pytest.fixture(params=["no_league", "league", "same_day"])
+def history_and_fixtures(request):
+    data = make_goals_data(300, 7, seed=11)
+    if request.param == "league":
+        # Match databases may carry the league, the league average must not depend on it
+        data['league'] = np.random.default_rng(11).choice(['Liga A', 'Liga B'], len(data))
+    elif request.param == "same_day":
+        # Several matches a day, a team sometimes twice - windows keep the later match_id
+        data['date'] = data['date'].iloc[::4].repeat(4).to_numpy()
+    teams = sorted(data['home_team'].unique()) + ['New Team']
+    fixtures = pd.DataFrame(
+        [(home, away) for home in teams for away in teams if home != away], columns=['home_team', 'away_team']
+    )
+    return data, fixtures
+
+
+def test_create_goals_features_orders_newest_first_data_by_date():
+    data = make_goals_data(250, 6, seed=12)
+
+    newest_first = create_goals_features(data.iloc[::-1])
+
+    pd.testing.assert_frame_equal(newest_first.sort_index(), create_goals_features(data))
+
+
+@pytest.mark.parametrize("source", ["history", "snapshot"])
+def test_serving_features_match_training_features(history_and_fixtures, source):
+    data, fixtures = history_and_fixtures
+    if source == "history":
+        feature_source = TeamHistory(data)
+    else:
+        feature_source = TeamFeatureSnapshot(*build_team_features_snapshot(data))
+    expected = training_features_of_next_matches(data, fixtures)
+
+    batch = fixtures_features(feature_source, fixtures)
+    single = pd.DataFrame([fixture_features(feature_source, home, away)
+                           for home, away in fixtures.itertuples(index=False)])
+
+    assert list(batch.columns) == list(single.columns)
+    for features in [batch, single]:
+        for column in features.columns.drop(['home_team', 'away_team']):
+            np.testing.assert_allclose(features[column].astype(float), expected[column].astype(float),
+                                       err_msg=column)
+
+
+def test_snapshot_rejects_other_window_sizes(history_and_fixtures):
+    data, _ = history_and_fixtures
+    snapshot = TeamFeatureSnapshot(*build_team_features_snapshot(data))
+
+    with pytest.raises(ValueError):
+        fixture_features(snapshot, 'Team 0', 'Team 1', n_matches=3)
@@ -0,0 +1,62 @@
+import json
+from types import SimpleNamespace
+
+import pandas as pd
+from kedro.pipeline import node
+
+from asi_proj_kedro.hooks import PerformanceHooks
+
+
+def make_hooks(tmp_path, **settings):
+    hooks = PerformanceHooks()
+    context = SimpleNamespace(project_path=tmp_path,
+                              params={"profiling": {"enabled": True, "report_dir": "reports", **settings}})
+    hooks.after_context_created(context)
+    hooks.before_pipeline_run({"pipeline_name": "data_processing", "session_id": "s1"})
+    return hooks
+
+
+def test_report_records_nodes_and_datasets(tmp_path):
+    hooks = make_hooks(tmp_path, profile_nodes="double_node")
+    double = node(lambda df: df * 2, inputs="numbers", outputs="doubled", name="double_node")
+    numbers = pd.DataFrame({"a": range(10)})
+
+    hooks.before_dataset_loaded("numbers")
+    hooks.after_dataset_loaded("numbers", numbers, double)
+    hooks.before_node_run(double, {"numbers": numbers, "params:x": 1})
+    hooks.after_node_run(double, {"doubled": numbers * 2})
+    hooks.before_dataset_saved("doubled")
+    hooks.after_dataset_saved("doubled", numbers * 2, double)
+    hooks.after_pipeline_run()
+
+    report_path, = (tmp_path / "reports").glob("*_data_processing.json")
+    report = json.loads(report_path.read_text())
+    record, = report["nodes"]
+    assert record["node"] == "double_node"
+    assert record["inputs"] == {"numbers": {"rows": 10, "bytes": int(numbers.memory_usage().sum())}}
+    assert record["outputs"]["doubled"]["rows"] == 10
+    assert record["wall_seconds"] >= 0 and record["cpu_seconds"] >= 0
+    assert (tmp_path / "reports" / "profiles").joinpath(record["profile"]).exists()
+    assert [(d["dataset"], d["operation"]) for d in report["datasets"]] == [("numbers", "load"), ("doubled", "save")]
+
+    history = [json.loads(line) for line in (tmp_path / "reports" / "history.jsonl").read_text().splitlines()]
+    assert history[-1]["nodes"] == {"double_node": record["wall_seconds"]}
+
+
+def test_generator_node_is_timed_until_its_last_chunk(tmp_path):
+    hooks = make_hooks(tmp_path)
+    stream = node(lambda: iter([]), inputs=None, outputs="parts", name="stream_node")
+    chunks = [{"p1": pd.DataFrame({"a": range(3)})}, {"p2": pd.DataFrame({"a": range(4)})}]
+
+    hooks.before_node_run(stream, {})
+    hooks.after_node_run(stream, {"parts": iter(chunks)})
+    for chunk in chunks:
+        hooks.before_dataset_saved("parts")
+        hooks.after_dataset_saved("parts", chunk, stream)
+    hooks.after_pipeline_run()
+
+    report_path, = (tmp_path / "reports").glob("*.json")
+    record, = json.loads(report_path.read_text())["nodes"]
+    assert record["generator"] is True
+    assert record["outputs"]["parts"]["rows"] == 7
+    assert record["outputs"]["parts"]["chunks"] == 2
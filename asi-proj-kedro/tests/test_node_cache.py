@@ -0,0 +1,104 @@
+import hashlib
+import inspect
+import json
+
+import kedro
+import pandas as pd
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.runner.runner import AbstractRunner
+from kedro.pipeline import node, pipeline
+from kedro_datasets.pandas import CSVDataset
+
+from asi_proj_kedro.runner import CachedSequentialRunner
+
+CALLS = []
+
+
+def double(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    CALLS.append("double")
+    return df * factor
+
+
+def total(df: pd.DataFrame) -> pd.DataFrame:
+    CALLS.append("total")
+    return df.sum().to_frame("total")
+
+
+PIPELINE = pipeline([
+    node(double, inputs=["numbers", "params:factor"], outputs="doubled", name="double_node"),
+    node(total, inputs="doubled", outputs="totals", name="total_node"),
+])
+
+
+def run(tmp_path, factor=2, **settings):
+    CALLS.clear()
+    parameters = {"factor": factor, "node_cache": {"enabled": True, "cache_dir": str(tmp_path / "cache"),
+                                                   "report_path": str(tmp_path / "report.json"), **settings}}
+    catalog = DataCatalog({
+        **{name: CSVDataset(filepath=str(tmp_path / f"{name}.csv")) for name in ("numbers", "doubled", "totals")},
+        "parameters": MemoryDataset(parameters),
+        "params:factor": MemoryDataset(factor),
+    })
+    CachedSequentialRunner().run(PIPELINE, catalog)
+    return json.loads((tmp_path / "report.json").read_text())
+
+
+def test_unchanged_nodes_are_skipped(tmp_path):
+    pd.DataFrame({"a": range(5)}).to_csv(tmp_path / "numbers.csv", index=False)
+
+    run(tmp_path)
+    assert CALLS == ["double", "total"]
+
+    report = run(tmp_path)
+    assert CALLS == []
+    assert [entry["status"] for entry in report["nodes"]] == ["hit", "hit"]
+    assert pd.read_csv(tmp_path / "totals.csv")["total"].tolist() == [20]
+
+    # New parameter value - both nodes run again, the totals change
+    run(tmp_path, factor=3)
+    assert CALLS == ["double", "total"]
+    assert pd.read_csv(tmp_path / "totals.csv")["total"].tolist() == [30]
+
+
+def test_changed_input_or_output_reruns(tmp_path):
+    pd.DataFrame({"a": range(5)}).to_csv(tmp_path / "numbers.csv", index=False)
+    run(tmp_path)
+
+    # Edited output - only its producer reruns, total_node gets the same input back
+    pd.DataFrame({"a": [0]}).to_csv(tmp_path / "doubled.csv", index=False)
+    run(tmp_path)
+    assert CALLS == ["double"]
+
+    pd.DataFrame({"a": range(6)}).to_csv(tmp_path / "numbers.csv", index=False)
+    run(tmp_path)
+    assert CALLS == ["double", "total"]
+
+
+def test_invalidation(tmp_path):
+    pd.DataFrame({"a": range(5)}).to_csv(tmp_path / "numbers.csv", index=False)
+    run(tmp_path)
+
+    run(tmp_path, invalidate_nodes="total_node")
+    assert CALLS == ["total"]
+
+    report = run(tmp_path, invalidate=True)
+    assert CALLS == ["double", "total"]
+    assert report["miss"] == 2
+
+    run(tmp_path, enabled=False)
+    assert CALLS == ["double", "total"]
+
+
+def test_runner_matches_pinned_kedro_loop():
+    # CachedSequentialRunner._run copies this loop - review it before moving the kedro pin
+    assert kedro.__version__ == "0.19.15"
+    source = inspect.getsource(AbstractRunner._run)
+    assert hashlib.sha1(source.encode()).hexdigest() == "824305e70bc203b08c97dc771f68bd429cb461c8"
+    for name, parameters in {
+        "_validate_catalog": ["self", "catalog", "pipeline"],
+        "_validate_nodes": ["self", "node"],
+        "_set_manager_datasets": ["self", "catalog", "pipeline"],
+        "_release_datasets": ["node", "catalog", "load_counts", "pipeline"],
+        "_suggest_resume_scenario": ["self", "pipeline", "done_nodes", "catalog"],
+    }.items():
+        assert list(inspect.signature(getattr(AbstractRunner, name)).parameters) == parameters
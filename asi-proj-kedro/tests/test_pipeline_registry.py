@@ -0,0 +1,16 @@
+import pytest
+
+# model_training imports AutoGluon
+pytest.importorskip("autogluon")
+
+from asi_proj_kedro.pipeline_registry import register_pipelines  # noqa: E402
+
+
+def test_default_pipeline_chains_every_stage():
+    pipelines = register_pipelines()
+    stages = ["data_processing", "for_traning_preparation", "model_training", "upload_model"]
+
+    assert set(pipelines["__default__"].nodes) == {n for stage in stages for n in pipelines[stage].nodes}
+    # Only the raw exports and parameters come from outside - every stage reads what the previous one wrote
+    assert {name for name in pipelines["__default__"].inputs() if not name.startswith("params:")} == {
+        "matches_data", "matches_statistics"}
@@ -0,0 +1,30 @@
+import pandas as pd
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.pipeline import node, pipeline
+from kedro_datasets.pandas import CSVDataset
+
+from asi_proj_kedro.runner import InMemoryParallelRunner
+
+
+def double(df: pd.DataFrame) -> pd.DataFrame:
+    return df * 2
+
+
+def total(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sum().to_frame("total")
+
+
+def test_memory_intermediates_on_parallel_runner(tmp_path):
+    pd.DataFrame({"a": range(5)}).to_csv(tmp_path / "numbers.csv", index=False)
+    catalog = DataCatalog({
+        "numbers": CSVDataset(filepath=str(tmp_path / "numbers.csv")),
+        # As declared in conf/in_memory/catalog.yml - plain ParallelRunner rejects it
+        "doubled": MemoryDataset(copy_mode="assign"),
+        "totals": CSVDataset(filepath=str(tmp_path / "totals.csv")),
+    })
+    InMemoryParallelRunner(max_workers=2).run(pipeline([
+        node(double, inputs="numbers", outputs="doubled", name="double_node"),
+        node(total, inputs="doubled", outputs="totals", name="total_node"),
+    ]), catalog)
+
+    assert pd.read_csv(tmp_path / "totals.csv")["total"].tolist() == [20]
@@ -0,0 +1,92 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from asi_proj_kedro.s3_sync import MANIFEST_NAME, S3Sync, file_etag, list_objects
+
+BUCKET = "test-bucket"
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def write_files(root, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def test_list_objects_follows_pagination(s3_client):
+    for i in range(1005):
+        s3_client.put_object(Bucket=BUCKET, Key=f"models/file_{i}.txt", Body=b"x")
+
+    assert len(list_objects(s3_client, BUCKET, "models/")) == 1005
+
+
+def test_upload_then_download_is_incremental(s3_client, tmp_path):
+    source = tmp_path / "source"
+    write_files(source, {"a/predictor.pkl": b"a" * 100, "b/learner.pkl": b"b" * 200, "version.txt": b"1"})
+    sync = S3Sync(s3_client, BUCKET, max_workers=4)
+
+    uploaded = sync.upload_directory(source, "models/")
+    assert sorted(uploaded.transferred) == ["models/a/predictor.pkl", "models/b/learner.pkl", "models/version.txt"]
+    assert sync.upload_directory(source, "models/").transferred == []
+
+    target = tmp_path / "target"
+    downloaded = sync.download_prefix("models/", target)
+    assert len(downloaded.transferred) == 3
+    assert (target / "a" / "predictor.pkl").read_bytes() == b"a" * 100
+    assert not list(target.rglob("*.s3tmp"))
+
+    (source / "version.txt").write_bytes(b"2")
+    assert sync.upload_directory(source, "models/").transferred == ["models/version.txt"]
+    downloaded = sync.download_prefix("models/", target)
+    assert downloaded.transferred == ["models/version.txt"]
+    assert len(downloaded.skipped) == 2
+    assert (target / "version.txt").read_bytes() == b"2"
+
+
+def test_multipart_etag_matches_s3(s3_client, tmp_path):
+    write_files(tmp_path, {"big.bin": bytes(range(256)) * (11 * MB // 256)})
+    sync = S3Sync(s3_client, BUCKET, multipart_threshold=5 * MB, multipart_chunksize=5 * MB)
+
+    sync.upload_file(tmp_path / "big.bin", "models/big.bin")
+
+    remote_size, remote_etag = list_objects(s3_client, BUCKET, "models/")["models/big.bin"]
+    assert remote_etag.endswith("-3")
+    assert file_etag(tmp_path / "big.bin", 5 * MB, 5 * MB) == remote_etag
+    assert sync.upload_file(tmp_path / "big.bin", "models/big.bin").skipped == ["models/big.bin"]
+
+
+def test_failed_download_is_resumed(s3_client, tmp_path, monkeypatch):
+    for i in range(5):
+        s3_client.put_object(Bucket=BUCKET, Key=f"database/file_{i}.csv", Body=f"row {i}".encode())
+    sync = S3Sync(s3_client, BUCKET, max_workers=2)
+    download_file = s3_client.download_file
+
+    def flaky_download(bucket, key, filename, **kwargs):
+        if key == "database/file_3.csv":
+            raise ConnectionError("connection reset")
+        return download_file(bucket, key, filename, **kwargs)
+
+    monkeypatch.setattr(s3_client, "download_file", flaky_download)
+    first = sync.download_prefix("database/", tmp_path)
+    assert list(first.failed) == ["database/file_3.csv"]
+    assert len(first.transferred) == 4
+    assert not (tmp_path / "file_3.csv").exists()
+    assert (tmp_path / MANIFEST_NAME).exists()
+
+    monkeypatch.setattr(s3_client, "download_file", download_file)
+    second = sync.download_prefix("database/", tmp_path)
+    assert second.transferred == ["database/file_3.csv"]
+    assert len(second.skipped) == 4
+    assert second.ok